@@ -0,0 +1,61 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+Compares two result files of run_benchmarks.py, case by case:
+
+    python benchmarks/compare.py before.json after.json
+
+A ratio below 1.0 means the second run was faster. Cases whose median
+changed by more than the threshold are flagged.
+'''
+import sys
+import json
+import argparse
+
+def compare(before, after, threshold=0.1):
+    """
+    @param before: A report dictionary, as written by run_benchmarks.py
+    @param after: Another report dictionary
+    @param threshold: The relative change of the median time that is flagged
+    @return: A list of (name, before_median, after_median, ratio, flag) tuples,
+    for the cases timed in both reports
+    """
+    rows = []
+    for name in sorted(set(before['results']) & set(after['results'])):
+        b = before['results'][name]
+        a = after['results'][name]
+        if 'median' not in b or 'median' not in a:
+            continue
+        ratio = a['median']/b['median'] if b['median'] > 0 else float('inf')
+        if ratio < 1.0 - threshold:
+            flag = "faster"
+        elif ratio > 1.0 + threshold:
+            flag = "SLOWER"
+        else:
+            flag = ""
+        rows.append((name, b['median'], a['median'], ratio, flag))
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two gbdx benchmark runs")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("-t", "--threshold", type=float, default=0.1,
+                        help="relative change of the median that is flagged (default 0.1)")
+    args = parser.parse_args(argv)
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    print("before: {git_commit} {timestamp}".format(**before['meta']))
+    print("after:  {git_commit} {timestamp}".format(**after['meta']))
+    print("{:<36} {:>12} {:>12} {:>8}".format("case", "before (ms)", "after (ms)", "ratio"))
+    rows = compare(before, after, args.threshold)
+    for (name, b, a, ratio, flag) in rows:
+        print("{:<36} {:12.2f} {:12.2f} {:8.2f} {}".format(name, 1000*b, 1000*a, ratio, flag))
+    #a non-zero exit status lets CI jobs fail on regressions
+    return 1 if any(flag == "SLOWER" for (_, _, _, _, flag) in rows) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,246 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+Offline performance benchmarks for the gbdx library, run against the
+local mock GBDX server in tests/mock_server.py. Results are written as
+JSON, so that runs can be compared over time with compare.py:
+
+    python benchmarks/run_benchmarks.py -o before.json
+    ... make changes ...
+    python benchmarks/run_benchmarks.py -o after.json
+    python benchmarks/compare.py before.json after.json
+
+Use --filter to run some of the groups (query, result_ops, json, thumbnails,
+workflows), and --quick to skip the 100k record sizes.
+'''
+import io
+import os
+import sys
+import gc
+import json
+import time
+import platform
+import argparse
+import datetime
+import contextlib
+import subprocess
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+
+import requests
+import shapely.geometry as sg
+
+import gbdx
+from gbdx import core, jsoncodec
+from gbdx.query import GBDXQuery, GBDXQueryResult
+from gbdx.registry import TaskRegistry
+from gbdx.workflows import WorkflowTemplate, submit_workflows
+from tests.mock_server import MockGBDXServer, make_catalog_records, \
+                              make_search_response, make_png
+
+RESULT_SIZES = (1000, 10000, 100000)
+QUERY_SIZES = (1000, 10000)
+
+BENCHMARKS = []
+
+def benchmark(func):
+    """
+    Registers a benchmark group. The function is called as func(args), and
+    returns a list of (name, setup, repeat) cases, where setup is a context
+    manager factory whose value is the callable to time. A case may instead
+    be (name, None, reason) to record that it was skipped.
+    """
+    BENCHMARKS.append((func.__name__[len("bench_"):], func))
+    return func
+
+@contextlib.contextmanager
+def _plain(func):
+    yield func
+
+def time_case(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - t0)
+    timings.sort()
+    return {'repeat': repeat, 'min': timings[0], 'median': timings[len(timings)//2],
+            'mean': sum(timings)/len(timings), 'max': timings[-1]}
+
+def _sizes(args, sizes):
+    return [n for n in sizes if not (args.quick and n > 10000)]
+
+@benchmark
+def bench_query(args):
+    @contextlib.contextmanager
+    def query_case(n, stream):
+        with MockGBDXServer(catalog_records=n, latency=args.latency):
+            sess = requests.Session()
+            qry = GBDXQuery(gbdx.TEST_AOI, query_cache=False)
+            qry.query(sess)     #warms the server's response cache
+            if stream:
+                yield lambda: sum(1 for _ in qry.iter_records(sess))
+            else:
+                yield lambda: qry.query(sess)
+    cases = []
+    for n in _sizes(args, QUERY_SIZES):
+        cases.append(("query_{}".format(n), lambda n=n: query_case(n, False), args.repeat))
+        cases.append(("iter_records_{}".format(n), lambda n=n: query_case(n, True), args.repeat))
+    return cases
+
+@benchmark
+def bench_result_ops(args):
+    aoi = sg.box(*gbdx.TEST_AOI)
+    small_aoi = sg.box(-122.43, 47.13, -122.41, 47.15)
+    cases = []
+    for n in _sizes(args, RESULT_SIZES):
+        response = make_search_response(make_catalog_records(n))
+        res = GBDXQueryResult(response)
+        res.footprint_index     #built once, outside of the timed predicates
+        probe = res.list_IDs()[::max(1, n//1000)]
+        ops = [
+            ("result_build", lambda r=response: GBDXQueryResult(r)),
+            ("result_build_compact", lambda r=response: GBDXQueryResult(r, compact=True)),
+            ("result_lookup_1000", lambda res=res, p=probe: [res.get_record_for_ID(i) for i in p]),
+            ("result_footprint_index", lambda r=response: GBDXQueryResult(r).footprint_index),
+            ("result_containing_poly", lambda res=res: res.get_ids_containing_poly(small_aoi)),
+            ("result_coverage_fractions", lambda res=res: res.get_coverage_fractions(aoi)),
+            ("result_covering_selection", lambda res=res: res.get_ids_covering_poly(aoi)),
+            ("result_columns_sort",
+             lambda r=response: GBDXQueryResult(r).to_columns().sort_by('cloudCover')),
+        ]
+        for (name, func) in ops:
+            cases.append(("{}_{}".format(name, n), lambda f=func: _plain(f), args.repeat))
+    return cases
+
+@benchmark
+def bench_json(args):
+    @contextlib.contextmanager
+    def codec_case(name, func):
+        previous = jsoncodec.get_codec()
+        jsoncodec.set_codec(name)
+        try:
+            yield func
+        finally:
+            jsoncodec.set_codec(previous)
+    cases = []
+    for n in _sizes(args, RESULT_SIZES[1:]):
+        raw = json.dumps(make_search_response(make_catalog_records(n))).encode('utf-8')
+        for name in ('json', 'orjson', 'simdjson'):
+            case = "json_decode_{}_{}".format(name, n)
+            if name not in jsoncodec.available_codecs():
+                cases.append((case, None, "{} is not installed".format(name)))
+                continue
+            decode = lambda r=raw: jsoncodec.loads(r)
+            cases.append((case, lambda name=name, f=decode: codec_case(name, f), args.repeat))
+        case = "json_decode_lazy_ids_{}".format(n)
+        if jsoncodec.simdjson is None:
+            cases.append((case, None, "simdjson is not installed"))
+        else:
+            #a typical lazy access pattern: only the ids are used
+            ids = lambda r=raw: [rec['identifier'] for rec in jsoncodec.loads_lazy(r)['results']]
+            cases.append((case, lambda f=ids: _plain(f), args.repeat))
+    return cases
+
+@benchmark
+def bench_thumbnails(args):
+    try:
+        core._get_image_engine()
+    except ImportError as e:
+        return [("thumbnail_decode", None, str(e)), ("thumbnail_fetch_32", None, str(e))]
+    png = make_png()
+    @contextlib.contextmanager
+    def fetch_case():
+        with MockGBDXServer(latency=args.latency):
+            sess = requests.Session()
+            ids = ["1030010000{:06d}".format(i) for i in range(32)]
+            yield lambda: list(gbdx.get_thumbnails(sess, ids))
+    return [("thumbnail_decode", lambda: _plain(lambda: core._decode_img(png)), args.repeat*5),
+            ("thumbnail_fetch_32", fetch_case, args.repeat)]
+
+@benchmark
+def bench_workflows(args):
+    @contextlib.contextmanager
+    def fanout_case(workers):
+        with MockGBDXServer(workflows=100, latency=args.latency):
+            sess = requests.Session()
+            gbdx.configure_transport(sess, pool_size=workers)
+            def fanout():
+                #search_workflows prints a blank line when done
+                with contextlib.redirect_stdout(io.StringIO()):
+                    gbdx.search_workflows(sess, details=True, max_workers=workers)
+            yield fanout
+    @contextlib.contextmanager
+    def submit_case(workers):
+        template = WorkflowTemplate("bench_{n}")
+        template.add_task("t1", "MockTask0", inputs={'data': "s3://bucket/{n}"})
+        params = [{'n': n} for n in range(100)]
+        with MockGBDXServer(latency=args.latency):
+            sess = requests.Session()
+            gbdx.configure_transport(sess, pool_size=workers)
+            registry = TaskRegistry(path=None)
+            yield lambda: submit_workflows(sess, template, params, max_workers=workers,
+                                           rate_limiter=False, registry=registry)
+    cases = [("workflow_fanout_100_w{}".format(w), lambda w=w: fanout_case(w), args.repeat)
+             for w in (1, 8, 32)]
+    cases.extend(("workflow_submit_100_w{}".format(w), lambda w=w: submit_case(w), args.repeat)
+                 for w in (1, 8))
+    return cases
+
+def _git_commit():
+    try:
+        out = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                      cwd=PACKAGE_DIR, stderr=subprocess.STDOUT)
+        return out.decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(args):
+    """
+    Runs the selected benchmarks
+    @return: The report dictionary, with 'meta' and 'results' keys
+    """
+    results = {}
+    for (group, func) in BENCHMARKS:
+        if args.filter and group not in args.filter:
+            continue
+        for (name, setup, repeat) in func(args):
+            if setup is None:
+                print("{:<36} skipped: {}".format(name, repeat))
+                results[name] = {'skipped': repeat}
+                continue
+            with setup() as timed:
+                results[name] = time_case(timed, repeat)
+            print("{:<36} median {:9.2f} ms   min {:9.2f} ms   n={}".format(
+                  name, 1000*results[name]['median'], 1000*results[name]['min'], repeat))
+            sys.stdout.flush()
+    meta = {'timestamp': datetime.datetime.utcnow().isoformat() + "Z",
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'latency': args.latency,
+            'quick': args.quick}
+    return {'meta': meta, 'results': results}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline gbdx benchmarks")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="timings per case")
+    parser.add_argument("-f", "--filter", nargs="*",
+                        help="benchmark groups to run: " + ", ".join(g for (g, _) in BENCHMARKS))
+    parser.add_argument("--latency", type=float, default=0.005,
+                        help="simulated API latency, in seconds")
+    parser.add_argument("--quick", action="store_true", help="skip the largest sizes")
+    args = parser.parse_args(argv)
+    report = run(args)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print("Results written to {}".format(args.output))
+    return report
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,38 @@
 """
 This is the top-level package for the GBDX python interface library.
+
+Names that need heavy dependencies (gbdx_auth for get_session, shapely
+and numpy for the query classes) are imported on first use, so that
+importing gbdx stays fast for callers that don't need them.
 """
+import importlib
 
 from .constants import *
-from gbdx_auth.gbdx_auth import get_session
+from .transport import Transport, CircuitOpenError, \
+                       configure_transport, get_transport
 from .core import get_json, post_json, get_s3creds, \
                 get_order_status, get_catalog_record, \
-                get_thumbnail, order_images
-from .query import GBDXQuery, GBDXQueryResult
+                get_thumbnail, order_images, \
+                get_catalog_records, get_thumbnails
 from .tasks import get_task_definition, list_available_tasks, \
                    search_workflows, get_workflow_status, \
-                   summarize_workflow_tasks
+                   summarize_workflow_tasks, iter_workflow_statuses, \
+                   submit_workflow
+
+#name -> module that provides it, imported lazily by the module __getattr__ (PEP 562)
+_LAZY_ATTRIBUTES = {
+    'get_session': 'gbdx_auth.gbdx_auth',
+    'get_cached_session': 'gbdx.auth',
+    'GBDXQuery': 'gbdx.query',
+    'GBDXQueryResult': 'gbdx.query',
+}
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module 'gbdx' has no attribute '{}'".format(name))
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
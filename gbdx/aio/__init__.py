@@ -0,0 +1,16 @@
+"""
+An asyncio interface to the GBDX platform, mirroring the blocking
+functions in gbdx.core, gbdx.query and gbdx.tasks. It requires
+python 3 and the aiohttp library. For example:
+
+    client = AsyncClient(gbdx.get_session())
+    async with client:
+        res = await query(client, gbdx.GBDXQuery(gbdx.TEST_AOI))
+"""
+
+from .client import AsyncClient, get_json, post_json
+from .core import get_s3creds, get_order_status, get_catalog_record, \
+                  get_thumbnail, order_images
+from .query import query, query_tiled
+from .tasks import get_task_definition, list_available_tasks, \
+                   search_workflows, get_workflow_status
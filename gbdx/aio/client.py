@@ -0,0 +1,187 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+A pooled asyncio HTTP client for the GBDX platform, with the same
+retry behavior as gbdx.transport.Transport.
+'''
+import asyncio
+import random
+import time
+
+import aiohttp
+
+from gbdx import jsoncodec
+from gbdx.transport import Transport
+from gbdx.instrumentation import get_metrics, endpoint_name, RequestEvent
+
+class AsyncClient(object):
+    """
+    Wraps one aiohttp.ClientSession (and so one connection pool) that is
+    shared by all the gbdx.aio calls made with this client. The OAuth token
+    is read from the gbdx session before every request. A session from
+    gbdx.get_cached_session() swaps in a fresh token before the current one
+    expires; the token of a gbdx_auth session is used as is, since that
+    session only refreshes it when it sends a request itself.
+    """
+    def __init__(self, session, pool_size=100, timeout=60,
+                 max_retries=3, backoff_factor=0.5, max_backoff=30, metrics=None):
+        """
+        Constructor
+        @param session: The gbdx session, from gbdx_auth.get_session or
+        gbdx.get_cached_session (for clients that outlive a token), or an
+        access token string.
+        @param pool_size: The maximum number of simultaneous connections
+        @param timeout: The default total timeout of a request, in seconds
+        @param max_retries: The number of times a request is retried after a
+        connection error, a timeout, or a 429/5xx response.
+        @param backoff_factor: Retry n waits about backoff_factor*2**n seconds.
+        @param max_backoff: The upper bound, in seconds, of a single wait.
+        @param metrics: See gbdx.transport.Transport
+        """
+        self.session = session
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.metrics = get_metrics() if metrics is None else metrics
+        self._http = None
+
+    def _access_token(self):
+        if isinstance(self.session, str):
+            return self.session
+        return self.session.token['access_token']
+
+    @property
+    def http(self):
+        """
+        The underlying aiohttp.ClientSession, created on first use
+        """
+        if self._http is None or self._http.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self._http = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._http
+
+    async def close(self):
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _backoff(self, attempt, ret=None):
+        delay = None
+        if ret is not None:
+            try:
+                delay = float(ret.headers.get('Retry-After'))
+            except (TypeError, ValueError):
+                delay = None
+        if delay is None:
+            delay = self.backoff_factor*(2**attempt)
+            delay += random.uniform(0, delay/2.0)
+        await asyncio.sleep(min(delay, self.max_backoff))
+
+    async def request(self, method, url, data=None, headers=None,
+                      idempotent=True, read=None):
+        """
+        Sends a request, retrying transient failures, and returns the
+        result of awaiting read(response), or the response body bytes
+        if read is None. The body has already been read when read is
+        called, so ret.read() returns it without further I/O. Raises
+        aiohttp.ClientResponseError for error responses.
+        @param idempotent: If False, the request is only retried on a 429
+        response, which indicates that it was not processed.
+        """
+        if not self.metrics:
+            return await self._send(method, url, data, headers, idempotent, read, [0, None, None])
+
+        self.metrics.request_started()
+        t0 = time.perf_counter()
+        outcome = [0, None, None]   #attempts, last response, body bytes read
+        error = None
+        try:
+            return await self._send(method, url, data, headers, idempotent, read, outcome)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            ret = outcome[1]
+            status = getattr(error, 'status', None) if ret is None else ret.status
+            #content_length is None for a chunked response, so the body read counts first
+            bytes_in = outcome[2]
+            if bytes_in is None and ret is not None:
+                bytes_in = ret.content_length
+            self.metrics.request_finished(RequestEvent(
+                method, endpoint_name(url), status, time.perf_counter() - t0,
+                len(data) if data is not None else 0, bytes_in, outcome[0], error))
+
+    async def read_json(self, ret):
+        """
+        Reads and decodes a json response, reporting the decode time to
+        this client's metrics. Use as the read argument of request().
+        """
+        body = await ret.read()
+        if not self.metrics:
+            return jsoncodec.loads(body)
+        t0 = time.perf_counter()
+        data = jsoncodec.loads(body)
+        self.metrics.observe_decode(endpoint_name(str(ret.url)), time.perf_counter() - t0)
+        return data
+
+    async def _send(self, method, url, data, headers, idempotent, read, outcome):
+        """
+        The retry loop of request(). outcome is updated with the number
+        of requests sent, the last response and the length of its body.
+        """
+        attempt = 0
+        while True:
+            outcome[0] = attempt + 1
+            hdrs = dict(headers or {})
+            hdrs['Authorization'] = "Bearer {}".format(self._access_token())
+            try:
+                async with self.http.request(method, url, data=data, headers=hdrs) as ret:
+                    outcome[1] = ret
+                    outcome[2] = None
+                    status = ret.status
+                    retryable = status in Transport.RETRY_STATUSES and \
+                                (idempotent or status == 429)
+                    if not retryable or attempt >= self.max_retries:
+                        ret.raise_for_status()
+                        body = await ret.read()
+                        outcome[2] = len(body)
+                        if read is None:
+                            return body
+                        return await read(ret)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if not idempotent or attempt >= self.max_retries:
+                    raise
+                ret = None
+            await self._backoff(attempt, ret)
+            attempt += 1
+
+async def get_json(client, url):
+    """
+    Async counterpart of gbdx.core.get_json
+    @param client: An AsyncClient
+    """
+    headers = {'Content-type': 'application/json'}
+    return await client.request('GET', url, headers=headers, read=client.read_json)
+
+async def post_json(client, url, payload, idempotent=True):
+    """
+    Async counterpart of gbdx.core.post_json
+    @param client: An AsyncClient
+    """
+    headers = {'Content-type': 'application/json'}
+    return await client.request('POST', url, data=payload, headers=headers,
+                                idempotent=idempotent, read=client.read_json)
+
+if __name__ == '__main__':
+    pass
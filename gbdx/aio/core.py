@@ -0,0 +1,51 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+Async counterparts of the wrappers in gbdx.core
+'''
+import asyncio
+
+from gbdx import core, jsoncodec, urls
+from gbdx.aio.client import get_json, post_json
+
+async def get_s3creds(client, duration=3600):
+    s3_data = await get_json(client, urls.s3creds_url(duration))
+    s3_url = "s3://{bucket}/{prefix}".format(**s3_data)
+    return (s3_url, s3_data)
+
+async def order_images(client, cat_id_list):
+    """
+    Places an order for the list of catalog ids.
+    See gbdx.core.order_images
+    """
+    payload = jsoncodec.dumps(cat_id_list)
+    return await post_json(client, urls.orders_url(), payload, idempotent=False)
+
+async def get_order_status(client, soli):
+    """
+    Retrieves the status information for a specified imagery order.
+    See gbdx.core.get_order_status
+    """
+    return await get_json(client, urls.order_status_url(soli))
+
+async def get_catalog_record(client, cat_id):
+    """
+    Retrieves the catalog record for the image with given cat_id.
+    See gbdx.core.get_catalog_record
+    """
+    return await get_json(client, urls.catalog_record_url(cat_id))
+
+async def get_thumbnail(client, cat_id):
+    """
+    Gets the catalog thumbnail for a given catalog id, decoded
+    as a numpy ndarray. See gbdx.core.get_thumbnail
+    """
+    buf = await client.request('GET', urls.thumbnail_url(cat_id))
+    #decoding is CPU bound, so it runs in the default executor rather
+    #than stalling the other requests on the event loop
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, core._decode_img, buf)
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,58 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+Async counterparts of the GBDXQuery query methods
+'''
+import asyncio
+
+from gbdx import jsoncodec, urls
+from gbdx.query import GBDXQueryResult, merge_search_responses
+from gbdx.aio.client import post_json
+
+async def _run_search(client, qry, search_body):
+    #the SQLite cache is read and written in the default executor, so that
+    #disk I/O doesn't block the event loop
+    loop = asyncio.get_running_loop()
+    cache = await loop.run_in_executor(None, qry._get_query_cache)
+    if cache is not None:
+        json_res = await loop.run_in_executor(None, cache.get, search_body,
+                                              qry._get_query_cache_ttl())
+        if json_res is not None:
+            return json_res
+    json_res = await post_json(client, urls.catalog_search_url(), jsoncodec.dumps(search_body))
+    if cache is not None:
+        await loop.run_in_executor(None, cache.put, search_body, json_res)
+    return json_res
+
+async def query(client, qry):
+    """
+    Async counterpart of GBDXQuery.query(), sharing its result cache.
+    @param client: A gbdx.aio.AsyncClient
+    @param qry: A GBDXQuery
+    @return: A GBDXQueryResult
+    """
+    return GBDXQueryResult(await _run_search(client, qry, qry.search_body))
+
+async def query_tiled(client, qry, grid=(2,2), max_concurrent=8):
+    """
+    Async counterpart of GBDXQuery.query_tiled()
+    @param client: A gbdx.aio.AsyncClient
+    @param qry: A GBDXQuery
+    @param grid: (num_cols, num_rows) of the tiling grid
+    @param max_concurrent: The maximum number of searches in flight
+    @return: A GBDXQueryResult for the whole AOI
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def search_tile(tile):
+        body = dict(qry.search_body)
+        body['searchAreaWkt'] = tile.wkt
+        async with semaphore:
+            return await _run_search(client, qry, body)
+
+    responses = await asyncio.gather(*[search_tile(t) for t in qry._get_tiles(grid)])
+    return GBDXQueryResult(merge_search_responses(responses))
+
+if __name__ == '__main__':
+    pass
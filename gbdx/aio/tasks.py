@@ -0,0 +1,60 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+Async counterparts of the task and workflow functions in gbdx.tasks
+'''
+import asyncio
+
+from gbdx import GBDX_WORKFLOW_STATES, jsoncodec, urls
+from gbdx.aio.client import get_json, post_json
+
+async def list_available_tasks(client):
+    """
+    lists the available tasks on the gbdx platform
+    """
+    ret = await get_json(client, urls.tasks_url())
+    return ret["tasks"]
+
+async def get_task_definition(client, task_name):
+    """
+    Gets the definition of a task
+    """
+    return await get_json(client, urls.tasks_url(task_name))
+
+async def get_workflow_status(client, workflow_id):
+    """
+    retrieves the status for a given workflow
+    """
+    return await get_json(client, urls.workflow_url(workflow_id))
+
+async def search_workflows(client, state="all", owner=None, lookback_h=3,
+                           details=False, max_concurrent=8):
+    """
+    Lists the workflows that are in a given state.
+    See gbdx.tasks.search_workflows
+    @return: (workflow_ids, statuses), where statuses is a dictionary
+    {workflow_id: status or exception}, only if details=True, else None.
+    """
+    state = state.lower()
+    assert state in GBDX_WORKFLOW_STATES
+    search_filter = {"state":state, "lookback_h":lookback_h}
+    if owner:
+        search_filter["owner"] = owner
+    ret = await post_json(client, urls.workflow_search_url(), jsoncodec.dumps(search_filter))
+    workflow_ids = ret['Workflows']
+    statuses = None
+    if details:
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async def status(wf_id):
+            async with semaphore:
+                return await get_workflow_status(client, wf_id)
+
+        results = await asyncio.gather(*[status(w) for w in workflow_ids],
+                                       return_exceptions=True)
+        statuses = dict(zip(workflow_ids, results))
+    return (workflow_ids, statuses)
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,234 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+A GBDX access token cache that is shared by all the processes of a
+user, so that a pool of workers authenticates once instead of once per
+worker. The token is stored in a file, and reused until shortly before
+it expires. Refreshing is serialized with a file lock: the first process
+to find the token stale fetches a new one (with gbdx_auth), and the others
+wait for it, then read the new token. For example, in each worker:
+
+    session = gbdx.get_cached_session()
+    res = gbdx.GBDXQuery(aoi).query(session)
+'''
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+import contextlib
+
+import requests
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None    #no file locking (Windows), refreshes are only serialized per process
+
+DEFAULT_TOKEN_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".gbdx")
+DEFAULT_REFRESH_MARGIN = 300    #seconds before expiry at which the token is refreshed
+DEFAULT_TOKEN_LIFETIME = 3600   #seconds, assumed for a token without an expiry
+
+def fetch_token(config_file=None):
+    """
+    Authenticates with gbdx_auth, using the credentials in the gbdx config file
+    @return: The OAuth2 token dictionary, with 'access_token' and 'expires_at'
+    """
+    from gbdx_auth.gbdx_auth import get_session
+    if config_file is None:
+        return dict(get_session().token)
+    return dict(get_session(config_file).token)
+
+def default_token_cache_path(config_file=None):
+    """
+    The token file for a gbdx config file, so that different accounts
+    don't share a token
+    """
+    if config_file is None:
+        return os.path.join(DEFAULT_TOKEN_CACHE_DIR, "token.json")
+    key = hashlib.sha1(os.path.abspath(config_file).encode('utf-8')).hexdigest()[0:12]
+    return os.path.join(DEFAULT_TOKEN_CACHE_DIR, "token_{}.json".format(key))
+
+class TokenCache(object):
+    """
+    An access token stored in a file shared by processes, see the module docstring
+    """
+    def __init__(self, path=None, fetch=fetch_token, refresh_margin=DEFAULT_REFRESH_MARGIN,
+                 clock=time.time):
+        """
+        Constructor
+        @param path: The token file. The lock file is the same path plus '.lock'.
+        If None, the default file from default_token_cache_path() is used.
+        @param fetch: The function called, without arguments, to get a new token
+        dictionary. It must have 'access_token', and should have either
+        'expires_at' (epoch seconds) or 'expires_in'. Otherwise, the token is
+        assumed to expire DEFAULT_TOKEN_LIFETIME seconds after it was fetched.
+        @param refresh_margin: The token is refreshed when it expires within
+        this many seconds
+        @param clock: The time function, which can be replaced for testing
+        """
+        self.path = path or default_token_cache_path()
+        self.fetch = fetch
+        self.refresh_margin = refresh_margin
+        self.clock = clock
+        self.refresh_count = 0  #number of tokens fetched by this process
+        self._lock = threading.Lock()
+
+    def read(self):
+        """
+        @return: The stored token dictionary, or None if there is none
+        """
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return None
+
+    def expires_at(self, token):
+        """
+        @return: The expiry time of a token, in epoch seconds. Without an
+        'expires_at', it is computed from 'expires_in' (or the default
+        lifetime) and the time the token was fetched, if known, else 0.
+        """
+        try:
+            return float(token['expires_at'])
+        except (KeyError, TypeError, ValueError):
+            pass
+        try:
+            fetched_at = float(token['fetched_at'])
+        except (KeyError, TypeError, ValueError):
+            return 0
+        try:
+            lifetime = float(token['expires_in'])
+        except (KeyError, TypeError, ValueError):
+            lifetime = DEFAULT_TOKEN_LIFETIME
+        return fetched_at + lifetime
+
+    def is_fresh(self, token):
+        """
+        True if the token doesn't expire within the refresh margin
+        """
+        return token is not None and \
+               self.expires_at(token) - self.refresh_margin > self.clock()
+
+    @contextlib.contextmanager
+    def _locked(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            self._makedirs()
+            with open(self.path + ".lock", 'a') as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _makedirs(self):
+        token_dir = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.isdir(token_dir):
+            os.makedirs(token_dir)
+
+    def _write(self, token):
+        self._makedirs()
+        (fd, tmp_path) = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)),
+                                          suffix=".tmp")
+        #mkstemp creates the file readable by its owner only
+        with os.fdopen(fd, 'w') as f:
+            json.dump(token, f)
+        os.replace(tmp_path, self.path)
+
+    def get_token(self, stale=None):
+        """
+        Returns a fresh token, fetching a new one only if the stored token
+        is missing or stale, and no other process has refreshed it meanwhile
+        @param stale: A token known to be invalid (e.g. rejected with a 401
+        response), which is refreshed even if it hasn't expired
+        """
+        token = self.read()
+        if self.is_fresh(token) and token != stale:
+            return token
+        with self._locked():
+            #another process may have refreshed the token while we waited
+            token = self.read()
+            if self.is_fresh(token) and token != stale:
+                return token
+            token = dict(self.fetch())
+            token['fetched_at'] = self.clock()
+            token['expires_at'] = self.expires_at(token)
+            self._write(token)
+            self.refresh_count += 1
+            return token
+
+    def invalidate(self):
+        """
+        Removes the stored token, so that the next get_token() fetches a new one
+        """
+        with self._locked():
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+class CachedTokenSession(requests.Session):
+    """
+    A requests session that authenticates with the token from a TokenCache.
+    The token is swapped for a fresh one before it expires, and a request
+    rejected with a 401 response is retried once with a new token.
+    """
+    def __init__(self, token_cache):
+        requests.Session.__init__(self)
+        self.token_cache = token_cache
+        self._token = token_cache.get_token()
+
+    @property
+    def token(self):
+        """
+        The current token dictionary, as on a gbdx_auth session
+        """
+        if not self.token_cache.is_fresh(self._token):
+            self._token = self.token_cache.get_token()
+        return self._token
+
+    def request(self, method, url, **kwargs):
+        ret = self._send_with_token(self.token, method, url, kwargs)
+        if ret.status_code == 401:
+            self._token = self.token_cache.get_token(stale=self._token)
+            ret = self._send_with_token(self._token, method, url, kwargs)
+        return ret
+
+    def _send_with_token(self, token, method, url, kwargs):
+        #per-request headers, since the session may be shared by threads
+        headers = dict(kwargs.get('headers') or {})
+        headers['Authorization'] = "Bearer {}".format(token['access_token'])
+        return requests.Session.request(self, method, url, **dict(kwargs, headers=headers))
+
+_TOKEN_CACHES = {}
+_TOKEN_CACHES_LOCK = threading.Lock()
+
+def get_token_cache(config_file=None):
+    """
+    Returns the process-wide TokenCache for a gbdx config file, creating it on first use.
+    """
+    with _TOKEN_CACHES_LOCK:
+        cache = _TOKEN_CACHES.get(config_file)
+        if cache is None:
+            cache = _TOKEN_CACHES[config_file] = TokenCache(
+                default_token_cache_path(config_file),
+                fetch=lambda: fetch_token(config_file))
+        return cache
+
+def get_cached_session(config_file=None, token_cache=None):
+    """
+    A drop-in replacement for gbdx.get_session() that shares the access
+    token with the other processes of the user, see the module docstring
+    @param config_file: The gbdx config file with the credentials, if not the default
+    @param token_cache: A TokenCache. If None, the one from get_token_cache() is used.
+    """
+    return CachedTokenSession(token_cache or get_token_cache(config_file))
+
+if __name__ == '__main__':
+    pass
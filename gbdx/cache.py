@@ -0,0 +1,217 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+A persistent, process-shared cache for catalog query results.
+Results are stored as compressed json in an SQLite database, keyed
+by a hash of the canonicalized search body, so that any query object
+(in any process) with the same search parameters can reuse them.
+'''
+import os
+import json
+import time
+import zlib
+import hashlib
+import warnings
+import sqlite3
+import threading
+
+from gbdx import jsoncodec
+from gbdx.instrumentation import get_metrics
+
+DEFAULT_QUERY_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".gbdx",
+                                        "query_cache.sqlite")
+DEFAULT_QUERY_CACHE_TTL = 300  #seconds
+DEFAULT_QUERY_CACHE_MAX_BYTES = 256*1024*1024
+
+def canonical_search_key(search_body):
+    """
+    Computes a stable content hash for a catalog search body. Keys
+    are sorted and the (AND-ed) filter list is put in a canonical order,
+    so that equivalent searches map to the same key.
+    @param search_body: The search criteria dictionary, as
+    found in GBDXQuery.search_body
+    @return: A hex digest string
+    """
+    body = dict(search_body)
+    if body.get('filters'):
+        body['filters'] = sorted(f.strip() for f in body['filters'])
+    canonical = json.dumps(body, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+class QueryCache(object):
+    """
+    An on-disk cache of catalog search responses with a time-to-live,
+    a size-bounded least-recently-used eviction policy, and hit/miss
+    counters. It is safe to share between threads and processes.
+    """
+    def __init__(self, path=DEFAULT_QUERY_CACHE_PATH,
+                 ttl=DEFAULT_QUERY_CACHE_TTL,
+                 max_bytes=DEFAULT_QUERY_CACHE_MAX_BYTES):
+        """
+        Constructor
+        @param path: The SQLite database file. Its directory is created
+        if needed.
+        @param ttl: Seconds for which a cached response is considered valid
+        @param max_bytes: When the total size of the (compressed) entries
+        exceeds this value, the least recently used entries are evicted.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        cache_dir = os.path.dirname(os.path.abspath(path))
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("""CREATE TABLE IF NOT EXISTS query_cache (
+                                    key TEXT PRIMARY KEY,
+                                    created REAL NOT NULL,
+                                    accessed REAL NOT NULL,
+                                    size INTEGER NOT NULL,
+                                    data BLOB NOT NULL)""")
+                conn.execute("""CREATE INDEX IF NOT EXISTS query_cache_accessed
+                                ON query_cache (accessed)""")
+        finally:
+            conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _count(self, hit):
+        get_metrics().cache_event('query', hit)
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, search_body, ttl=None):
+        """
+        Returns the cached json response for the search body, or None
+        if there is no unexpired entry.
+        @param ttl: Overrides the ttl of the cache for this lookup
+        """
+        raw = self.get_raw(search_body, ttl)
+        return None if raw is None else jsoncodec.loads(raw)
+
+    def get_raw(self, search_body, ttl=None):
+        """
+        As get(), but returns the json bytes of the response without decoding them
+        """
+        ttl = self.ttl if ttl is None else ttl
+        key = canonical_search_key(search_body)
+        now = time.time()
+        row = None
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    row = conn.execute("SELECT created, data FROM query_cache WHERE key=?",
+                                       (key,)).fetchone()
+                    if row is not None and row[0] + ttl < now:
+                        conn.execute("DELETE FROM query_cache WHERE key=?", (key,))
+                        row = None
+                    elif row is not None:
+                        conn.execute("UPDATE query_cache SET accessed=? WHERE key=?",
+                                     (now, key))
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            row = None
+        if row is None:
+            self._count(False)
+            return None
+        self._count(True)
+        return zlib.decompress(row[1])
+
+    def put(self, search_body, json_res):
+        """
+        Stores a json response for the search body, evicting least
+        recently used entries if the cache has grown beyond max_bytes.
+        """
+        self.put_raw(search_body, jsoncodec.dumps(json_res))
+
+    def put_raw(self, search_body, raw):
+        """
+        As put(), for the json bytes of a response, as received
+        """
+        key = canonical_search_key(search_body)
+        data = zlib.compress(raw)
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("INSERT OR REPLACE INTO query_cache VALUES (?,?,?,?,?)",
+                                 (key, now, now, len(data), sqlite3.Binary(data)))
+                    self._evict(conn)
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size),0) FROM query_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute("SELECT key, size FROM query_cache ORDER BY accessed").fetchall()
+        for (key, size) in rows:
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM query_cache WHERE key=?", (key,))
+            total -= size
+
+    def clear(self):
+        """
+        Removes all entries and resets the hit/miss counters
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM query_cache")
+        finally:
+            conn.close()
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def stats(self):
+        """
+        @return: A dictionary with the number of entries, their total size
+        in bytes, and the hit/miss counts of this cache object.
+        """
+        conn = self._connect()
+        try:
+            (entries, size) = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size),0) FROM query_cache").fetchone()
+        finally:
+            conn.close()
+        return {'entries': entries, 'bytes': size,
+                'hits': self.hits, 'misses': self.misses}
+
+_DEFAULT_QUERY_CACHE = None
+_DEFAULT_QUERY_CACHE_LOCK = threading.Lock()
+
+def get_default_query_cache():
+    """
+    Returns the process-wide default QueryCache, creating it on first use.
+    If the cache can't be created (e.g. a read-only home directory), a
+    warning is issued once and None is returned, so queries run uncached.
+    """
+    global _DEFAULT_QUERY_CACHE
+    with _DEFAULT_QUERY_CACHE_LOCK:
+        if _DEFAULT_QUERY_CACHE is None:
+            try:
+                _DEFAULT_QUERY_CACHE = QueryCache(DEFAULT_QUERY_CACHE_PATH)
+            except (OSError, sqlite3.Error) as e:
+                warnings.warn("Query cache disabled, unable to open {}: {}".format(
+                              DEFAULT_QUERY_CACHE_PATH, e))
+                _DEFAULT_QUERY_CACHE = False
+        return _DEFAULT_QUERY_CACHE or None
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,206 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+A columnar (struct-of-arrays) view of catalog query results,
+for fast vectorized filtering, sorting and ranking of scenes,
+with optional export to Apache Arrow or pandas.
+'''
+import numpy as np
+
+#catalog properties that are converted to float columns
+NUMERIC_PROPERTIES = ('cloudCover', 'offNadirAngle', 'panResolution',
+                      'multiResolution', 'sunAzimuth', 'sunElevation',
+                      'targetAzimuth')
+#catalog properties that are converted to datetime64 columns
+TIMESTAMP_PROPERTIES = ('timestamp', 'acquisitionDate', 'browseTimestamp')
+BOUNDS_COLUMNS = ('minx', 'miny', 'maxx', 'maxy')
+#the off-nadir angle (degrees) at which a scene gets the full nadir penalty
+MAX_OFF_NADIR_ANGLE = 45.0
+
+def _to_float(values):
+    out = np.empty(len(values), dtype=np.float64)
+    for (i, v) in enumerate(values):
+        try:
+            out[i] = float(v)
+        except (TypeError, ValueError):
+            out[i] = np.nan
+    return out
+
+def _to_datetime(values):
+    out = np.empty(len(values), dtype='datetime64[ms]')
+    for (i, v) in enumerate(values):
+        try:
+            out[i] = np.datetime64(v.rstrip('Z'), 'ms')
+        except (AttributeError, TypeError, ValueError):
+            out[i] = np.datetime64('NaT')
+    return out
+
+def _missing(col):
+    if col.dtype.kind == 'f':
+        return np.isnan(col)
+    if col.dtype.kind == 'M':
+        return np.isnat(col)
+    if col.dtype.kind == 'O':
+        return np.array([v is None or v != v for v in col], dtype=bool)
+    return np.zeros(len(col), dtype=bool)
+
+def _sort_keys(col, descending):
+    """
+    Returns the (rank, missing) lexsort keys of a column. The present values
+    are replaced by their rank, which can be negated whatever the dtype, and
+    missing values (NaN, NaT, None) are flagged, so that they sort last.
+    """
+    missing = _missing(col)
+    rank = np.zeros(len(col), dtype=np.int64)
+    if not missing.all():
+        rank[~missing] = np.unique(col[~missing], return_inverse=True)[1].ravel()
+    return (-rank if descending else rank, missing)
+
+class QueryColumns(object):
+    """
+    A set of equal-length numpy arrays, one per catalog property, plus
+    an 'identifier' column and, optionally, the footprint bounds.
+    Use ordinary numpy expressions on the columns to build masks, e.g.:
+    cols.filter((cols['cloudCover'] < 3) & (cols['offNadirAngle'] < 10)).sort_by('timestamp')
+    """
+    def __init__(self, columns):
+        """
+        Constructor
+        @param columns: A dictionary {name: ndarray}, with all arrays of equal length
+        """
+        self.columns = columns
+
+    @classmethod
+    def from_records(cls, records, bounds=None):
+        """
+        Flattens the properties of catalog records into typed columns, in a
+        single pass over the records. Records need not share the same keys;
+        missing values become NaN, NaT or None.
+        @param records: A list of catalog record dictionaries
+        @param bounds: Optional (N, 4) array of footprint bounds, one row per record
+        """
+        n = len(records)
+        raw = {}
+        for (i, rec) in enumerate(records):
+            for (key, value) in rec['properties'].items():
+                if key not in raw:
+                    raw[key] = [None]*n
+                raw[key][i] = value
+
+        columns = {'identifier': np.array([rec['identifier'] for rec in records], dtype=object)}
+        for (key, values) in raw.items():
+            if key in NUMERIC_PROPERTIES:
+                columns[key] = _to_float(values)
+            elif key in TIMESTAMP_PROPERTIES:
+                columns[key] = _to_datetime(values)
+            else:
+                col = np.empty(n, dtype=object)
+                col[:] = values
+                columns[key] = col
+        if bounds is not None:
+            for (j, name) in enumerate(BOUNDS_COLUMNS):
+                columns[name] = np.asarray(bounds)[:, j]
+        return cls(columns)
+
+    def __len__(self):
+        return len(self.columns['identifier'])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def keys(self):
+        """
+        Lists the column names
+        """
+        return sorted(self.columns.keys())
+
+    @property
+    def ids(self):
+        """
+        The identifiers (cat_ids) of the rows, in row order
+        """
+        return self.columns['identifier'].tolist()
+
+    def take(self, indices):
+        """
+        Returns a new QueryColumns with the rows at the given indices
+        """
+        return QueryColumns(dict((k, v[indices]) for (k, v) in self.columns.items()))
+
+    def filter(self, mask):
+        """
+        Returns a new QueryColumns with only the rows where mask is True
+        @param mask: A boolean array, typically built from column comparisons
+        """
+        return self.take(np.flatnonzero(np.asarray(mask, dtype=bool)))
+
+    def sort_by(self, *names, **kwargs):
+        """
+        Returns a new QueryColumns sorted by one or more columns. The first
+        name is the primary sort key. Missing values (NaN/NaT/None) sort last
+        in either order, and rows with equal keys keep their order.
+        @keyword descending: If True, sort in descending order
+        """
+        descending = kwargs.get('descending', False)
+        #np.lexsort uses the last key as the primary one
+        keys = []
+        for name in reversed(names):
+            keys.extend(_sort_keys(self.columns[name], descending))
+        return self.take(np.lexsort(keys))
+
+    def scene_costs(self, cloud_weight=1.0, nadir_weight=0.5, age_weight=0.25):
+        """
+        Computes a cost per row for scene selection, lower being better:
+        1 + cloud_weight*cloudCover/100 + nadir_weight*offNadirAngle/45
+          + age_weight*(years older than the newest scene)
+        Missing values get the worst penalty of their column, e.g. a scene
+        without a cloudCover is costed as fully cloudy.
+        @return: A float array, one cost per row
+        """
+        n = len(self)
+        costs = np.ones(n)
+        if cloud_weight and 'cloudCover' in self.columns:
+            cloud = np.clip(np.nan_to_num(self.columns['cloudCover'], nan=100.0), 0, 100)
+            costs += cloud_weight*cloud/100.0
+        elif cloud_weight:
+            costs += cloud_weight
+        if nadir_weight and 'offNadirAngle' in self.columns:
+            nadir = np.nan_to_num(np.abs(self.columns['offNadirAngle']), nan=MAX_OFF_NADIR_ANGLE)
+            costs += nadir_weight*np.minimum(nadir, MAX_OFF_NADIR_ANGLE)/MAX_OFF_NADIR_ANGLE
+        elif nadir_weight:
+            costs += nadir_weight
+        if age_weight and 'timestamp' in self.columns and n:
+            ts = self.columns['timestamp']
+            valid = ~np.isnat(ts)
+            if valid.any():
+                age_ms = (ts[valid].max() - ts).astype(np.float64)
+                age = age_ms/(365.25*24*3600*1000)
+                costs += age_weight*np.where(valid, age, age[valid].max())
+        return costs
+
+    def to_arrow(self):
+        """
+        Returns the columns as a pyarrow Table
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("You must have the pyarrow library installed for Arrow export.")
+        return pa.table(dict((k, self.columns[k]) for k in self.keys()))
+
+    def to_dataframe(self):
+        """
+        Returns the columns as a pandas DataFrame, indexed by identifier
+        """
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError("You must have the pandas library installed for DataFrame export.")
+        return pd.DataFrame(dict((k, self.columns[k]) for k in self.keys())).set_index('identifier')
+
+if __name__ == '__main__':
+    pass
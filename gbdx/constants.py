@@ -12,6 +12,10 @@ GBDX_WORKFLOW_STATES = ("submitted", "scheduled", "started",
                         "succeeded", "timedout", "pending",
                         "running", "complete", "all")
 
+#workflow states (or state events) after which a workflow won't change
+GBDX_WORKFLOW_TERMINAL_STATES = ("canceled", "failed", "succeeded",
+                                 "timedout", "complete")
+
 
 DG_SENSOR_WV3 = "WORLDVIEW03"
 DG_SENSOR_WV2 = "WORLDVIEW02"
@@ -6,50 +6,37 @@ This module exposes convenience functions that
 are wrappers to various GBDX RESTful API calls.
 """
 from io import BytesIO
-import json
 
-#Fancy importing to allow the user to use
-# either openCV or matplotlib for image rendering
-_IMAGE_ENGINE = None
-try:
-    import pylab as pl
-    _IMAGE_ENGINE = "pylab"
-except ImportError:
-    try:
-        import cv2
-        _IMAGE_ENGINE = "opencv"
-    except ImportError:
-        print("Either pylab (matplotlib) or openCV must be installed \
-            to view thumbnails")
+from gbdx import jsoncodec, urls
+from gbdx.transport import get_transport
+from gbdx.parallel import run_concurrently, DEFAULT_MAX_WORKERS
 
-from gbdx.constants import GBDX_BASE_URL
-
-def get_json(session, url):
+def get_json(session, url, **kwargs):
     """
     Wrapper for session.get() when you want to get
     the results as json. Handles the boiler plate
     code for checking the result status and converting
-    result to json
+    result to json. The request goes through the session's
+    transport, which handles timeouts and retries.
+    @param session: The gbdx session, or a gbdx.transport.Transport
+    @param kwargs: Passed on to Transport.request, e.g. timeout
     """
-    headers = {'Content-type': 'application/json'}
-    ret = session.get(url, headers=headers)
-    ret.raise_for_status()
-    return ret.json()
+    return get_transport(session).get_json(url, **kwargs)
 
-def post_json(session, url, payload):
+def post_json(session, url, payload, **kwargs):
     """
     Wrapper for session.post() when you want to get
     the results as json. Handles the boiler plate
     code for checking the result status and converting
-    the result to json.
+    the result to json. The request goes through the session's
+    transport, which handles timeouts and retries.
+    @param session: The gbdx session, or a gbdx.transport.Transport
+    @param kwargs: Passed on to Transport.request, e.g. timeout
     """
-    headers = {'Content-type': 'application/json'}
-    ret = session.post(url, data=payload, headers=headers)
-    ret.raise_for_status()
-    return ret.json()
+    return get_transport(session).post_json(url, payload, **kwargs)
 
 def get_s3creds(session, duration=3600):
-    url = "/".join([GBDX_BASE_URL, "s3creds","v1","prefix?duration={}".format(duration)])
+    url = urls.s3creds_url(duration)
     s3_data = get_json(session, url)    
     s3_url = "s3://{bucket}/{prefix}".format(**s3_data)
     return (s3_url, s3_data)
@@ -62,9 +49,10 @@ def order_images(session, cat_id_list):
     @note: Use get_order_status function to check on 
     the progress of the order
     """
-    url = "/".join([GBDX_BASE_URL,'orders','v1'])
-    payload = json.dumps(cat_id_list)
-    rc = post_json(session, url, payload)
+    url = urls.orders_url()
+    payload = jsoncodec.dumps(cat_id_list)
+    #placing an order is not idempotent, so don't retry after server errors
+    rc = post_json(session, url, payload, idempotent=False)
     return rc
     
 def get_order_status(session, soli):
@@ -74,7 +62,7 @@ def get_order_status(session, soli):
     @param soli: The order number, or 'soli'
     @return: A dictionary that provides the order status information.
     """
-    url = "/".join([GBDX_BASE_URL,'orders','v1','status',soli])
+    url = urls.order_status_url(soli)
     return get_json(session, url)
 
 def get_catalog_record(session, cat_id):
@@ -85,10 +73,10 @@ def get_catalog_record(session, cat_id):
     @param cat_id: The image catalog id
     @return: A dictionary with the record information or None
     """
-    url = "/".join([GBDX_BASE_URL, "catalog","v1", "record", cat_id])
+    url = urls.catalog_record_url(cat_id)
     return get_json(session, url)
 
-def get_thumbnail(session, cat_id, show=True):
+def get_thumbnail(session, cat_id, show=True, cache=None, mmap=False):
     """
     Gets an openCV image of the catalog thumbnail for a given catalog id. Optionally
     displays that thumbnail in a window.
@@ -96,22 +84,93 @@ def get_thumbnail(session, cat_id, show=True):
     @param cat_id: The catalog id for the image of interest
     @param show: If true, after the thumbnail image is retrieved, it will be displayed
     in a freestanding window.
+    @param cache: An optional gbdx.thumbcache.ThumbnailCache. If provided, the
+    thumbnail is only downloaded and decoded when it is not already cached.
+    @param mmap: If true (and a cache is provided), returns a read-only memory-mapped
+    array backed by the cache directory. See ThumbnailCache.get_image().
     @return: An open-cv image, represented as a numpy ndarray. Can be manipulated using
-    openCV functions, saved to disk, or whatever the user desires.
-    """
-    url = "/".join([GBDX_BASE_URL,'thumbnails','v1','browse',
-                       '{}.medium.png'.format(cat_id)])
-    ret = session.get(url)
-    ret.raise_for_status()
-    buf = ret.content
-    img = _decode_img(buf)
+    openCV functions, saved to disk, or whatever the user desires. When a cache
+    is provided the array is read-only, so copy it before modifying it in place.
+    """
+    fetch = lambda: get_transport(session).get(urls.thumbnail_url(cat_id)).content
+    if cache is not None:
+        img = cache.get_image(cat_id, fetch, _decode_img, mmap=mmap)
+    else:
+        img = _decode_img(fetch())
     if show:
         _show_img(img, window_title=str(cat_id))
     return img
 
+def _unique(ids):
+    seen = set()
+    return [i for i in ids if not (i in seen or seen.add(i))]
+
+def get_catalog_records(session, cat_ids, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Retrieves the catalog records for many catalog ids concurrently.
+    Duplicate ids are only fetched once.
+    @param session: The gbdx session, from gbdx_auth.get_session.
+    @param cat_ids: An iterable of image catalog ids
+    @param max_workers: The maximum number of concurrent requests
+    @return: A generator of (cat_id, record, error) tuples, in the order
+    the requests complete. If the request for an id failed, record is None
+    and error is the exception raised, otherwise error is None.
+    """
+    return run_concurrently(lambda cid: get_catalog_record(session, cid),
+                            _unique(cat_ids), max_workers)
+
+def get_thumbnails(session, cat_ids, max_workers=DEFAULT_MAX_WORKERS, cache=None, mmap=False):
+    """
+    Gets the catalog thumbnails for many catalog ids concurrently.
+    Duplicate ids are only fetched once, and nothing is displayed.
+    @param session: The gbdx session, from gbdx_auth.get_session.
+    @param cat_ids: An iterable of image catalog ids
+    @param max_workers: The maximum number of concurrent requests
+    @param cache: An optional gbdx.thumbcache.ThumbnailCache
+    @param mmap: Return memory-mapped arrays from the cache. See get_thumbnail().
+    @return: A generator of (cat_id, img, error) tuples, in the order
+    the requests complete. See get_thumbnail() for the image format,
+    and get_catalog_records() for the error reporting.
+    """
+    return run_concurrently(lambda cid: get_thumbnail(session, cid, show=False,
+                                                      cache=cache, mmap=mmap),
+                            _unique(cat_ids), max_workers)
+
+#Fancy importing to allow the user to use
+# either openCV or matplotlib for image rendering.
+# The engine is selected, and imported, on first use,
+# so that importing gbdx stays fast.
+_IMAGE_ENGINE = None
+
+def _get_image_engine():
+    global _IMAGE_ENGINE
+    if _IMAGE_ENGINE is None:
+        try:
+            import matplotlib
+            _IMAGE_ENGINE = "pylab"
+        except ImportError:
+            try:
+                import cv2
+                _IMAGE_ENGINE = "opencv"
+            except ImportError:
+                raise ImportError("Either pylab (matplotlib) or openCV must be installed "
+                                  "to view thumbnails")
+    return _IMAGE_ENGINE
+
+def _decode_img(buf):
+    if _get_image_engine() == "pylab":
+        return _decode_img_pylab(buf)
+    return _decode_img_openCV(buf)
+
+def _show_img(img, window_title='Image Thumbnail'):
+    if _get_image_engine() == "pylab":
+        return _show_img_pylab(img, window_title)
+    return _show_img_openCV(img, window_title)
+
 def _decode_img_openCV(buf):
     #pylint: disable=E1103
     import numpy as np
+    import cv2
     img_data = np.fromstring(buf, np.uint8)
     img = cv2.imdecode(img_data, flags=cv2.CV_LOAD_IMAGE_UNCHANGED)
     #pylint: enable=E1103
@@ -119,29 +178,24 @@ def _decode_img_openCV(buf):
 
 def _show_img_openCV(cvimg, window_title='Image Thumbnail'):
     #pylint: disable=E1103
+    import cv2
     cv2.imshow(window_title, cvimg)
     cv2.waitKey(0)
     cv2.destroyWindow(window_title)
     #pylint: enable=E1103
 
 def _decode_img_pylab(buf):
-    img = pl.imread(BytesIO(buf))
+    #matplotlib.image is much lighter to import than pylab
+    import matplotlib.image as mpimg
+    img = mpimg.imread(BytesIO(buf))
     return img
 
 def _show_img_pylab(img, window_title='Image Thumbnail'):
+    import pylab as pl
     pl.figure()
     pl.imshow(img)
     pl.title(window_title)
     pl.show()
 
-# Function aliases to map generic function
-# to that provided by a specific image engine
-if _IMAGE_ENGINE == "pylab":
-    _decode_img = _decode_img_pylab
-    _show_img = _show_img_pylab
-else:
-    _decode_img = _decode_img_openCV
-    _show_img = _show_img_openCV
-
 if __name__ == '__main__':
     pass
@@ -0,0 +1,252 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+Vectorized footprint geometry operations for catalog query results.
+All footprints of a result set are parsed once into an array of
+shapely geometries, backed by an STRtree spatial index, so that
+spatial predicates against one or many AOIs run in bulk.
+'''
+import heapq
+
+import numpy as np
+import shapely
+from shapely.strtree import STRtree
+
+class FootprintIndex(object):
+    """
+    An array of image footprints with an STRtree spatial index.
+    Query methods return identifiers in the order given at construction.
+    """
+    def __init__(self, ids, geometries):
+        """
+        Constructor
+        @param ids: A sequence of identifiers (cat_ids)
+        @param geometries: A sequence of shapely geometries, one per id.
+        None is allowed for records without a footprint.
+        """
+        self.ids = np.asarray(ids, dtype=object)
+        self.geometries = np.asarray(geometries, dtype=object)
+        shapely.prepare(self.geometries)
+        self.tree = STRtree(self.geometries)
+        self._positions = dict((cid, i) for (i, cid) in enumerate(ids))
+
+    @classmethod
+    def from_wkt(cls, ids, wkts):
+        """
+        Builds an index by parsing a sequence of WKT footprint strings.
+        """
+        return cls(ids, shapely.from_wkt(np.asarray(wkts, dtype=object)))
+
+    @classmethod
+    def from_wkb(cls, ids, wkbs):
+        """
+        Builds an index by parsing a sequence of WKB footprints.
+        """
+        return cls(ids, shapely.from_wkb(np.asarray(wkbs, dtype=object)))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def geometry(self, ID):
+        """
+        Returns the footprint geometry for the given id.
+        Raises KeyError if the id is not in the index.
+        """
+        return self.geometries[self._positions[ID]]
+
+    def bounds(self):
+        """
+        @return: An (N, 4) array of (minx, miny, maxx, maxy) footprint bounds
+        """
+        return shapely.bounds(self.geometries)
+
+    def _query(self, aoi, predicate):
+        return self.ids[np.sort(self.tree.query(aoi, predicate=predicate))].tolist()
+
+    def contains(self, aoi):
+        """
+        Returns the ids of the footprints that fully contain the aoi
+        """
+        #STRtree predicates are evaluated as predicate(aoi, footprint)
+        return self._query(aoi, 'within')
+
+    def intersects(self, aoi):
+        """
+        Returns the ids of the footprints that intersect the aoi
+        """
+        return self._query(aoi, 'intersects')
+
+    def coverage_fractions(self, aoi):
+        """
+        Computes, for every footprint that intersects the aoi, the fraction
+        of the aoi's area that the footprint covers.
+        @return: A dictionary {id: fraction}
+        """
+        idx = np.sort(self.tree.query(aoi, predicate='intersects'))
+        if aoi.area == 0 or len(idx) == 0:
+            return {}
+        areas = shapely.area(shapely.intersection(self.geometries[idx], aoi))
+        return dict(zip(self.ids[idx].tolist(), (areas/aoi.area).tolist()))
+
+    def union_coverage(self, aoi):
+        """
+        Computes the fraction of the aoi's area covered by the union
+        of all the footprints.
+        """
+        idx = self.tree.query(aoi, predicate='intersects')
+        if aoi.area == 0 or len(idx) == 0:
+            return 0.0
+        covered = shapely.intersection(shapely.union_all(self.geometries[idx]), aoi)
+        return covered.area/aoi.area
+
+    def _coverage_cells(self, aoi, idx, resolution):
+        """
+        Rasterizes the aoi into a grid of cells, and finds the cells whose
+        centers are covered by each of the footprints at positions idx.
+        @return: (number of aoi cells, list of cell index arrays, one per footprint)
+        """
+        (minx, miny, maxx, maxy) = aoi.bounds
+        step = max(maxx - minx, maxy - miny)/float(resolution)
+        #at least one cell across each axis, so that a thin aoi gets a row or column
+        nx = max(1, int(round((maxx - minx)/step)))
+        ny = max(1, int(round((maxy - miny)/step)))
+        xs = minx + (np.arange(nx) + 0.5)*((maxx - minx)/nx)
+        ys = miny + (np.arange(ny) + 0.5)*((maxy - miny)/ny)
+        (gx, gy) = np.meshgrid(xs, ys)
+        inside = shapely.contains_xy(aoi, gx, gy)
+        #grid position -> cell number, or -1 outside the aoi
+        numbers = np.full(gx.shape, -1, dtype=np.int64)
+        numbers[inside] = np.arange(np.count_nonzero(inside))
+        (cx, cy) = (gx[inside], gy[inside])
+        geoms = self.geometries[idx]
+        bounds = shapely.bounds(geoms)
+        #footprints that fill their bounding box cover all the cells in it
+        boxes = np.isclose(shapely.area(geoms),
+                           (bounds[:, 2] - bounds[:, 0])*(bounds[:, 3] - bounds[:, 1]))
+        cols = np.stack([np.searchsorted(xs, bounds[:, 0]),
+                         np.searchsorted(xs, bounds[:, 2], side='right')], 1)
+        rows = np.stack([np.searchsorted(ys, bounds[:, 1]),
+                         np.searchsorted(ys, bounds[:, 3], side='right')], 1)
+        cells = []
+        for (k, geom) in enumerate(geoms):
+            near = numbers[rows[k, 0]:rows[k, 1], cols[k, 0]:cols[k, 1]].ravel()
+            near = near[near >= 0]
+            if not boxes[k]:
+                near = near[shapely.contains_xy(geom, cx[near], cy[near])]
+            cells.append(near)
+        return (len(cx), cells)
+
+    def _pick_cells(self, num_cells, cells, idx, costs, target):
+        """
+        Greedy set cover of the aoi cells, see select_covering()
+        @return: The picked positions in idx
+        """
+        uncovered = np.ones(num_cells, dtype=bool)
+        remaining = num_cells - int(np.floor((1.0 - target)*num_cells))
+        #lazy greedy: gains only shrink, so a stale heap entry is an upper bound
+        heap = [(-len(c)/costs[j], k) for (k, (j, c)) in enumerate(zip(idx, cells)) if len(c)]
+        heapq.heapify(heap)
+        picked = []
+        while heap and remaining > 0:
+            (neg_ratio, k) = heapq.heappop(heap)
+            gain = np.count_nonzero(uncovered[cells[k]])
+            ratio = gain/costs[idx[k]]
+            if gain == 0:
+                continue
+            if heap and ratio < -heap[0][0]:
+                heapq.heappush(heap, (-ratio, k))
+                continue
+            picked.append(k)
+            uncovered[cells[k]] = False
+            remaining -= gain
+
+        counts = np.zeros(num_cells, dtype=np.int32)
+        for k in picked:
+            counts[cells[k]] += 1
+        for k in sorted(picked, key=lambda k: -costs[idx[k]]):
+            if len(cells[k]) and counts[cells[k]].min() > 1:
+                counts[cells[k]] -= 1
+                picked.remove(k)
+        return picked
+
+    def _pick_exact(self, aoi, idx, costs, target):
+        """
+        Greedy set cover of the aoi's area with exact geometry operations,
+        for aois that are too thin for any cell center to fall inside them
+        @return: The picked positions in idx
+        """
+        parts = shapely.intersection(self.geometries[idx], aoi)
+        uncovered = aoi
+        #stop when the uncovered area is within the target (and rounding error)
+        allowed = (1.0 - target)*aoi.area + 1e-9*aoi.area
+        candidates = list(range(len(idx)))
+        picked = []
+        while candidates and uncovered.area > allowed:
+            gains = shapely.area(shapely.intersection(parts[candidates], uncovered))
+            best = int(np.argmax(gains/costs[idx[candidates]]))
+            if gains[best] <= 0:
+                break
+            k = candidates.pop(best)
+            picked.append(k)
+            uncovered = uncovered.difference(parts[k])
+        return picked
+
+    def select_covering(self, aoi, costs=None, target=1.0, resolution=200):
+        """
+        Selects a low-cost set of footprints that together cover the aoi,
+        by weighted greedy set cover over a raster of the aoi: the footprint
+        covering the most still-uncovered cells per unit of cost is picked
+        until the target fraction of cells is covered. Footprints made
+        redundant by later picks are then dropped, costliest first.
+        @param costs: An array of positive costs, one per footprint, e.g. from
+        gbdx.columns.QueryColumns.scene_costs(). If None, all costs are 1.
+        @param target: The fraction of the aoi to cover, up to 1.0
+        @param resolution: The number of raster cells along the longer side
+        of the aoi's bounding box. Higher values are more precise, but slower.
+        An aoi so thin that no cell center falls inside it is covered using
+        exact geometry operations instead.
+        @return: (ids, covered) where ids are the selected ids, in the order
+        they were picked, and covered is the fraction of the aoi's area
+        that their union covers
+        """
+        idx = np.sort(self.tree.query(aoi, predicate='intersects'))
+        if aoi.area == 0 or len(idx) == 0:
+            return ([], 0.0)
+        costs = np.ones(len(self)) if costs is None else np.asarray(costs, dtype=np.float64)
+        (num_cells, cells) = self._coverage_cells(aoi, idx, resolution)
+        if num_cells > 0:
+            picked = self._pick_cells(num_cells, cells, idx, costs, target)
+        else:
+            picked = self._pick_exact(aoi, idx, costs, target)
+        selected = idx[picked]
+        covered = shapely.intersection(shapely.union_all(self.geometries[selected]), aoi)
+        return (self.ids[selected].tolist(), covered.area/aoi.area)
+
+    def _query_many(self, aois, predicate):
+        aois = np.asarray(aois, dtype=object)
+        (aoi_idx, fp_idx) = self.tree.query(aois, predicate=predicate)
+        matches = [[] for _ in range(len(aois))]
+        order = np.lexsort((fp_idx, aoi_idx))
+        for (i, j) in zip(aoi_idx[order].tolist(), fp_idx[order].tolist()):
+            matches[i].append(self.ids[j])
+        return matches
+
+    def contains_many(self, aois):
+        """
+        Batch version of contains().
+        @param aois: A sequence of shapely geometries
+        @return: A list with one list of ids per aoi
+        """
+        return self._query_many(aois, 'within')
+
+    def intersects_many(self, aois):
+        """
+        Batch version of intersects().
+        @param aois: A sequence of shapely geometries
+        @return: A list with one list of ids per aoi
+        """
+        return self._query_many(aois, 'intersects')
+
+if __name__ == '__main__':
+    pass
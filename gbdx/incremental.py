@@ -0,0 +1,174 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+Support for incremental (delta) catalog queries, for standing
+monitors that re-run the same query to detect new acquisitions.
+A DeltaStore remembers, per query fingerprint, the records seen so
+far and the latest acquisition timestamp, so that later runs only
+need to search from that timestamp on.
+'''
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+import datetime
+
+from gbdx.cache import canonical_search_key
+
+DEFAULT_DELTA_STORE_PATH = os.path.join(os.path.expanduser("~"), ".gbdx",
+                                        "delta_store.sqlite")
+
+def query_fingerprint(search_body):
+    """
+    Identifies a standing query by its search body, ignoring the start
+    date, which incremental queries adjust from run to run.
+    """
+    body = dict(search_body)
+    body.pop('startDate', None)
+    return canonical_search_key(body)
+
+def record_hash(record):
+    """
+    A content hash of a catalog record, used to detect changed records
+    """
+    canonical = json.dumps(record, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+def narrowed_start_date(start_date, latest_timestamp, overlap_days):
+    """
+    Computes the start date for the next incremental search.
+    @param start_date: The start date of the original query, YYYY-MM-DD, or None
+    @param latest_timestamp: The latest acquisition timestamp seen so far
+    (an ISO-8601 string, as in the catalog 'timestamp' property), or None
+    @param overlap_days: How many days before latest_timestamp to search
+    again, to allow for late-arriving catalog records
+    @return: A YYYY-MM-DD string, or start_date
+    """
+    if not latest_timestamp:
+        return start_date
+    latest = datetime.datetime.strptime(latest_timestamp[0:10], "%Y-%m-%d")
+    narrowed = (latest - datetime.timedelta(days=overlap_days)).strftime("%Y-%m-%d")
+    if start_date and start_date > narrowed:
+        return start_date
+    return narrowed
+
+class DeltaStore(object):
+    """
+    A persistent store, in an SQLite file, of the records returned by
+    standing queries. Safe to share between threads and processes.
+    """
+    def __init__(self, path=DEFAULT_DELTA_STORE_PATH):
+        """
+        Constructor
+        @param path: The SQLite database file. Its directory is created if needed.
+        """
+        self.path = path
+        store_dir = os.path.dirname(os.path.abspath(path))
+        if not os.path.isdir(store_dir):
+            os.makedirs(store_dir)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("""CREATE TABLE IF NOT EXISTS monitors (
+                                    fingerprint TEXT PRIMARY KEY,
+                                    latest_timestamp TEXT,
+                                    updated REAL)""")
+                conn.execute("""CREATE TABLE IF NOT EXISTS records (
+                                    fingerprint TEXT NOT NULL,
+                                    identifier TEXT NOT NULL,
+                                    hash TEXT NOT NULL,
+                                    data TEXT NOT NULL,
+                                    PRIMARY KEY (fingerprint, identifier))""")
+        finally:
+            conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def latest_timestamp(self, fingerprint):
+        """
+        @return: The latest acquisition timestamp stored for a query, or None
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT latest_timestamp FROM monitors WHERE fingerprint=?",
+                               (fingerprint,)).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else None
+
+    def merge(self, fingerprint, records, now):
+        """
+        Merges the records of a search into the store.
+        @param fingerprint: The query fingerprint
+        @param records: A list of catalog records
+        @param now: The time of the search, in seconds since the epoch
+        @return: The records that were new or changed
+        """
+        delta = []
+        conn = self._connect()
+        try:
+            with conn:
+                stored = dict(conn.execute("SELECT identifier, hash FROM records WHERE fingerprint=?",
+                                           (fingerprint,)).fetchall())
+                latest = conn.execute("SELECT latest_timestamp FROM monitors WHERE fingerprint=?",
+                                      (fingerprint,)).fetchone()
+                latest = latest[0] if latest else None
+                for record in records:
+                    h = record_hash(record)
+                    if stored.get(record['identifier']) == h:
+                        continue
+                    delta.append(record)
+                    conn.execute("INSERT OR REPLACE INTO records VALUES (?,?,?,?)",
+                                 (fingerprint, record['identifier'], h, json.dumps(record)))
+                for record in records:
+                    ts = record.get('properties', {}).get('timestamp')
+                    if ts and (latest is None or ts > latest):
+                        latest = ts
+                conn.execute("INSERT OR REPLACE INTO monitors VALUES (?,?,?)",
+                             (fingerprint, latest, now))
+        finally:
+            conn.close()
+        return delta
+
+    def records(self, fingerprint):
+        """
+        @return: All the records stored for a query
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT data FROM records WHERE fingerprint=?",
+                                (fingerprint,)).fetchall()
+        finally:
+            conn.close()
+        return [json.loads(data) for (data,) in rows]
+
+    def forget(self, fingerprint):
+        """
+        Removes all the state stored for a query
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM records WHERE fingerprint=?", (fingerprint,))
+                conn.execute("DELETE FROM monitors WHERE fingerprint=?", (fingerprint,))
+        finally:
+            conn.close()
+
+_DEFAULT_DELTA_STORE = None
+_DEFAULT_DELTA_STORE_LOCK = threading.Lock()
+
+def get_default_delta_store():
+    """
+    Returns the process-wide default DeltaStore, creating it on first use.
+    """
+    global _DEFAULT_DELTA_STORE
+    with _DEFAULT_DELTA_STORE_LOCK:
+        if _DEFAULT_DELTA_STORE is None:
+            _DEFAULT_DELTA_STORE = DeltaStore()
+        return _DEFAULT_DELTA_STORE
+
+if __name__ == '__main__':
+    pass
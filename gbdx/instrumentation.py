@@ -0,0 +1,290 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+Request-level instrumentation of the GBDX API calls. The transports
+(gbdx.transport and gbdx.aio) and the caches report to a Metrics
+object, which keeps per-endpoint latency histograms, request and
+response sizes, retry and error counts, json decode times, cache hit
+ratios and the number of requests in flight. For example:
+
+    from gbdx.instrumentation import get_metrics
+    ... run the pipeline ...
+    print(get_metrics().summary())
+
+Exporters can subscribe to every request with Metrics.add_listener(),
+and prometheus_text() renders the metrics in the Prometheus text format.
+'''
+import bisect
+import threading
+from collections import namedtuple
+
+from urllib.parse import urlsplit
+
+#upper bounds (seconds) of the latency histogram buckets
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                           1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class RequestEvent(namedtuple('RequestEvent', ['method', 'endpoint', 'status', 'latency',
+                                               'bytes_out', 'bytes_in', 'attempts', 'error'])):
+    """
+    One API call, as reported to the listeners of a Metrics object. latency is
+    in seconds and includes retries, attempts is 1 plus the number of retries,
+    status is None if no response was received, and error is the exception
+    raised to the caller, or None.
+    """
+    __slots__ = ()
+
+def endpoint_name(url):
+    """
+    Groups API urls by endpoint, e.g. https://geobigdata.io/catalog/v1/record/103001
+    becomes 'catalog/v1/record'
+    """
+    parts = urlsplit(url).path.strip('/').split('/')
+    return "/".join(parts[0:3])
+
+class Histogram(object):
+    """
+    A fixed-bucket histogram, with the count, sum, min and max of the values
+    """
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0]*(len(self.buckets) + 1)   #the last bucket is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    @property
+    def mean(self):
+        return self.total/self.count if self.count else 0.0
+
+    def quantile(self, q):
+        """
+        Estimates a quantile, as the upper bound of the bucket that holds it
+        """
+        if not self.count:
+            return 0.0
+        rank = q*self.count
+        seen = 0
+        for (i, n) in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {'count': self.count, 'sum': self.total, 'min': self.min, 'max': self.max,
+                'p50': self.quantile(0.5), 'p95': self.quantile(0.95), 'p99': self.quantile(0.99),
+                'buckets': list(zip(self.buckets + (float('inf'),), self.counts))}
+
+class _EndpointStats(object):
+    def __init__(self):
+        self.latency = Histogram()
+        self.decode = Histogram()
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.retries = 0
+        self.errors = 0
+        self.statuses = {}
+
+class Metrics(object):
+    """
+    A thread-safe collection of API call metrics
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._listeners = []
+        self.reset()
+
+    def reset(self):
+        """
+        Clears all the metrics, but keeps the listeners
+        """
+        with self._lock:
+            self._endpoints = {}
+            self._caches = {}
+            self.in_flight = 0
+            self.max_in_flight = 0
+
+    def add_listener(self, listener):
+        """
+        Registers a function called with a RequestEvent after every API call,
+        e.g. to forward the calls to an exporter
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        with self._lock:
+            self._listeners.remove(listener)
+
+    def _endpoint(self, endpoint):
+        #called with the lock held
+        stats = self._endpoints.get(endpoint)
+        if stats is None:
+            stats = self._endpoints[endpoint] = _EndpointStats()
+        return stats
+
+    def request_started(self):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def request_finished(self, event):
+        """
+        Records a completed (or failed) API call
+        @param event: A RequestEvent
+        """
+        with self._lock:
+            self.in_flight -= 1
+            stats = self._endpoint(event.endpoint)
+            stats.latency.observe(event.latency)
+            stats.bytes_out += event.bytes_out or 0
+            stats.bytes_in += event.bytes_in or 0
+            stats.retries += event.attempts - 1
+            if event.error is not None:
+                stats.errors += 1
+            stats.statuses[event.status] = stats.statuses.get(event.status, 0) + 1
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(event)
+
+    def observe_decode(self, endpoint, seconds):
+        """
+        Records the time spent decoding a json response
+        """
+        with self._lock:
+            self._endpoint(endpoint).decode.observe(seconds)
+
+    def cache_event(self, cache, hit):
+        """
+        Records a cache lookup
+        @param cache: The name of the cache, e.g. 'query' or 'thumbnail'
+        @param hit: True for a hit, False for a miss
+        """
+        with self._lock:
+            counts = self._caches.setdefault(cache, [0, 0])
+            counts[0 if hit else 1] += 1
+
+    def snapshot(self):
+        """
+        @return: The metrics, as a dictionary that can be serialized to json
+        """
+        with self._lock:
+            endpoints = {}
+            for (name, s) in self._endpoints.items():
+                endpoints[name] = {'latency': s.latency.to_dict(), 'decode': s.decode.to_dict(),
+                                   'bytes_out': s.bytes_out, 'bytes_in': s.bytes_in,
+                                   'retries': s.retries, 'errors': s.errors,
+                                   'statuses': dict((str(k), v) for (k, v) in s.statuses.items())}
+            caches = {}
+            for (name, (hits, misses)) in self._caches.items():
+                total = hits + misses
+                caches[name] = {'hits': hits, 'misses': misses,
+                                'hit_ratio': float(hits)/total if total else 0.0}
+            return {'endpoints': endpoints, 'caches': caches,
+                    'in_flight': self.in_flight, 'max_in_flight': self.max_in_flight}
+
+    def summary(self):
+        """
+        A plain-text report of the endpoints, sorted by total time spent,
+        and the cache hit ratios
+        """
+        snap = self.snapshot()
+        lines = ["{:<28} {:>7} {:>9} {:>8} {:>8} {:>8} {:>10} {:>10} {:>8} {:>6}".format(
+                 "endpoint", "calls", "total s", "p50 ms", "p95 ms", "max ms",
+                 "KB out", "KB in", "json ms", "errors")]
+        ranked = sorted(snap['endpoints'].items(), key=lambda kv: -kv[1]['latency']['sum'])
+        for (name, e) in ranked:
+            lat = e['latency']
+            lines.append("{:<28} {:>7} {:>9.2f} {:>8.1f} {:>8.1f} {:>8.1f} {:>10.1f} {:>10.1f} {:>8.1f} {:>6}"
+                         .format(name, lat['count'], lat['sum'], 1000*lat['p50'], 1000*lat['p95'],
+                                 1000*(lat['max'] or 0), e['bytes_out']/1024.0, e['bytes_in']/1024.0,
+                                 1000*e['decode']['sum'], e['errors']))
+        for (name, c) in sorted(snap['caches'].items()):
+            lines.append("cache {:<22} {:>7} lookups, {:.0%} hits".format(
+                         name, c['hits'] + c['misses'], c['hit_ratio']))
+        lines.append("max requests in flight: {}".format(snap['max_in_flight']))
+        return "\n".join(lines)
+
+    def prometheus_text(self, prefix="gbdx"):
+        """
+        Renders the metrics in the Prometheus text exposition format, e.g.
+        to be served from a /metrics endpoint
+        """
+        snap = self.snapshot()
+        out = []
+        def metric(name, kind, help_text):
+            out.append("# HELP {}_{} {}".format(prefix, name, help_text))
+            out.append("# TYPE {}_{} {}".format(prefix, name, kind))
+        metric("request_duration_seconds", "histogram", "GBDX API call latency, including retries")
+        for (name, e) in sorted(snap['endpoints'].items()):
+            lat = e['latency']
+            cumulative = 0
+            for (bound, n) in lat['buckets']:
+                cumulative += n
+                le = "+Inf" if bound == float('inf') else repr(bound)
+                out.append('{}_request_duration_seconds_bucket{{endpoint="{}",le="{}"}} {}'
+                           .format(prefix, name, le, cumulative))
+            out.append('{}_request_duration_seconds_sum{{endpoint="{}"}} {}'.format(prefix, name, lat['sum']))
+            out.append('{}_request_duration_seconds_count{{endpoint="{}"}} {}'.format(prefix, name, lat['count']))
+        for (key, help_text) in (('bytes_out', "Request body bytes sent"),
+                                 ('bytes_in', "Response body bytes received"),
+                                 ('retries', "Retried attempts"),
+                                 ('errors', "Calls that raised an error")):
+            metric("{}_total".format(key), "counter", help_text)
+            for (name, e) in sorted(snap['endpoints'].items()):
+                out.append('{}_{}_total{{endpoint="{}"}} {}'.format(prefix, key, name, e[key]))
+        metric("cache_lookups_total", "counter", "Cache lookups, by result")
+        for (name, c) in sorted(snap['caches'].items()):
+            out.append('{}_cache_lookups_total{{cache="{}",result="hit"}} {}'.format(prefix, name, c['hits']))
+            out.append('{}_cache_lookups_total{{cache="{}",result="miss"}} {}'.format(prefix, name, c['misses']))
+        metric("requests_in_flight", "gauge", "API calls in progress")
+        out.append("{}_requests_in_flight {}".format(prefix, snap['in_flight']))
+        return "\n".join(out) + "\n"
+
+class OpenTelemetryListener(object):
+    """
+    A Metrics listener that records API calls with OpenTelemetry instruments.
+    Usage:
+        meter = opentelemetry.metrics.get_meter("gbdx")
+        get_metrics().add_listener(OpenTelemetryListener(meter))
+    """
+    def __init__(self, meter):
+        """
+        Constructor
+        @param meter: An opentelemetry Meter
+        """
+        self.duration = meter.create_histogram("gbdx.request.duration", unit="s",
+                                               description="GBDX API call latency")
+        self.bytes_in = meter.create_counter("gbdx.request.bytes_in", unit="By")
+        self.bytes_out = meter.create_counter("gbdx.request.bytes_out", unit="By")
+        self.errors = meter.create_counter("gbdx.request.errors")
+
+    def __call__(self, event):
+        attrs = {'endpoint': event.endpoint, 'method': event.method,
+                 'status': str(event.status)}
+        self.duration.record(event.latency, attrs)
+        self.bytes_in.add(event.bytes_in or 0, attrs)
+        self.bytes_out.add(event.bytes_out or 0, attrs)
+        if event.error is not None:
+            self.errors.add(1, attrs)
+
+_DEFAULT_METRICS = Metrics()
+
+def get_metrics():
+    """
+    Returns the process-wide Metrics that the transports and caches report to
+    """
+    return _DEFAULT_METRICS
+
+if __name__ == '__main__':
+    pass
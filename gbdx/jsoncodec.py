@@ -0,0 +1,176 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+The json codec used for API requests and responses. The fastest
+available library is used: orjson, then simdjson (pysimdjson), then
+the standard json module. Responses are decoded straight from the raw
+response bytes, and request payloads are encoded straight to bytes.
+
+loads_lazy() decodes a catalog search response without materializing
+its records: each record is decoded on first access, and only the
+fields that are used. This needs simdjson; without it, loads_lazy()
+falls back to decoding everything up front. Lazy records pickle and
+deepcopy as plain dictionaries, but json.dumps() doesn't accept them:
+encode rec.to_dict() instead.
+'''
+import json
+from collections.abc import Mapping, Sequence
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+def available_codecs():
+    """
+    @return: The names of the installed codecs, fastest first
+    """
+    names = []
+    if orjson is not None:
+        names.append('orjson')
+    if simdjson is not None:
+        names.append('simdjson')
+    names.append('json')
+    return names
+
+_CODEC = available_codecs()[0]
+
+def get_codec():
+    """
+    @return: The name of the codec in use: 'orjson', 'simdjson' or 'json'
+    """
+    return _CODEC
+
+def set_codec(name):
+    """
+    Selects the codec used by loads() and dumps(), e.g. for benchmarking.
+    Raises ValueError if the codec is not installed.
+    """
+    global _CODEC
+    if name not in available_codecs():
+        raise ValueError("JSON codec {} is not available, choose one of {}"
+                         .format(name, ", ".join(available_codecs())))
+    _CODEC = name
+
+def loads(data):
+    """
+    Decodes json from bytes (or text)
+    """
+    if _CODEC == 'orjson':
+        return orjson.loads(data)
+    if _CODEC == 'simdjson':
+        return simdjson.loads(data)
+    return json.loads(data)
+
+def dumps(obj):
+    """
+    Encodes an object as compact json bytes, e.g. for a request body
+    """
+    if _CODEC == 'orjson':
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+def loads_lazy(data, key='results'):
+    """
+    Decodes a json object, except for the array under the given top-level
+    key, whose items are decoded on first access. See LazyRecordList.
+    Falls back to loads() if simdjson is not installed.
+    """
+    if simdjson is None:
+        return loads(data)
+    #each document needs its own parser, which its proxies keep alive
+    doc = simdjson.Parser().parse(data)
+    out = {}
+    for name in doc.keys():
+        value = doc[name]
+        if name == key and isinstance(value, simdjson.Array):
+            out[name] = LazyRecordList(value)
+        else:
+            out[name] = _materialize(value)
+    return out
+
+def _materialize(value):
+    if simdjson is not None:
+        if isinstance(value, simdjson.Object):
+            return value.as_dict()
+        if isinstance(value, simdjson.Array):
+            return value.as_list()
+    return value
+
+class LazyRecordList(Sequence):
+    """
+    A read-only list of records, backed by a parsed (but not materialized)
+    simdjson array. Each record is wrapped in a LazyRecord when first accessed.
+    """
+    def __init__(self, array):
+        #indexing a simdjson array is linear, iterating it is not
+        self._objects = list(array)
+        self._records = [None]*len(self._objects)
+
+    def __len__(self):
+        return len(self._records)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        rec = self._records[i]
+        if rec is None:
+            rec = self._records[i] = LazyRecord(self._objects[i])
+        return rec
+
+    def __reduce__(self):
+        #simdjson proxies can't be pickled or copied: use a list of plain records
+        return (list, ([_materialize(obj) for obj in self._objects],))
+
+class LazyRecord(Mapping):
+    """
+    A read-only record that decodes each of its fields on first access,
+    e.g. rec['identifier'] decodes neither rec['properties'] nor any other field.
+    """
+    __slots__ = ('_obj', '_fields')
+
+    def __init__(self, obj):
+        self._obj = obj
+        self._fields = {}
+
+    def __getitem__(self, key):
+        try:
+            return self._fields[key]
+        except KeyError:
+            value = self._fields[key] = _materialize(self._obj[key])
+            return value
+
+    def __iter__(self):
+        return iter(self._obj.keys())
+
+    def __len__(self):
+        return len(self._obj)
+
+    @property
+    def raw(self):
+        """
+        The json bytes of the record, without decoding it
+        """
+        return self._obj.mini
+
+    def to_dict(self):
+        """
+        Returns the record as a plain (nested) dictionary
+        """
+        return self._obj.as_dict()
+
+    def __reduce__(self):
+        #simdjson proxies can't be pickled or copied: use a plain dictionary
+        return (dict, (self.to_dict(),))
+
+    def __repr__(self):
+        return "LazyRecord({!r})".format(self.to_dict())
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,233 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+Placing and tracking many imagery orders. An OrderManager splits long
+lists of catalog ids into orders of a bounded size, places them
+concurrently, and polls the outstanding orders with a PollScheduler
+until they are delivered, or one of their line items fails. Each order
+is represented by a Future.
+'''
+from concurrent.futures import Future, wait
+
+from gbdx.core import order_images, get_order_status
+from gbdx.parallel import run_concurrently, DEFAULT_MAX_WORKERS
+from gbdx.polling import PollScheduler, _is_throttled
+
+DEFAULT_ORDER_CHUNK_SIZE = 100
+DEFAULT_MAX_POLL_FAILURES = 10
+#line item states after which an order will never be delivered
+FAILED_LINE_STATES = ('failed', 'cancelled', 'canceled', 'rejected', 'error')
+
+class OrderFailedError(Exception):
+    """
+    Set on an OrderFuture when a line item of the order failed or was
+    cancelled. The failed line items are in the lines attribute, and the
+    full order status in the status attribute.
+    """
+    def __init__(self, soli, status, lines):
+        states = ", ".join("{} {}".format(line.get('catalogId'), _line_state(line))
+                           for line in lines)
+        Exception.__init__(self, "Order {} failed: {}".format(soli, states))
+        self.soli = soli
+        self.status = status
+        self.lines = lines
+
+def order_progress(order_status):
+    """
+    @param order_status: An order status dictionary, from get_order_status
+    @return: A tuple with the percentDelivered of each line item
+    """
+    return tuple(line.get('percentDelivered') for line in order_status.get('lines', []))
+
+def _percent(p):
+    try:
+        return float(p)
+    except (TypeError, ValueError):
+        return 0.0
+
+def _line_state(line):
+    state = line.get('status', line.get('state'))
+    return state.lower() if isinstance(state, str) else None
+
+def failed_order_lines(order_status):
+    """
+    @param order_status: An order status dictionary, from get_order_status
+    @return: A list of the line items that failed or were cancelled
+    """
+    return [line for line in order_status.get('lines', [])
+            if _line_state(line) in FAILED_LINE_STATES]
+
+def is_order_delivered(order_status):
+    """
+    True if every line item of an order is 100 percent delivered. The
+    percentages may be numbers or strings, e.g. '100' or '100.0'.
+    """
+    progress = order_progress(order_status)
+    return len(progress) > 0 and all(_percent(p) >= 100 for p in progress)
+
+class OrderFuture(Future):
+    """
+    A Future for one imagery order. Its result is the final order
+    status dictionary, or an OrderFailedError if a line item failed.
+    Use asyncio.wrap_future() to await it.
+    """
+    def __init__(self, cat_ids=None, soli=None):
+        Future.__init__(self)
+        self.cat_ids = cat_ids
+        self.soli = soli
+        self.last_status = None
+        self.poll_failures = 0  #consecutive failed status requests
+
+class OrderManager(object):
+    """
+    Places imagery orders and tracks them until delivery. For example:
+        with OrderManager(session) as mgr:
+            futures = mgr.submit(cat_ids, callback=on_delivered)
+            mgr.wait(futures)
+    """
+    def __init__(self, session, chunk_size=DEFAULT_ORDER_CHUNK_SIZE,
+                 max_workers=DEFAULT_MAX_WORKERS, min_interval=30.0,
+                 max_interval=900.0, rate_limiter=None,
+                 max_poll_failures=DEFAULT_MAX_POLL_FAILURES, start=True):
+        """
+        Constructor
+        @param session: The gbdx session, from gbdx_auth.get_session.
+        @param chunk_size: The maximum number of catalog ids per order
+        @param max_workers: The maximum number of concurrent requests
+        @param min_interval: The shortest time (seconds) between polls of one order
+        @param max_interval: The longest time (seconds) between polls of one order
+        @param rate_limiter: See PollScheduler
+        @param max_poll_failures: After this many consecutive failed status
+        requests, an order's future is given the last exception and polling
+        stops. Throttling errors (HTTP 429, open circuit) are not counted.
+        @param start: If True, outstanding orders are polled in a background
+        thread. Otherwise, call poll() to poll the orders that are due.
+        """
+        self.session = session
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.max_poll_failures = max_poll_failures
+        self._futures = {}
+        self.scheduler = PollScheduler(self._poll_order, min_interval=min_interval,
+                                       max_interval=max_interval, max_workers=max_workers,
+                                       rate_limiter=rate_limiter)
+        if start:
+            self.scheduler.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _place_order(self, cat_ids):
+        rc = order_images(self.session, cat_ids)
+        return rc['salesOrderNumber']
+
+    def submit(self, cat_ids, callback=None):
+        """
+        Orders a list of catalog ids, split into orders of at most chunk_size
+        ids, which are placed concurrently and then tracked until delivery.
+        @param cat_ids: A list of catalog ids
+        @param callback: Optional function called with each OrderFuture when it
+        is done, as with Future.add_done_callback
+        @return: A list of OrderFutures, one per order, in the order of cat_ids.
+        If an order could not be placed, its future holds the exception.
+        """
+        chunks = [list(cat_ids[i:i+self.chunk_size])
+                  for i in range(0, len(cat_ids), self.chunk_size)]
+        futures = [OrderFuture(cat_ids=chunk) for chunk in chunks]
+        for fut in futures:
+            fut.set_running_or_notify_cancel()
+            if callback is not None:
+                fut.add_done_callback(callback)
+        place = lambda i: self._place_order(chunks[i])
+        for (i, soli, err) in run_concurrently(place, range(len(chunks)), self.max_workers):
+            if err is not None:
+                futures[i].set_exception(err)
+            else:
+                futures[i].soli = soli
+                self._track(futures[i])
+        return futures
+
+    def track(self, soli, callback=None):
+        """
+        Tracks an order that was placed elsewhere.
+        @param soli: The order number, or 'soli'
+        @param callback: See submit()
+        @return: An OrderFuture
+        """
+        fut = OrderFuture(soli=soli)
+        fut.set_running_or_notify_cancel()
+        if callback is not None:
+            fut.add_done_callback(callback)
+        self._track(fut)
+        return fut
+
+    def _track(self, fut):
+        self._futures[fut.soli] = fut
+        self.scheduler.add(fut.soli)
+
+    def _poll_order(self, soli):
+        fut = self._futures.get(soli)
+        if fut is None or fut.done():
+            self._futures.pop(soli, None)
+            return (None, True)
+        try:
+            status = get_order_status(self.session, soli)
+        except Exception as e:
+            if not _is_throttled(e):
+                fut.poll_failures += 1
+                if fut.poll_failures >= self.max_poll_failures:
+                    self._futures.pop(soli, None)
+                    fut.set_exception(e)
+                    return (None, True)
+            raise   #the scheduler backs off
+        fut.poll_failures = 0
+        fut.last_status = status
+        failed = failed_order_lines(status)
+        if failed:
+            self._futures.pop(soli, None)
+            fut.set_exception(OrderFailedError(soli, status, failed))
+            return (None, True)
+        if is_order_delivered(status):
+            self._futures.pop(soli, None)
+            fut.set_result(status)
+            return (None, True)
+        return (order_progress(status), False)
+
+    def outstanding(self):
+        """
+        @return: The order numbers that are not yet delivered
+        """
+        return self.scheduler.keys()
+
+    def poll(self):
+        """
+        Polls the outstanding orders that are due, when not using the
+        background thread.
+        @return: The number of orders polled
+        """
+        return self.scheduler.poll_due()
+
+    def wait(self, futures=None, timeout=None):
+        """
+        Waits for orders to be delivered.
+        @param futures: The OrderFutures to wait for; defaults to all tracked orders
+        @param timeout: The maximum time to wait, in seconds, or None
+        @return: A (done, not_done) tuple of sets, as concurrent.futures.wait
+        """
+        if futures is None:
+            futures = list(self._futures.values())
+        return wait(futures, timeout)
+
+    def close(self):
+        """
+        Stops polling. Outstanding orders are not cancelled on the server,
+        and their futures stay pending.
+        """
+        self.scheduler.stop()
+
+if __name__ == '__main__':
+    pass
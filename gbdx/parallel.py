@@ -0,0 +1,47 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+Helpers for running many independent GBDX API calls concurrently
+over a bounded pool of worker threads.
+'''
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+DEFAULT_MAX_WORKERS = 8
+
+def run_concurrently(func, items, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Calls func(item) for each item using a bounded pool of worker threads,
+    yielding the outcomes in the order in which they complete.
+    @param func: A callable taking a single argument.
+    @param items: An iterable of arguments. It is consumed lazily, so that
+    no more than 2*max_workers calls are outstanding at any time.
+    @param max_workers: The maximum number of concurrent calls.
+    @return: A generator of (item, result, error) tuples. If func raised
+    an exception for an item, result is None and error is the exception,
+    otherwise error is None. One failure does not stop the other calls.
+    """
+    max_workers = max(1, int(max_workers))
+    items = iter(items)
+    pending = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for item in items:
+            pending[pool.submit(func, item)] = item
+            if len(pending) >= 2*max_workers:
+                break
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for fut in done:
+                item = pending.pop(fut)
+                err = fut.exception()
+                if err is None:
+                    yield (item, fut.result(), None)
+                else:
+                    yield (item, None, err)
+            for item in items:
+                pending[pool.submit(func, item)] = item
+                if len(pending) >= 2*max_workers:
+                    break
+
+if __name__ == '__main__':
+    pass
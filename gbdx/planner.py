@@ -0,0 +1,150 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+A planner for running many catalog queries over nearby AOIs. Queries
+that share the same filters and date range are clustered, and each
+cluster is sent as a single search over the bounding box of its
+members. The records of each merged search are then assigned back to
+the original queries by footprint intersection.
+'''
+import shapely.geometry as sg
+
+from gbdx.cache import canonical_search_key
+from gbdx.parallel import run_concurrently, DEFAULT_MAX_WORKERS
+from gbdx.query import GBDXQueryResult
+
+class PlannedSearch(object):
+    """
+    One merged catalog search, and the queries it answers
+    """
+    def __init__(self, template, members):
+        """
+        Constructor
+        @param template: The GBDXQuery whose search body (filters, dates)
+        is used for the merged search
+        @param members: A list of (index, bbox) of the queries, where index is
+        the position of the query in the planner, and bbox a shapely box
+        """
+        self.template = template
+        self.members = members
+
+    @property
+    def bounds(self):
+        """
+        The bounding box of all the member AOIs, as a shapely box
+        """
+        boxes = [box.bounds for (_, box) in self.members]
+        return sg.box(min(b[0] for b in boxes), min(b[1] for b in boxes),
+                      max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+    @property
+    def search_body(self):
+        """
+        The catalog search body, covering the bounding box of all the members
+        """
+        body = dict(self.template.search_body)
+        body['searchAreaWkt'] = self.bounds.wkt
+        return body
+
+class QueryPlanner(object):
+    """
+    Collects many GBDXQuery objects and runs them with as few catalog
+    searches as possible. For example:
+        planner = QueryPlanner()
+        for aoi in site_aois:
+            planner.add(GBDXQuery(aoi, date_range=dates))
+        results = planner.execute(session)  #one GBDXQueryResult per query
+    """
+    def __init__(self, max_area_ratio=2.0, max_merged_area=None,
+                 max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Constructor
+        @param max_area_ratio: Two groups of AOIs are merged into one search if
+        the area of their combined bounding box is at most this multiple of the
+        sum of the areas of their AOI bounding boxes. Larger values mean fewer,
+        but larger and less selective, searches.
+        @param max_merged_area: If given, the upper bound of the area (in square
+        degrees) of the bounding box of a merged search.
+        @param max_workers: The maximum number of concurrent searches
+        """
+        self.max_area_ratio = max_area_ratio
+        self.max_merged_area = max_merged_area
+        self.max_workers = max_workers
+        self.queries = []
+
+    def add(self, qry):
+        """
+        Adds a query to the plan.
+        @param qry: A GBDXQuery
+        @return: The index of the query, which is its position in the
+        list returned by execute()
+        """
+        self.queries.append(qry)
+        return len(self.queries) - 1
+
+    def _cluster(self, members):
+        """
+        Greedily clusters (index, bbox) members, visiting them from west to east.
+        @return: A list of clusters, each a list of members
+        """
+        clusters = []  #(bounds, area_sum, members)
+        for (idx, box) in sorted(members, key=lambda m: m[1].bounds[0]):
+            for (i, (bounds, area_sum, cluster)) in enumerate(clusters):
+                merged = (min(bounds[0], box.bounds[0]), min(bounds[1], box.bounds[1]),
+                          max(bounds[2], box.bounds[2]), max(bounds[3], box.bounds[3]))
+                merged_area = (merged[2]-merged[0])*(merged[3]-merged[1])
+                if merged_area > self.max_area_ratio*(area_sum + box.area):
+                    continue
+                if self.max_merged_area is not None and merged_area > self.max_merged_area:
+                    continue
+                cluster.append((idx, box))
+                clusters[i] = (merged, area_sum + box.area, cluster)
+                break
+            else:
+                clusters.append((box.bounds, box.area, [(idx, box)]))
+        return [cluster for (_, _, cluster) in clusters]
+
+    def plan(self):
+        """
+        Groups the queries by identical filters and date range, then clusters
+        the AOIs of each group into merged searches.
+        @return: A list of PlannedSearch objects
+        """
+        groups = {}
+        for (idx, qry) in enumerate(self.queries):
+            body = dict(qry.search_body)
+            body.pop('searchAreaWkt')
+            members = groups.setdefault(canonical_search_key(body), [])
+            members.append((idx, qry._get_bounds(qry.AOI)))
+        searches = []
+        for members in groups.values():
+            for cluster in self._cluster(members):
+                searches.append(PlannedSearch(self.queries[cluster[0][0]], cluster))
+        return searches
+
+    def execute(self, session):
+        """
+        Runs the planned searches concurrently, and assigns their records
+        to the queries whose AOI bounding box intersects the record footprint,
+        which matches the filtering the catalog itself applies.
+        @param session: The gbdx session object
+        @return: A list with one GBDXQueryResult per query, in the order the
+        queries were added.
+        """
+        results = [None]*len(self.queries)
+        run = lambda search: search.template._run_search(session, search.search_body)
+        for (search, json_res, err) in run_concurrently(run, self.plan(), self.max_workers):
+            if err is not None:
+                raise err
+            merged = GBDXQueryResult(json_res)
+            boxes = [box for (_, box) in search.members]
+            for ((idx, _), ids) in zip(search.members, merged.footprint_index.intersects_many(boxes)):
+                records = [merged[cid] for cid in ids]
+                stats = {'recordsReturned': len(records), 'totalRecords': len(records)}
+                results[idx] = GBDXQueryResult({'stats': stats, 'searchTag': merged.search_tag,
+                                                'results': records})
+        return results
+
+if __name__ == '__main__':
+    pass
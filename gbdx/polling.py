@@ -0,0 +1,304 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+Shared machinery for polling many long-running GBDX resources (orders,
+workflows) without hammering the API. A PollScheduler keeps one poll
+interval per tracked item, which backs off while the item's state is
+unchanged and resets when it changes, with random jitter so that items
+added together don't stay in lock-step. Polls are run concurrently in
+batches, and can share a RateLimiter with other schedulers.
+'''
+import time
+import heapq
+import random
+import itertools
+import threading
+
+import requests
+
+from gbdx.parallel import run_concurrently, DEFAULT_MAX_WORKERS
+from gbdx.transport import CircuitOpenError
+
+DEFAULT_POLL_RATE = 5.0     #requests per second, for the shared rate limiter
+DEFAULT_POLL_BURST = 10
+
+class RateLimiter(object):
+    """
+    A thread-safe token bucket. Each call to acquire() takes one token
+    (or the given number of tokens), blocking until they are available.
+    """
+    def __init__(self, rate=DEFAULT_POLL_RATE, burst=DEFAULT_POLL_BURST,
+                 clock=time.time, sleep=time.sleep):
+        """
+        Constructor
+        @param rate: The sustained number of tokens per second
+        @param burst: The maximum number of tokens that can be taken at once
+        @param clock: The time function, which can be replaced for testing
+        @param sleep: The sleep function, which can be replaced for testing
+        """
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = self.burst
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens=1):
+        """
+        Takes tokens, possibly going into debt.
+        @return: How long the caller must wait before using the token
+        """
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._last)*self.rate)
+            self._last = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens/self.rate
+
+    def acquire(self, tokens=1):
+        wait = self._reserve(tokens)
+        if wait > 0:
+            self.sleep(wait)
+
+_DEFAULT_RATE_LIMITER = None
+_DEFAULT_RATE_LIMITER_LOCK = threading.Lock()
+
+def get_default_rate_limiter():
+    """
+    Returns the process-wide RateLimiter shared by all pollers that
+    don't specify their own, creating it on first use.
+    """
+    global _DEFAULT_RATE_LIMITER
+    with _DEFAULT_RATE_LIMITER_LOCK:
+        if _DEFAULT_RATE_LIMITER is None:
+            _DEFAULT_RATE_LIMITER = RateLimiter()
+        return _DEFAULT_RATE_LIMITER
+
+def _is_throttled(err):
+    """
+    True if an exception means the API is asking us to slow down
+    """
+    if isinstance(err, CircuitOpenError):
+        return True
+    response = getattr(err, 'response', None)
+    return isinstance(err, requests.HTTPError) and response is not None \
+           and response.status_code == 429
+
+class _PollState(object):
+    __slots__ = ('interval', 'state', 'due', 'seq')
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.state = None
+        self.due = None
+        self.seq = None
+
+class PollScheduler(object):
+    """
+    Polls a set of keys (e.g. order numbers or workflow ids) until each is
+    done. The poll function is called as poll_func(key), and must return a
+    tuple (state, done), where state is any value that can be compared with
+    the previous one to detect progress, and done is True when the key no
+    longer needs to be polled. Exceptions raised by poll_func are treated
+    as "no progress", and throttling errors (HTTP 429, open circuit) back
+    off twice as fast.
+
+    The scheduler can be driven synchronously with poll_due(), or in a
+    background thread with start() and stop().
+    """
+    def __init__(self, poll_func, min_interval=10.0, max_interval=600.0,
+                 backoff_factor=1.5, jitter=0.1, batch_size=100,
+                 max_workers=DEFAULT_MAX_WORKERS, rate_limiter=None,
+                 interval_for=None, clock=time.time):
+        """
+        Constructor
+        @param poll_func: The function called to poll one key, see above
+        @param min_interval: The poll interval (seconds) for a new key, and
+        after a change of state
+        @param max_interval: The longest poll interval
+        @param backoff_factor: The interval is multiplied by this factor
+        after each poll without a change of state
+        @param jitter: Each interval is randomly scaled by up to +/- this fraction
+        @param batch_size: The maximum number of keys polled in one batch
+        @param max_workers: The maximum number of concurrent polls
+        @param rate_limiter: A RateLimiter that every poll must pass. If None,
+        the shared one from get_default_rate_limiter() is used. Set to False
+        to poll without a rate limit.
+        @param interval_for: Optional function called as interval_for(state) when
+        a key changes state, returning the poll interval to restart from, so
+        that states known to last long can be polled less often. Defaults to
+        min_interval for every state.
+        @param clock: The time function, which can be replaced for testing
+        """
+        self.poll_func = poll_func
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        if rate_limiter is None:
+            rate_limiter = get_default_rate_limiter()
+        self.rate_limiter = rate_limiter
+        self.interval_for = interval_for
+        self.clock = clock
+        self._states = {}
+        self._heap = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+
+    def __len__(self):
+        with self._cond:
+            return len(self._states)
+
+    def __contains__(self, key):
+        with self._cond:
+            return key in self._states
+
+    def keys(self):
+        """
+        @return: A list of the keys still being polled
+        """
+        with self._cond:
+            return list(self._states)
+
+    def _schedule(self, key, ps, delay):
+        #called with the lock held; older heap entries for the key become stale
+        ps.due = self.clock() + delay
+        ps.seq = next(self._counter)
+        heapq.heappush(self._heap, (ps.due, ps.seq, key))
+        self._cond.notify_all()
+
+    def _jittered(self, interval):
+        return interval*(1.0 + random.uniform(-self.jitter, self.jitter))
+
+    def add(self, key, delay=None):
+        """
+        Starts polling a key. Adding a key that is already polled resets its interval.
+        @param delay: Seconds until the first poll. Defaults to a jittered min_interval.
+        """
+        with self._cond:
+            ps = self._states[key] = _PollState(self.min_interval)
+            if delay is None:
+                delay = self._jittered(self.min_interval)
+            self._schedule(key, ps, delay)
+
+    def remove(self, key):
+        """
+        Stops polling a key
+        """
+        with self._cond:
+            self._states.pop(key, None)
+
+    def next_due(self):
+        """
+        @return: The time of the next poll, or None if there is nothing to poll
+        """
+        with self._cond:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def _drop_stale(self):
+        while self._heap:
+            (_, seq, key) = self._heap[0]
+            ps = self._states.get(key)
+            if ps is not None and ps.seq == seq:
+                return
+            heapq.heappop(self._heap)
+
+    def _take_due(self, now):
+        due = []
+        with self._cond:
+            while len(due) < self.batch_size:
+                self._drop_stale()
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                (_, _, key) = heapq.heappop(self._heap)
+                self._states[key].seq = None
+                due.append(key)
+        return due
+
+    def _poll(self, key):
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        return self.poll_func(key)
+
+    def poll_due(self, now=None):
+        """
+        Polls the keys that are due, in one concurrent batch of at most batch_size.
+        @param now: The current time; defaults to clock()
+        @return: The number of keys polled
+        """
+        if now is None:
+            now = self.clock()
+        due = self._take_due(now)
+        for (key, result, err) in run_concurrently(self._poll, due, self.max_workers):
+            with self._cond:
+                ps = self._states.get(key)
+                if ps is None or ps.seq is not None:
+                    #removed or re-added while it was being polled
+                    continue
+                if err is not None:
+                    factor = self.backoff_factor**2 if _is_throttled(err) else self.backoff_factor
+                    ps.interval = min(self.max_interval, ps.interval*factor)
+                else:
+                    (state, done) = result
+                    if done:
+                        del self._states[key]
+                        continue
+                    if state != ps.state:
+                        if self.interval_for is not None:
+                            ps.interval = self.interval_for(state)
+                        else:
+                            ps.interval = self.min_interval
+                    else:
+                        ps.interval = min(self.max_interval, ps.interval*self.backoff_factor)
+                    ps.state = state
+                self._schedule(key, ps, self._jittered(ps.interval))
+        return len(due)
+
+    def start(self):
+        """
+        Starts polling in a background (daemon) thread
+        """
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="gbdx-poller")
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """
+        Stops the background thread, after any batch in progress
+        """
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    self._drop_stale()
+                    if self._heap and self._heap[0][0] <= self.clock():
+                        break
+                    wait = self._heap[0][0] - self.clock() if self._heap else None
+                    self._cond.wait(wait)
+                if self._stopped:
+                    return
+            self.poll_due()
+
+if __name__ == '__main__':
+    pass
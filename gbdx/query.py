@@ -8,27 +8,27 @@ and related functions for performing imagery
 queries.
 '''
 import time
-import json
 
-try:
-    import shapely.geometry as sg
-    import shapely.wkt as swkt
-except ImportError:
-    print "You must have the shapely library installed for spatial queries."
+import shapely.geometry as sg
 
-from gbdx import GBDX_BASE_URL, DG_SENSOR_WV2, TEST_AOI, get_session, post_json
+from gbdx import DG_SENSOR_WV2, TEST_AOI, jsoncodec, urls
+from gbdx.parallel import run_concurrently, DEFAULT_MAX_WORKERS
+from gbdx.cache import get_default_query_cache, DEFAULT_QUERY_CACHE_TTL
+from gbdx.transport import get_transport
+from gbdx.streaming import iter_json_array, project_record
 
 class GBDXQuery(object):
     """
     This class is used to define a query object, which encapsulates
     the catalog query parameters desired by the user.
     """
-    QUERY_CACHE_DURATION = 300 #seconds
+    QUERY_CACHE_DURATION = DEFAULT_QUERY_CACHE_TTL #seconds, for the default cache
 
     def __init__(self, AOI, date_range=(None,None),
                  platform_name=DG_SENSOR_WV2,
                  max_cloud_cover=5,
-                 max_off_nadir_angle=15):
+                 max_off_nadir_angle=15,
+                 query_cache=None):
         """
         Constructor
         @param AOI: A shapely polygon object in WGS84 LON/LAT coordinates, from which
@@ -42,6 +42,10 @@ class GBDXQuery(object):
         as zero-padded YYYY-MM-DD strings. You may specify None as well. For example,
         to filter based on a start date you can set date_range=(2010-01-01, None).
         @param platform_name: DG_SENSOR_WV2, for example
+        @param query_cache: A gbdx.cache.QueryCache used to remember query results.
+        If None, the shared on-disk cache from get_default_query_cache() is used,
+        and its entries are valid for QUERY_CACHE_DURATION seconds. A cache passed
+        in uses its own ttl. Set to False to disable caching.
         """
         self.AOI = AOI
         if date_range:
@@ -51,16 +55,37 @@ class GBDXQuery(object):
         self.platform_name = platform_name
         self.max_cloud = max_cloud_cover
         self.max_off_nadir = max_off_nadir_angle
-        self._last_query_results = None
-        self._last_query_time = None
+        self.query_cache = query_cache
         self.refresh()
 
     def _get_bounds(self, AOI):
         if isinstance(AOI, sg.Polygon):
-            return AOI.bounds
+            return sg.box(*AOI.bounds)
         else:
             return sg.box(*AOI)
 
+    def _get_tiles(self, grid):
+        """
+        Splits the bounding box of the AOI into a grid of sub-boxes.
+        Tiles that do not intersect a polygonal AOI are dropped.
+        @param grid: (num_cols, num_rows)
+        @return: A list of shapely boxes
+        """
+        (nx, ny) = grid
+        (x0, y0, x1, y1) = self._get_bounds(self.AOI).bounds
+        dx = (x1-x0)/float(nx)
+        dy = (y1-y0)/float(ny)
+        tiles = []
+        for j in range(ny):
+            for i in range(nx):
+                tile = sg.box(x0+i*dx, y0+j*dy,
+                              x1 if i == nx-1 else x0+(i+1)*dx,
+                              y1 if j == ny-1 else y0+(j+1)*dy)
+                if isinstance(self.AOI, sg.Polygon) and not tile.intersects(self.AOI):
+                    continue
+                tiles.append(tile)
+        return tiles
+
     def _construct_filter_list(self):
         filters_list = [
             "sensorPlatformName = '{}'".format(self.platform_name),
@@ -82,10 +107,8 @@ class GBDXQuery(object):
     def refresh(self):
         """
         Re-constructs the search criteria data structure from any new
-        data values set, and clears out any _last_query_results
+        data values set
         """
-        self._last_query_results = None
-        self._last_query_time = None
         self.search_body = self._construct_search_criteria()
 
     def __str__(self):
@@ -97,36 +120,160 @@ class GBDXQuery(object):
         """
         return self.query(session)
 
-    def query(self, session):
+    def query(self, session, compact=False, lazy=False):
         """
         Queries the gbdx catalog and returns the results.
-        Note that this object caches the query results,
-        so that multiple calls to this method with no
-        other changes will result in only one call to the
+        Note that query results are cached on disk, keyed
+        on the search parameters, so that multiple calls with
+        the same parameters (from this or any other query object
+        or process) will result in only one call to the
         network (unless the cache expiration period has elapsed).
         If you have changed the query parameters, such as
         by setting a new AOI value, you MUST call the
         refresh() method before performing a new query,
         or you will get the results from the old parameters.
         @param session: The gbdx session object
+        @param compact: If True, the records are kept in a compact,
+        memory-efficient form. See GBDXQueryResult.
+        @param lazy: If True, each record is decoded from the response
+        only when first accessed, and only the fields that are used.
+        See gbdx.jsoncodec.loads_lazy(); this needs pysimdjson. Lazy
+        records are read-only mappings: they pickle and deepcopy as plain
+        dictionaries, but pass rec.to_dict() to json.dumps().
         """
-        query_start = time.time()
-        if self._last_query_results:
-            if query_start < self._last_query_time + \
-                             GBDXQuery.QUERY_CACHE_DURATION:
-                #use cached results
-                return GBDXQueryResult(self._last_query_results)
+        json_res = self._run_search(session, self.search_body, lazy=lazy)
 
-        payload = json.dumps(self.search_body)
-        url = "/".join([GBDX_BASE_URL,'catalog','v1','search'])
-        json_res = post_json(session, url, payload)
+        query_results = GBDXQueryResult(json_res, compact=compact)
 
-        self._last_query_results = json_res
-        self._last_query_time = query_start
+        return query_results
 
-        query_results = GBDXQueryResult(json_res)
+    def query_tiled(self, session, grid=(2,2), max_workers=DEFAULT_MAX_WORKERS,
+                    compact=False):
+        """
+        Queries the gbdx catalog by splitting the bounding box of the AOI
+        into a grid of tiles, and searching the tiles concurrently. The
+        per-tile results are merged, and records that intersect more than
+        one tile are only reported once. This is much faster than query()
+        for large AOIs, which otherwise return one huge, slow response.
+        @param session: The gbdx session object
+        @param grid: (num_cols, num_rows) of the tiling grid
+        @param max_workers: The maximum number of concurrent searches
+        @param compact: If True, the records are kept in a compact form
+        @return: A GBDXQueryResult for the whole AOI
+        @note: The results of each tile are cached separately.
+        """
+        bodies = []
+        for tile in self._get_tiles(grid):
+            body = dict(self.search_body)
+            body['searchAreaWkt'] = tile.wkt
+            bodies.append(body)
 
-        return query_results
+        responses = []
+        for (_body, json_res, err) in run_concurrently(
+                lambda b: self._run_search(session, b), bodies, max_workers):
+            if err is not None:
+                raise err
+            responses.append(json_res)
+
+        return GBDXQueryResult(merge_search_responses(responses), compact=compact)
+
+    def iter_records(self, session, fields=None, chunk_size=64*1024):
+        """
+        Queries the gbdx catalog and yields the result records one at a
+        time, as the response is received and incrementally parsed. Memory
+        use stays bounded regardless of the number of results, so use this
+        instead of query() for very large result sets.
+        @param session: The gbdx session object
+        @param fields: An optional list of the fields to keep from each record,
+        with nested fields given as dotted paths, e.g.
+        ['identifier', 'properties.cloudCover', 'properties.timestamp'].
+        If None, the whole records are returned.
+        @param chunk_size: The number of bytes read from the network at a time
+        @note: Streamed queries bypass the query cache, and records are
+        yielded in the order returned by the catalog (not sorted by id).
+        """
+        payload = jsoncodec.dumps(self.search_body)
+        headers = {'Content-type': 'application/json'}
+        ret = get_transport(session).post(urls.catalog_search_url(), data=payload,
+                                          headers=headers, stream=True)
+        try:
+            for record in iter_json_array(ret.iter_content(chunk_size), 'results'):
+                yield project_record(record, fields) if fields else record
+        finally:
+            ret.close()
+
+    def _get_query_cache(self):
+        if self.query_cache is None:
+            return get_default_query_cache()
+        return self.query_cache or None
+
+    def _get_query_cache_ttl(self):
+        #the ttl of a cache passed in by the user is left alone
+        return self.QUERY_CACHE_DURATION if self.query_cache is None else None
+
+    def query_incremental(self, session, store=None, overlap_days=1):
+        """
+        Queries the gbdx catalog for the records that are new or changed
+        since the last incremental run of an identical query (same AOI and
+        filters, whatever the start date). The latest acquisition timestamp
+        seen so far is remembered, and the search start date is narrowed to
+        it, so repeated runs of a standing query only fetch recent records.
+        All the records seen are merged into a persistent store.
+        @param session: The gbdx session object
+        @param store: A gbdx.incremental.DeltaStore. If None, the shared
+        on-disk store from get_default_delta_store() is used.
+        @param overlap_days: The number of days before the latest timestamp
+        seen to search again, to catch late-arriving or updated records
+        @return: A GBDXQueryResult with only the new or changed records. The
+        first run returns all the records. Use query_stored() for all of them.
+        @note: Incremental queries bypass the query cache.
+        """
+        from gbdx.incremental import get_default_delta_store, query_fingerprint, \
+                                     narrowed_start_date
+        store = store or get_default_delta_store()
+        fingerprint = query_fingerprint(self.search_body)
+        body = dict(self.search_body)
+        body['startDate'] = narrowed_start_date(self.start_date,
+                                                store.latest_timestamp(fingerprint),
+                                                overlap_days)
+        query_start = time.time()
+        json_res = self._run_search(session, body, use_cache=False)
+        delta = store.merge(fingerprint, json_res['results'], query_start)
+        stats = {'recordsReturned': len(delta), 'totalRecords': len(delta)}
+        return GBDXQueryResult({'stats': stats, 'searchTag': json_res.get('searchTag'),
+                                'results': delta})
+
+    def query_stored(self, store=None):
+        """
+        Returns all the records merged into the store by the incremental
+        runs of this query, without querying the catalog.
+        @param store: A gbdx.incremental.DeltaStore, see query_incremental()
+        @return: A GBDXQueryResult
+        """
+        from gbdx.incremental import get_default_delta_store, query_fingerprint
+        store = store or get_default_delta_store()
+        records = store.records(query_fingerprint(self.search_body))
+        stats = {'recordsReturned': len(records), 'totalRecords': len(records)}
+        return GBDXQueryResult({'stats': stats, 'searchTag': None, 'results': records})
+
+    def _run_search(self, session, search_body, use_cache=True, lazy=False):
+        """
+        Posts a single catalog search and returns the json response,
+        or returns the cached response for an identical search.
+        The response bytes are cached as received, and decoded once.
+        """
+        url = urls.catalog_search_url()
+        cache = self._get_query_cache() if use_cache else None
+        raw = None
+        if cache is not None:
+            raw = cache.get_raw(search_body, self._get_query_cache_ttl())
+        if raw is None:
+            headers = {'Content-type': 'application/json'}
+            raw = get_transport(session).post(url, data=jsoncodec.dumps(search_body),
+                                              headers=headers).content
+            if cache is not None:
+                cache.put_raw(search_body, raw)
+        return get_transport(session).decode_json(url, raw, lazy=lazy)
 
 class GBDXQueryResult(object):
     """
@@ -134,18 +281,40 @@ class GBDXQueryResult(object):
     for quickly extracting commonly-used information
     from a catalog query result structure
     """
-    def __init__(self, results_dict):
+    def __init__(self, results_dict, compact=False):
+        """
+        Constructor
+        @param results_dict: The json response of a catalog search
+        @param compact: If True, each record is converted to a gbdx.records.CompactRecord,
+        which shares its key names with the other records, interns repeated strings
+        and stores the footprint as WKB. Compact records are read-only, but otherwise
+        behave like the record dictionaries, e.g. rec['properties']['cloudCover'].
+        Use this to reduce memory use when holding many result sets.
+        """
         self.stats = results_dict['stats']
         self.search_tag = results_dict['searchTag']
-        self.results = self._get_sorted_results(results_dict['results'])
+        self.compact = compact
+        raw_results = results_dict['results']
+        if compact:
+            from gbdx.records import CompactRecordFactory
+            raw_results = list(map(CompactRecordFactory(), raw_results))
+        self.results = self._get_sorted_results(raw_results)
+        #identifier->record index and the (already sorted) id list,
+        # so lookups by cat_id don't have to scan the results
+        self._ids = [record['identifier'] for record in self.results]
+        self._index = dict(zip(self._ids, self.results))
+        self._footprint_index = None
+        self._columns = None
 
     def _get_sorted_results(self, raw_results):
-        tmp = sorted( [ (record['identifier'], record) for record in raw_results])
-        return [rec for (_,rec) in tmp]
+        return sorted(raw_results, key=lambda record: record['identifier'])
 
     def __len__(self):
         return self.stats['totalRecords']
 
+    def __iter__(self):
+        return iter(self.results)
+
     def __getitem__(self, i):
         if self.results is None:
             raise KeyError("Result set is empty!")
@@ -175,29 +344,55 @@ class GBDXQueryResult(object):
         for the given id (cat_id), if one exists.
         Raises KeyError otherwise.
         """
-        for record in self:
-            if record['identifier'] == ID:
-                break
-        else:
+        try:
+            return self._index[ID]
+        except KeyError:
             raise KeyError("Result set does not contain {}".format(ID))
-        return record
 
     def list_IDs(self):
         """
         Lists the identifiers (cat_ids) for all the results
         """
-        return sorted( [r['identifier'] for r in self] )
+        return list(self._ids)
 
     def list_property_keys(self):
         """
         This method returns the available property keys
-        in the result items. It makes the assumption that
-        all keys are the same for all results, and is
-        thus a convenience function for the user, especially
-        when using this code interactively.
+        in the result items, which is the union of the keys
+        of all the results. It is a convenience function for
+        the user, especially when using this code interactively.
+        """
+        keys = set()
+        for rec in self.results:
+            keys.update(rec['properties'].keys())
+        return sorted(keys)
+
+    def to_columns(self, include_bounds=True):
+        """
+        Returns a columnar view of this result set, with the record properties
+        flattened into typed numpy arrays (e.g. float cloudCover, datetime64
+        timestamp), supporting vectorized filtering and sorting.
+        @param include_bounds: If True, the footprint bounds are added as the
+        minx, miny, maxx and maxy columns.
+        @return: A gbdx.columns.QueryColumns object, rows in identifier order
+        """
+        if self._columns is None or (include_bounds and 'minx' not in self._columns):
+            from gbdx.columns import QueryColumns
+            bounds = self.footprint_index.bounds() if include_bounds else None
+            self._columns = QueryColumns.from_records(self.results, bounds)
+        return self._columns
+
+    def to_arrow(self):
+        """
+        Returns this result set as a pyarrow Table. See to_columns().
         """
-        _tmp = self[0]
-        return _tmp['properties'].keys()
+        return self.to_columns().to_arrow()
+
+    def to_dataframe(self):
+        """
+        Returns this result set as a pandas DataFrame. See to_columns().
+        """
+        return self.to_columns().to_dataframe()
 
     def get_property_from_id(self,ID,key):
         """
@@ -211,28 +406,114 @@ class GBDXQueryResult(object):
         rec = self.get_record_for_ID(ID)
         return rec['properties'][key]
 
+    @property
+    def footprint_index(self):
+        """
+        A FootprintIndex of all the footprints in this result set,
+        which is built (parsing each footprint once) on first use.
+        """
+        if self._footprint_index is None:
+            from gbdx.geometry import FootprintIndex
+            if self.compact:
+                wkbs = [rec.footprint_wkb for rec in self.results]
+                self._footprint_index = FootprintIndex.from_wkb(self._ids, wkbs)
+            else:
+                wkts = [rec['properties'].get('footprintWkt') for rec in self.results]
+                self._footprint_index = FootprintIndex.from_wkt(self._ids, wkts)
+        return self._footprint_index
+
     def get_footprint_from_id(self, ID):
         """
         Returns a shapely polygon of the footprint
         of the image referenced by ID
         """
-        f = self.get_property_from_id(ID, 'footprintWkt')
-        return swkt.loads(f)
-    
+        self.get_record_for_ID(ID)  #raises KeyError for unknown IDs
+        return self.footprint_index.geometry(ID)
+
     def get_ids_containing_poly(self, poly):
         """
         Checks the footprint shape of each of the images in this result set,
         and returns only those where the footprint fully contains the input
         shapely polygon.
         """
-        filtered = [ cid for cid in self.list_IDs() if self.get_footprint_from_id(cid).contains(poly) ]
-        return filtered
+        return self.footprint_index.contains(poly)
+
+    def get_ids_intersecting_poly(self, poly):
+        """
+        Returns the ids of the images whose footprint intersects
+        the input shapely polygon.
+        """
+        return self.footprint_index.intersects(poly)
+
+    def get_coverage_fractions(self, poly):
+        """
+        Returns a dictionary {cat_id: fraction} giving, for each image
+        that intersects the input shapely polygon, the fraction of the
+        polygon's area covered by the image footprint.
+        """
+        return self.footprint_index.coverage_fractions(poly)
+
+    def get_ids_covering_poly(self, poly, target=1.0, cloud_weight=1.0,
+                              nadir_weight=0.5, age_weight=0.25, resolution=200):
+        """
+        Selects a small set of images whose footprints together cover the
+        input shapely polygon, preferring clear, near-nadir and recent images.
+        Use this when no single image contains the polygon.
+        @param target: The fraction of the polygon to cover, up to 1.0
+        @param cloud_weight, nadir_weight, age_weight: The weights of cloud cover,
+        off-nadir angle and age in the cost of an image.
+        See gbdx.columns.QueryColumns.scene_costs()
+        @param resolution: The raster resolution of the coverage computation.
+        See gbdx.geometry.FootprintIndex.select_covering()
+        @return: (cat_ids, pct_covered) where pct_covered is the percentage
+        of the polygon's area covered by the selected images
+        """
+        costs = self.to_columns(include_bounds=False).scene_costs(cloud_weight, nadir_weight,
+                                                                 age_weight)
+        (ids, covered) = self.footprint_index.select_covering(poly, costs, target, resolution)
+        return (ids, 100.0*covered)
+
+    def get_ids_containing_polys(self, polys):
+        """
+        Batch version of get_ids_containing_poly(), which tests
+        many polygons against this result set in one call.
+        @param polys: A sequence of shapely polygons
+        @return: A list with one list of cat_ids per input polygon
+        """
+        return self.footprint_index.contains_many(polys)
+
+def merge_search_responses(responses):
+    """
+    Merges several catalog search responses into a single response
+    structure, removing duplicate records by identifier.
+    @param responses: A list of json responses from catalog/v1/search
+    @return: A dictionary suitable for constructing a GBDXQueryResult
+    """
+    records = {}
+    search_tag = None
+    for res in responses:
+        if search_tag is None:
+            search_tag = res.get('searchTag')
+        for record in res['results']:
+            records.setdefault(record['identifier'], record)
+
+    type_counts = {}
+    for record in records.values():
+        rec_type = record.get('type')
+        type_counts[rec_type] = type_counts.get(rec_type, 0) + 1
+
+    stats = {'recordsReturned': len(records),
+             'totalRecords': len(records),
+             'typeCounts': type_counts}
+    return {'stats': stats, 'searchTag': search_tag,
+            'results': list(records.values())}
 
 def get_test_query_results():
     """
     Convenience function to quickly get a testing result set.
     This is useful when demonstrating via an interactive IPython shell, etc.
     """
+    from gbdx import get_session
     gbdx = get_session()
     qry = GBDXQuery(TEST_AOI)
     res = qry(gbdx)
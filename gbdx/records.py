@@ -0,0 +1,138 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+A compact, memory-efficient representation of catalog records.
+Each record keeps its values in a tuple, while the key names are
+held once in a schema shared by all records with the same keys.
+Repeated strings are interned, and the footprint is kept as WKB
+and only converted back to WKT (or a shapely geometry) on demand.
+'''
+import sys
+
+from collections.abc import Mapping
+
+import shapely
+
+FOOTPRINT_KEY = 'footprintWkt'
+
+#strings longer than this are not interned
+_MAX_INTERN_LENGTH = 64
+
+def _intern(value):
+    if isinstance(value, str) and len(value) <= _MAX_INTERN_LENGTH:
+        return sys.intern(value)
+    return value
+
+class _Schema(object):
+    """
+    The key names of a record, and the position of each value
+    """
+    __slots__ = ('keys', 'property_keys', 'positions', 'property_positions')
+
+    def __init__(self, keys, property_keys):
+        self.keys = keys
+        self.property_keys = property_keys
+        self.positions = dict((k, i) for (i, k) in enumerate(keys))
+        self.property_positions = dict((k, len(keys)+i) for (i, k) in enumerate(property_keys))
+
+class CompactRecordFactory(object):
+    """
+    Converts catalog record dictionaries into CompactRecords, sharing
+    one schema between all records that have the same keys.
+    """
+    def __init__(self):
+        self._schemas = {}
+
+    def _schema(self, keys, property_keys):
+        signature = (keys, property_keys)
+        schema = self._schemas.get(signature)
+        if schema is None:
+            schema = self._schemas[signature] = _Schema(keys, property_keys)
+        return schema
+
+    def __call__(self, record):
+        properties = record.get('properties', {})
+        keys = tuple(sys.intern(k) for k in record if k != 'properties')
+        property_keys = tuple(sys.intern(k) for k in properties if k != FOOTPRINT_KEY)
+        values = tuple(_intern(record[k]) for k in keys) + \
+                 tuple(_intern(properties[k]) for k in property_keys)
+        wkt = properties.get(FOOTPRINT_KEY)
+        wkb = shapely.to_wkb(shapely.from_wkt(wkt)) if wkt is not None else None
+        return CompactRecord(self._schema(keys, property_keys), values, wkb)
+
+class CompactRecord(Mapping):
+    """
+    A read-only catalog record that behaves like the original record
+    dictionary, e.g. rec['identifier'] or rec['properties']['cloudCover'].
+    """
+    __slots__ = ('_schema', '_values', 'footprint_wkb')
+
+    def __init__(self, schema, values, footprint_wkb):
+        self._schema = schema
+        self._values = values
+        self.footprint_wkb = footprint_wkb
+
+    def __getitem__(self, key):
+        if key == 'properties':
+            return CompactProperties(self)
+        return self._values[self._schema.positions[key]]
+
+    def __iter__(self):
+        for key in self._schema.keys:
+            yield key
+        yield 'properties'
+
+    def __len__(self):
+        return len(self._schema.keys) + 1
+
+    @property
+    def footprint(self):
+        """
+        The footprint as a shapely geometry, or None
+        """
+        if self.footprint_wkb is None:
+            return None
+        return shapely.from_wkb(self.footprint_wkb)
+
+    def to_dict(self):
+        """
+        Returns the record as a plain (nested) dictionary
+        """
+        rec = dict((k, self[k]) for k in self._schema.keys)
+        rec['properties'] = dict(self['properties'])
+        return rec
+
+    def __repr__(self):
+        return "CompactRecord({!r})".format(self.to_dict())
+
+class CompactProperties(Mapping):
+    """
+    A read-only view of the properties of a CompactRecord. The
+    footprintWkt property is re-created from the WKB when accessed.
+    """
+    __slots__ = ('_record',)
+
+    def __init__(self, record):
+        self._record = record
+
+    def __getitem__(self, key):
+        rec = self._record
+        if key == FOOTPRINT_KEY and rec.footprint_wkb is not None:
+            #full precision, as the default rounds coordinates to 6 decimals
+            return shapely.to_wkt(shapely.from_wkb(rec.footprint_wkb),
+                                  rounding_precision=-1, trim=True)
+        return rec._values[rec._schema.property_positions[key]]
+
+    def __iter__(self):
+        for key in self._record._schema.property_keys:
+            yield key
+        if self._record.footprint_wkb is not None:
+            yield FOOTPRINT_KEY
+
+    def __len__(self):
+        return len(self._record._schema.property_keys) + \
+               (1 if self._record.footprint_wkb is not None else 0)
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,195 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+A cache of the GBDX task list and task definitions, which change rarely
+but are needed over and over when building and validating workflows.
+Entries are reused for a time-to-live, then revalidated with a
+conditional request (If-None-Match), so that an unchanged definition
+costs a 304 response instead of a full download. The registry can be
+saved to a JSON snapshot on disk, for fast startup and offline use.
+'''
+import os
+import json
+import time
+import tempfile
+import warnings
+import threading
+
+import requests
+
+from gbdx import urls
+from gbdx.transport import get_transport, CircuitOpenError
+from gbdx.parallel import run_concurrently, DEFAULT_MAX_WORKERS
+from gbdx.instrumentation import get_metrics
+
+DEFAULT_TASK_REGISTRY_PATH = os.path.join(os.path.expanduser("~"), ".gbdx",
+                                          "task_registry.json")
+DEFAULT_TASK_REGISTRY_TTL = 3600  #seconds
+
+_TASK_LIST_KEY = None   #entry key of the task list, task definitions are keyed by name
+
+class TaskRegistry(object):
+    """
+    A cache of the task list and task definitions, shared by all the
+    sessions that use it. For example:
+        registry = TaskRegistry()
+        registry.prefetch(session)  #all definitions, concurrently
+        defn = registry.get_definition(session, "AOP_Strip_Processor")
+    """
+    def __init__(self, path=DEFAULT_TASK_REGISTRY_PATH, ttl=DEFAULT_TASK_REGISTRY_TTL,
+                 max_workers=DEFAULT_MAX_WORKERS, clock=time.time):
+        """
+        Constructor
+        @param path: The JSON snapshot file, which is loaded now if it exists, and
+        updated after each change. Set to None to keep the registry in memory only.
+        @param ttl: How long, in seconds, an entry is used without revalidation
+        @param max_workers: The maximum number of concurrent requests in prefetch()
+        @param clock: The time function, which can be replaced for testing
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self.clock = clock
+        self.request_count = 0  #number of requests sent, including revalidations
+        self._entries = {}
+        self._save_warned = False
+        self._lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def load(self):
+        """
+        Loads the entries of the snapshot file. A corrupt snapshot is ignored.
+        """
+        try:
+            with open(self.path) as f:
+                snapshot = json.load(f)
+        except (IOError, ValueError):
+            return
+        entries = dict(snapshot.get('tasks', {}))
+        if 'task_list' in snapshot:
+            entries[_TASK_LIST_KEY] = snapshot['task_list']
+        with self._lock:
+            self._entries.update(entries)
+
+    def save(self):
+        """
+        Writes the entries to the snapshot file, replacing it atomically.
+        If the file can't be written (e.g. a read-only home directory), a
+        warning is issued once and the entries are kept in memory only.
+        """
+        if self.path is None:
+            return
+        with self._lock:
+            tasks = dict((k, v) for (k, v) in self._entries.items() if k is not _TASK_LIST_KEY)
+            snapshot = {'tasks': tasks}
+            if _TASK_LIST_KEY in self._entries:
+                snapshot['task_list'] = self._entries[_TASK_LIST_KEY]
+            snapshot_dir = os.path.dirname(os.path.abspath(self.path))
+            tmp_path = None
+            try:
+                if not os.path.isdir(snapshot_dir):
+                    os.makedirs(snapshot_dir)
+                (fd, tmp_path) = tempfile.mkstemp(dir=snapshot_dir, suffix=".tmp")
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(snapshot, f)
+                os.replace(tmp_path, self.path)
+            except (OSError, TypeError, ValueError) as e:
+                if tmp_path is not None and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                if not self._save_warned:
+                    self._save_warned = True
+                    warnings.warn("Task registry not saved, unable to write {}: {}".format(
+                                  self.path, e))
+
+    def clear(self):
+        """
+        Removes all entries, so that the next lookups go to the server
+        """
+        with self._lock:
+            self._entries.clear()
+        self.save()
+
+    def _fetch(self, session, key, url, save=True):
+        """
+        Returns the json for an entry, from the cache if fresh, otherwise
+        revalidated or downloaded. If the server can't be reached, a stale
+        entry is returned rather than failing.
+        """
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+        fresh = entry is not None and now - entry['fetched'] < self.ttl
+        get_metrics().cache_event('task_registry', fresh)
+        if fresh:
+            return entry['data']
+
+        headers = {'Content-type': 'application/json'}
+        if entry is not None and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        with self._lock:
+            self.request_count += 1
+        transport = get_transport(session)
+        try:
+            ret = transport.get(url, headers=headers)
+        except (requests.ConnectionError, requests.Timeout, CircuitOpenError):
+            if entry is not None:
+                return entry['data']
+            raise
+        if ret.status_code == 304 and entry is not None:
+            entry = dict(entry, fetched=now)
+        else:
+            entry = {'data': transport.decode_json(url, ret.content),
+                     'etag': ret.headers.get('ETag'), 'fetched': now}
+        with self._lock:
+            self._entries[key] = entry
+        if save:
+            self.save()
+        return entry['data']
+
+    def list_tasks(self, session):
+        """
+        @return: The list of available task names, as list_available_tasks
+        """
+        return self._fetch(session, _TASK_LIST_KEY, urls.tasks_url())["tasks"]
+
+    def get_definition(self, session, task_name):
+        """
+        @return: The definition of a task, as get_task_definition
+        """
+        return self._fetch(session, task_name, urls.tasks_url(task_name))
+
+    def prefetch(self, session, task_names=None):
+        """
+        Fetches (or revalidates) many task definitions concurrently, and
+        saves the snapshot once at the end.
+        @param task_names: The tasks to fetch; defaults to all available tasks
+        @return: A dictionary {task_name: exception} of the definitions that
+        could not be fetched, empty if all succeeded.
+        """
+        if task_names is None:
+            task_names = self.list_tasks(session)
+        fetch = lambda name: self._fetch(session, name, urls.tasks_url(name), save=False)
+        errors = {}
+        for (name, _, err) in run_concurrently(fetch, task_names, self.max_workers):
+            if err is not None:
+                errors[name] = err
+        self.save()
+        return errors
+
+_DEFAULT_TASK_REGISTRY = None
+_DEFAULT_TASK_REGISTRY_LOCK = threading.Lock()
+
+def get_default_task_registry():
+    """
+    Returns the process-wide default TaskRegistry, creating it on first use.
+    """
+    global _DEFAULT_TASK_REGISTRY
+    with _DEFAULT_TASK_REGISTRY_LOCK:
+        if _DEFAULT_TASK_REGISTRY is None:
+            _DEFAULT_TASK_REGISTRY = TaskRegistry()
+        return _DEFAULT_TASK_REGISTRY
+
+if __name__ == '__main__':
+    pass
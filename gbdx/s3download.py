@@ -0,0 +1,408 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+Bulk download of delivered imagery from S3, using the temporary
+credentials from get_s3creds. The objects under the delivery locations
+of an order (or any s3:// prefix) are listed, split into parts, and
+the parts of all objects are fetched concurrently with ranged GETs.
+Progress is recorded next to each partial file, so an interrupted
+download resumes where it stopped. Transient errors are retried with
+exponential backoff. Completed files are checked against their S3 ETag
+(the MD5 of single-part uploads) or size, and the credentials are
+renewed before they expire. For example:
+
+    downloader = S3Downloader(session, max_workers=16, max_bandwidth=50e6)
+    for (key, path, err) in downloader.download_order(soli, "/data/imagery"):
+        ...
+
+Requires boto3.
+'''
+import os
+import json
+import time
+import errno
+import random
+import hashlib
+import threading
+import functools
+from collections import namedtuple
+from concurrent.futures import TimeoutError
+
+try:
+    import boto3
+    from botocore.config import Config
+    from botocore.exceptions import ClientError, ConnectionError as BotoConnectionError, \
+                                    IncompleteReadError
+except ImportError:
+    boto3 = None
+    ClientError = BotoConnectionError = IncompleteReadError = None
+
+from gbdx.core import get_s3creds, get_order_status
+from gbdx.orders import OrderManager, _percent
+from gbdx.parallel import run_concurrently, DEFAULT_MAX_WORKERS
+from gbdx.polling import RateLimiter
+
+DEFAULT_PART_SIZE = 8*1024*1024     #bytes per ranged GET
+DEFAULT_CREDENTIALS_DURATION = 3600 #seconds, see get_s3creds
+READ_CHUNK_SIZE = 256*1024
+PARTIAL_SUFFIX = ".part"
+PROGRESS_SUFFIX = ".part.json"
+GBDX_S3_REGION = "us-east-1"
+#S3 error codes worth retrying; other client errors (AccessDenied, NoSuchKey...) are final
+TRANSIENT_S3_ERRORS = ('RequestTimeout', 'SlowDown', 'Throttling', 'ThrottlingException',
+                       'InternalError', 'ServiceUnavailable', 'ExpiredToken',
+                       'TokenRefreshRequired')
+#local I/O errors that a retry won't fix
+FATAL_IO_ERRNOS = (errno.ENOSPC, errno.EDQUOT, errno.EROFS, errno.EACCES, errno.EPERM)
+
+class ChecksumError(IOError):
+    """
+    Raised when a downloaded file doesn't match its S3 ETag or size
+    """
+    pass
+
+class S3Object(namedtuple('S3Object', ['bucket', 'key', 'size', 'etag'])):
+    """
+    An object listed under a delivery prefix
+    """
+    __slots__ = ()
+
+def parse_s3_url(s3_url):
+    """
+    Splits s3://bucket/prefix into (bucket, prefix)
+    """
+    if not s3_url.startswith("s3://"):
+        raise ValueError("Not an s3 url: {}".format(s3_url))
+    (bucket, _, prefix) = s3_url[len("s3://"):].partition("/")
+    return (bucket, prefix)
+
+def order_locations(order_status):
+    """
+    @param order_status: An order status dictionary, from get_order_status
+    @return: The s3 urls of the line items that are fully delivered
+    """
+    return [line['location'] for line in order_status.get('lines', [])
+            if line.get('location') and _percent(line.get('percentDelivered')) >= 100]
+
+def s3_client(s3_data, endpoint_url=None, max_pool_connections=DEFAULT_MAX_WORKERS,
+              region_name=GBDX_S3_REGION):
+    """
+    Creates a boto3 S3 client from the credentials returned by get_s3creds
+    @param endpoint_url: An alternative S3 endpoint, e.g. a local MinIO server
+    """
+    if boto3 is None:
+        raise ImportError("You must have the boto3 library installed for S3 downloads.")
+    return boto3.client('s3', aws_access_key_id=s3_data['S3_access_key'],
+                        aws_secret_access_key=s3_data['S3_secret_key'],
+                        aws_session_token=s3_data.get('S3_session_token'),
+                        endpoint_url=endpoint_url, region_name=region_name,
+                        config=Config(max_pool_connections=max_pool_connections))
+
+def _is_expired_token(err):
+    if ClientError is None or not isinstance(err, ClientError):
+        return False
+    return err.response.get('Error', {}).get('Code') in ('ExpiredToken', 'TokenRefreshRequired')
+
+def _is_transient(err):
+    """
+    True for the errors that may succeed when retried: throttling, S3
+    server errors, expired credentials, and network errors
+    """
+    if ClientError is not None and isinstance(err, ClientError):
+        error = err.response.get('Error', {})
+        status = err.response.get('ResponseMetadata', {}).get('HTTPStatusCode') or 0
+        return error.get('Code') in TRANSIENT_S3_ERRORS or status >= 500
+    if BotoConnectionError is not None and isinstance(err, (BotoConnectionError,
+                                                            IncompleteReadError)):
+        return True
+    if isinstance(err, (IOError, OSError)):
+        return err.errno not in FATAL_IO_ERRNOS
+    return False
+
+def file_md5(path, chunk_size=READ_CHUNK_SIZE*4):
+    md5 = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+class _ObjectDownload(object):
+    """
+    The download state of one object: its partial file, and the parts done
+    """
+    def __init__(self, obj, path, part_size):
+        self.obj = obj
+        self.path = path
+        self.part_size = part_size
+        self.num_parts = (obj.size + part_size - 1)//part_size
+        self.partial_path = path + PARTIAL_SUFFIX
+        self.progress_path = path + PROGRESS_SUFFIX
+        self.done = set()
+        self.error = None
+        self.lock = threading.Lock()
+        self._resume()
+
+    def _resume(self):
+        try:
+            with open(self.progress_path) as f:
+                progress = json.load(f)
+        except (IOError, ValueError):
+            progress = None
+        if progress is not None and os.path.exists(self.partial_path) and \
+                (progress.get('etag'), progress.get('size'), progress.get('part_size')) == \
+                (self.obj.etag, self.obj.size, self.part_size):
+            self.done = set(progress['done'])
+            return
+        #nothing to resume, or the object changed: start over
+        parent = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.isdir(parent):
+            os.makedirs(parent)
+        with open(self.partial_path, 'wb') as f:
+            f.truncate(self.obj.size)
+        self._save_progress()
+
+    def _save_progress(self):
+        progress = {'etag': self.obj.etag, 'size': self.obj.size,
+                    'part_size': self.part_size, 'done': sorted(self.done)}
+        tmp_path = self.progress_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(progress, f)
+        os.replace(tmp_path, self.progress_path)
+
+    def pending_parts(self):
+        return [i for i in range(self.num_parts) if i not in self.done]
+
+    def part_range(self, i):
+        start = i*self.part_size
+        return (start, min(start + self.part_size, self.obj.size))
+
+    def part_done(self, i):
+        """
+        Records a finished part.
+        @return: True if this was the last part
+        """
+        with self.lock:
+            self.done.add(i)
+            self._save_progress()
+            return len(self.done) == self.num_parts
+
+    def finalize(self):
+        """
+        Verifies the partial file and moves it into place.
+        Raises ChecksumError, after discarding the partial file, if it doesn't match.
+        """
+        size = os.path.getsize(self.partial_path)
+        #the ETag of a multipart upload isn't a plain MD5, so only the size is checked
+        if size != self.obj.size or ('-' not in self.obj.etag and
+                                     file_md5(self.partial_path) != self.obj.etag):
+            os.remove(self.partial_path)
+            os.remove(self.progress_path)
+            raise ChecksumError("Checksum mismatch for s3://{}/{}".format(self.obj.bucket,
+                                                                          self.obj.key))
+        os.replace(self.partial_path, self.path)
+        os.remove(self.progress_path)
+
+class S3Downloader(object):
+    """
+    Downloads delivered imagery from S3 with concurrent ranged GETs,
+    see the module docstring
+    """
+    def __init__(self, session, max_workers=DEFAULT_MAX_WORKERS, part_size=DEFAULT_PART_SIZE,
+                 max_bandwidth=None, duration=DEFAULT_CREDENTIALS_DURATION, refresh_margin=300,
+                 max_retries=3, backoff_factor=0.5, max_backoff=30, endpoint_url=None,
+                 client_factory=None, clock=time.time):
+        """
+        Constructor
+        @param session: The gbdx session, from gbdx_auth.get_session.
+        @param max_workers: The maximum number of concurrent GET requests, over all objects
+        @param part_size: The number of bytes fetched by each ranged GET
+        @param max_bandwidth: The maximum total download rate, in bytes per second, or None
+        @param duration: The lifetime, in seconds, of the credentials from get_s3creds
+        @param refresh_margin: The credentials are renewed this many seconds before they expire
+        @param max_retries: The number of times a part is retried after a
+        transient error (throttling, server or network error, expired credentials)
+        @param backoff_factor: Retry n waits about backoff_factor*2**n seconds,
+        as with gbdx.transport.Transport. Expired credentials are renewed and
+        retried at once.
+        @param max_backoff: The upper bound, in seconds, of a single wait.
+        @param endpoint_url: An alternative S3 endpoint, e.g. a local MinIO server
+        @param client_factory: The function that creates an S3 client from the
+        get_s3creds dictionary. Defaults to s3_client().
+        @param clock: The time function, which can be replaced for testing
+        """
+        self.session = session
+        self.max_workers = max_workers
+        self.part_size = part_size
+        self.duration = duration
+        self.refresh_margin = refresh_margin
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.client_factory = client_factory or functools.partial(
+            s3_client, endpoint_url=endpoint_url, max_pool_connections=max_workers)
+        self.clock = clock
+        self.bandwidth_limiter = None
+        if max_bandwidth:
+            self.bandwidth_limiter = RateLimiter(rate=max_bandwidth, burst=max_bandwidth)
+        self.bytes_downloaded = 0
+        self.credential_refreshes = 0
+        self._client = None
+        self._expires = None
+        self._lock = threading.Lock()
+
+    def client(self, stale=None):
+        """
+        Returns the S3 client, renewing the credentials if they are about to expire
+        @param stale: A client whose credentials were rejected (e.g. with an
+        ExpiredToken error). The credentials are renewed if it is still the
+        current client, so that concurrent workers that see the same error
+        renew them only once.
+        """
+        with self._lock:
+            if self._client is None or self._client is stale or \
+                    self.clock() >= self._expires - self.refresh_margin:
+                (_, s3_data) = get_s3creds(self.session, self.duration)
+                self._client = self.client_factory(s3_data)
+                self._expires = self.clock() + self.duration
+                self.credential_refreshes += 1
+            return self._client
+
+    def list_objects(self, s3_url):
+        """
+        Lists the objects under an s3://bucket/prefix url
+        @return: A list of S3Objects
+        """
+        (bucket, prefix) = parse_s3_url(s3_url)
+        kwargs = {'Bucket': bucket, 'Prefix': prefix}
+        objects = []
+        while True:
+            page = self.client().list_objects_v2(**kwargs)
+            for item in page.get('Contents', []):
+                objects.append(S3Object(bucket, item['Key'], item['Size'], item['ETag'].strip('"')))
+            if not page.get('IsTruncated'):
+                return objects
+            kwargs['ContinuationToken'] = page['NextContinuationToken']
+
+    def _backoff(self, attempt):
+        delay = self.backoff_factor*(2**attempt)
+        delay += random.uniform(0, delay/2.0)
+        time.sleep(min(delay, self.max_backoff))
+
+    def _fetch_part(self, job, i):
+        (start, end) = job.part_range(i)
+        for attempt in range(self.max_retries + 1):
+            client = None
+            try:
+                client = self.client()
+                ret = client.get_object(Bucket=job.obj.bucket, Key=job.obj.key,
+                                               Range="bytes={}-{}".format(start, end - 1))
+                written = 0
+                with open(job.partial_path, 'r+b') as f:
+                    f.seek(start)
+                    body = ret['Body']
+                    for chunk in iter(lambda: body.read(READ_CHUNK_SIZE), b""):
+                        if self.bandwidth_limiter is not None:
+                            self.bandwidth_limiter.acquire(len(chunk))
+                        f.write(chunk)
+                        written += len(chunk)
+                if written != end - start:
+                    raise IOError("Short read of s3://{}/{}: {} of {} bytes".format(
+                                  job.obj.bucket, job.obj.key, written, end - start))
+                break
+            except Exception as e:
+                if attempt == self.max_retries or not _is_transient(e):
+                    raise
+                if _is_expired_token(e):
+                    self.client(stale=client)
+                else:
+                    self._backoff(attempt)
+        with self._lock:
+            self.bytes_downloaded += end - start
+        if job.part_done(i):
+            job.finalize()
+
+    def download(self, s3_urls, dest_dir):
+        """
+        Downloads all the objects under one or more s3 urls. The files are
+        placed under dest_dir, in a directory named after the last part of
+        each url's prefix. Complete files are skipped, and partial ones resumed.
+        Objects whose key would place them outside dest_dir (e.g. with '..'
+        segments) are not downloaded.
+        @param s3_urls: An s3://bucket/prefix url, or a list of them
+        @return: A list of (key, local path, error) tuples, one per object,
+        where error is None or the exception that made the download fail
+        """
+        if isinstance(s3_urls, str):
+            s3_urls = [s3_urls]
+        root = os.path.realpath(dest_dir)
+        results = []
+        jobs = []
+        for s3_url in s3_urls:
+            (_, prefix) = parse_s3_url(s3_url)
+            base = prefix.rstrip('/').rpartition('/')[0]
+            for obj in self.list_objects(s3_url):
+                relative = obj.key[len(base):].lstrip('/') if base else obj.key
+                path = os.path.join(dest_dir, *relative.split('/'))
+                resolved = os.path.realpath(path)
+                if resolved == root or os.path.commonpath([root, resolved]) != root:
+                    results.append((obj.key, None, ValueError(
+                        "Refusing to download s3://{}/{} outside of {}".format(
+                        obj.bucket, obj.key, dest_dir))))
+                elif os.path.exists(path) and os.path.getsize(path) == obj.size:
+                    results.append((obj.key, path, None))
+                else:
+                    jobs.append(_ObjectDownload(obj, path, self.part_size))
+
+        parts = []
+        for job in jobs:
+            pending = job.pending_parts()
+            if pending:
+                parts.extend((job, i) for i in pending)
+            else:
+                try:
+                    job.finalize()  #resumed after all its parts were fetched
+                except ChecksumError as e:
+                    job.error = e
+        for ((job, _), _, err) in run_concurrently(lambda part: self._fetch_part(*part),
+                                                   parts, self.max_workers):
+            if err is not None and job.error is None:
+                job.error = err
+        results.extend((job.obj.key, job.path, job.error) for job in jobs)
+        return results
+
+    def download_order(self, soli, dest_dir):
+        """
+        Downloads the delivered line items of an imagery order.
+        See download() for the return value.
+        """
+        return self.download(order_locations(get_order_status(self.session, soli)), dest_dir)
+
+    def download_cat_ids(self, cat_ids, dest_dir, timeout=None):
+        """
+        Orders a list of catalog ids, waits for the orders to be delivered,
+        and downloads them. See download() for the return value. The
+        catalog ids of an order that failed, or was not delivered in time,
+        are listed as (cat_id, None, error) tuples, where error is the
+        order's exception or a concurrent.futures.TimeoutError.
+        @param timeout: The maximum time, in seconds, to wait for delivery.
+        Orders not delivered in time are not downloaded.
+        """
+        with OrderManager(self.session) as manager:
+            futures = manager.submit(list(cat_ids))
+            (done, _) = manager.wait(futures, timeout)
+        locations = []
+        failed = []
+        for future in futures:
+            if future not in done:
+                err = TimeoutError("Order {} was not delivered in time".format(future.soli))
+            else:
+                err = future.exception()
+            if err is None:
+                locations.extend(order_locations(future.result()))
+            else:
+                failed.extend((cat_id, None, err) for cat_id in future.cat_ids or [future.soli])
+        return failed + self.download(locations, dest_dir)
+
+if __name__ == '__main__':
+    pass
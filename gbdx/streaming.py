@@ -0,0 +1,142 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+Incremental parsing of large json responses, such as catalog search
+results, so that records can be processed as they arrive without
+holding the whole response in memory.
+'''
+import json
+import codecs
+
+_WHITESPACE = ' \t\r\n'
+
+class _JsonStream(object):
+    """
+    A buffer over an iterable of text or utf-8 byte chunks, from which
+    whole json values are decoded one at a time.
+    """
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._decoder = json.JSONDecoder()
+        self.buf = u""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """
+        Appends the next chunk to the buffer, dropping the consumed part.
+        @return: False if the stream is exhausted
+        """
+        if self.eof:
+            return False
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self.eof = True
+            chunk = self._utf8.decode(b"", True)
+        if isinstance(chunk, bytes):
+            chunk = self._utf8.decode(chunk)
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """
+        Skips whitespace and returns the next character, without consuming it
+        """
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of json stream")
+
+    def expect(self, chars):
+        """
+        Consumes the next character, which must be one of chars
+        """
+        c = self.peek()
+        if c not in chars:
+            raise ValueError("Expected one of {!r} in json stream, found {!r}".format(chars, c))
+        self.pos += 1
+        return c
+
+    def value(self):
+        """
+        Decodes and consumes the next complete json value
+        """
+        self.peek()
+        while True:
+            try:
+                (val, end) = self._decoder.raw_decode(self.buf, self.pos)
+                #a value that ends with the buffer may be truncated (e.g. a number)
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return val
+            except ValueError:
+                if self.eof:
+                    raise
+            #at least double the unparsed data before retrying,
+            # so that large values are not re-parsed too often
+            target = 2*(len(self.buf) - self.pos)
+            while len(self.buf) - self.pos < target and self._fill():
+                pass
+
+def iter_json_array(chunks, key):
+    """
+    Incrementally parses a json object, and yields the items of the
+    array found under the given top-level key, as they are decoded.
+    Other top-level values are parsed and discarded.
+    @param chunks: An iterable of utf-8 byte (or text) chunks, such as
+    response.iter_content() of a streamed requests response.
+    @param key: The top-level key of the array, e.g. 'results'
+    """
+    stream = _JsonStream(chunks)
+    stream.expect('{')
+    if stream.peek() == '}':
+        return
+    while True:
+        name = stream.value()
+        stream.expect(':')
+        if name == key and stream.peek() == '[':
+            stream.expect('[')
+            if stream.peek() == ']':
+                stream.expect(']')
+            else:
+                while True:
+                    yield stream.value()
+                    if stream.expect(',]') == ']':
+                        break
+        else:
+            stream.value()
+        if stream.expect(',}') == '}':
+            return
+
+def project_record(record, fields):
+    """
+    Returns a copy of a record with only the requested fields.
+    @param record: A (nested) dictionary
+    @param fields: A list of field names, where nested fields are given
+    as dotted paths, e.g. ['identifier', 'properties.cloudCover']. Fields
+    missing from the record are omitted.
+    """
+    out = {}
+    for field in fields:
+        path = field.split('.')
+        value = record
+        try:
+            for name in path:
+                value = value[name]
+        except (KeyError, TypeError):
+            continue
+        dst = out
+        for name in path[:-1]:
+            dst = dst.setdefault(name, {})
+        dst[path[-1]] = value
+    return out
+
+if __name__ == '__main__':
+    pass
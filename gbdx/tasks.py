@@ -4,27 +4,36 @@ Created on Aug 13, 2015
 
 Functions to interface with tasks and workflows
 '''
-import json
 import sys
 
-from gbdx import GBDX_BASE_URL, GBDX_WORKFLOW_STATES, get_json, post_json
+from gbdx import GBDX_WORKFLOW_STATES, get_json, post_json, jsoncodec, urls
+from gbdx.parallel import run_concurrently, DEFAULT_MAX_WORKERS
 
-def list_available_tasks(sess):
+def list_available_tasks(sess, registry=None):
     """
     lists the available tasks on the gbdx platform
+    @param sess: The gbdx session object
+    @param registry: Optional gbdx.registry.TaskRegistry, which caches
+    the task list instead of requesting it on every call
     """
-    url = "/".join([GBDX_BASE_URL,'workflows','v1','tasks'])
+    if registry is not None:
+        return registry.list_tasks(sess)
+    url = urls.tasks_url()
     ret = get_json(sess, url)
     return ret["tasks"]
 
-def get_task_definition(sess, task_name):
+def get_task_definition(sess, task_name, registry=None):
     """
     Gets the definition of a task
     @param sess: The gbdx session object
     @param task_name: The identifier of the task, such as FastOrtho,
     such as is returned by list_available_tasks 
+    @param registry: Optional gbdx.registry.TaskRegistry, which caches
+    task definitions instead of requesting them on every call
     """
-    url = "/".join([GBDX_BASE_URL,'workflows','v1','tasks',task_name])
+    if registry is not None:
+        return registry.get_definition(sess, task_name)
+    url = urls.tasks_url(task_name)
     return get_json(sess, url)
 
 def summarize_workflow_tasks(workflow_dict):
@@ -37,7 +46,8 @@ def summarize_workflow_tasks(workflow_dict):
         task_summary.append("\t{0}({1}):{2}".format(name,task_type,task_state))
     return "\n".join(task_summary)
 
-def search_workflows(sess, state="all", owner=None, lookback_h=3, details=False, verbose=False):
+def search_workflows(sess, state="all", owner=None, lookback_h=3, details=False, verbose=False,
+                     max_workers=DEFAULT_MAX_WORKERS):
     """
     Lists the workflows that are in a given state
     @param sess: The gbdx session object
@@ -50,43 +60,75 @@ def search_workflows(sess, state="all", owner=None, lookback_h=3, details=False,
     a given state within the past 3 hours.
     @param details: If True, this function will also retrieve summary details
     for each of the workflows that match the filter. If False, only the workflow
-    ids will be returned. This will be slow if there are many workflows.
+    ids will be returned. The details are retrieved concurrently, and appear in
+    the summary in the order in which they are returned. A workflow whose status
+    can't be retrieved is reported in the summary without aborting the others.
     @param verbose: If True and details is also true, then as the workflow details
     are returned, they are printed to standard out.
+    @param max_workers: The maximum number of concurrent status requests
+    when details=True.
     @return: (workflow_ids, summary), where workflow_ids is a list of workflow ids,
     and summary contains the summary information, only if details=True, else None.
     """
     state = state.lower()
     assert state in GBDX_WORKFLOW_STATES
-    url = "/".join([GBDX_BASE_URL,'workflows','v1','workflows','search'])
+    url = urls.workflow_search_url()
     search_filter = {"state":state, "lookback_h":lookback_h}
     if owner:
         search_filter["owner"]=owner
-    payload = json.dumps(search_filter)
+    payload = jsoncodec.dumps(search_filter)
     ret = post_json(sess, url, payload)
     workflow_ids = ret['Workflows']
     summary = None
     if details:
         summary = ""
-        for wf_id in workflow_ids:
-            tmp = get_workflow_status(sess, wf_id)
-            this_task = "Workflow {id} ({owner})\n".format(**tmp)
-            this_task += summarize_workflow_tasks(tmp)
+        for (wf_id, tmp, err) in iter_workflow_statuses(sess, workflow_ids, max_workers):
+            if err is None:
+                this_task = "Workflow {id} ({owner})\n".format(**tmp)
+                this_task += summarize_workflow_tasks(tmp)
+            else:
+                this_task = "Workflow {}: unable to retrieve status ({})".format(wf_id, err)
             this_task += "\n"
-            if verbose: 
-                print this_task,  #incrementally print results
+            if verbose:
+                print(this_task, end="")  #incrementally print results
                 sys.stdout.flush()
             summary += this_task
-        print ""
+        print("")
     return (workflow_ids, summary)
 
+def iter_workflow_statuses(sess, workflow_ids, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Retrieves the status of many workflows concurrently.
+    @param sess: The gbdx session object
+    @param workflow_ids: An iterable of workflow ids
+    @param max_workers: The maximum number of concurrent requests
+    @return: A generator of (workflow_id, status, error) tuples, in the order
+    the requests complete. If a request failed, status is None and error is
+    the exception raised, otherwise error is None.
+    """
+    return run_concurrently(lambda wf_id: get_workflow_status(sess, wf_id),
+                            workflow_ids, max_workers)
+
+def submit_workflow(sess, workflow):
+    """
+    Submits a workflow for execution
+    @param sess: The gbdx session object
+    @param workflow: The workflow definition, a dictionary with the
+    workflow name and its list of tasks. See gbdx.workflows.WorkflowTemplate
+    to build and validate workflows.
+    @return: The response dictionary, whose 'id' is the new workflow id
+    """
+    url = urls.workflows_url()
+    #submitting a workflow is not idempotent, so don't retry after server errors
+    return post_json(sess, url, jsoncodec.dumps(workflow), idempotent=False)
+
 def get_workflow_status(sess, workflow_id):
     """
     retrieves the status for a given workflow
     @param sess: The gbdx session object
     @param workflow_id: The workflow id
     """
-    url = "/".join([GBDX_BASE_URL,'workflows','v1','workflows',workflow_id])
+    url = urls.workflow_url(workflow_id)
     return get_json(sess, url)
 
 if __name__ == '__main__':
@@ -0,0 +1,236 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+A two-tier cache for catalog thumbnails. The disk tier stores the
+raw png bytes, content-addressed by their sha256 hash and referenced
+by cat_id, with size-bounded eviction. The memory tier is an LRU of
+decoded images, bounded by the total bytes of the arrays. The images
+are shared by all callers, so they are returned read-only: copy one
+before modifying it in place.
+'''
+import os
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from gbdx.instrumentation import get_metrics
+
+DEFAULT_THUMBNAIL_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".gbdx", "thumbnails")
+DEFAULT_MAX_DISK_BYTES = 512*1024*1024
+DEFAULT_MAX_MEMORY_BYTES = 128*1024*1024
+
+class ThumbnailCache(object):
+    """
+    Use with gbdx.get_thumbnail(session, cat_id, cache=thumbnail_cache).
+    Safe to share between threads; the disk tier may also be shared
+    between processes.
+    """
+    def __init__(self, cache_dir=DEFAULT_THUMBNAIL_CACHE_DIR,
+                 max_disk_bytes=DEFAULT_MAX_DISK_BYTES,
+                 max_memory_bytes=DEFAULT_MAX_MEMORY_BYTES):
+        """
+        Constructor
+        @param cache_dir: The directory of the disk tier, created if needed.
+        @param max_disk_bytes: When the files in the disk tier exceed this size,
+        the least recently used ones are removed.
+        @param max_memory_bytes: The byte budget of the decoded images held in memory.
+        Memory-mapped images are not counted against it.
+        """
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_bytes = max_memory_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = None
+        self._lock = threading.Lock()
+        for sub in ('blobs', 'refs', 'arrays'):
+            path = os.path.join(cache_dir, sub)
+            if not os.path.isdir(path):
+                try:
+                    os.makedirs(path)
+                except OSError:
+                    if not os.path.isdir(path):
+                        raise
+
+    def _ref_path(self, cat_id):
+        return os.path.join(self.cache_dir, 'refs', str(cat_id))
+
+    def _blob_path(self, digest):
+        return os.path.join(self.cache_dir, 'blobs', digest + '.png')
+
+    def _array_path(self, digest):
+        return os.path.join(self.cache_dir, 'arrays', digest + '.npy')
+
+    def _write_atomic(self, path, data):
+        (fd, tmp) = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.rename(tmp, path)
+
+    def _digest(self, cat_id):
+        try:
+            with open(self._ref_path(cat_id)) as f:
+                return f.read().strip()
+        except IOError:
+            return None
+
+    def _read(self, cat_id):
+        digest = self._digest(cat_id)
+        if digest is None:
+            return (None, None)
+        path = self._blob_path(digest)
+        try:
+            with open(path, 'rb') as f:
+                buf = f.read()
+            os.utime(path, None)  #mark as recently used
+        except (IOError, OSError):
+            return (None, None)
+        return (digest, buf)
+
+    def get_bytes(self, cat_id):
+        """
+        Returns the png bytes of the thumbnail from the disk tier, or None
+        """
+        return self._read(cat_id)[1]
+
+    def put_bytes(self, cat_id, buf):
+        """
+        Stores the png bytes of a thumbnail in the disk tier
+        @return: The content hash of the bytes
+        """
+        digest = hashlib.sha256(buf).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            self._write_atomic(path, buf)
+            self._add_disk_bytes(len(buf))
+        self._write_atomic(self._ref_path(cat_id), digest.encode('ascii'))
+        return digest
+
+    def _disk_files(self):
+        files = []
+        for sub in ('blobs', 'arrays'):
+            d = os.path.join(self.cache_dir, sub)
+            for name in os.listdir(d):
+                try:
+                    st = os.stat(os.path.join(d, name))
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, os.path.join(d, name)))
+        return files
+
+    def _add_disk_bytes(self, nbytes):
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(size for (_, size, _) in self._disk_files())
+            else:
+                self._disk_bytes += nbytes
+            if self._disk_bytes <= self.max_disk_bytes:
+                return
+            #rescan, as other processes may share the directory
+            files = sorted(self._disk_files())
+            total = sum(size for (_, size, _) in files)
+            removed = set()
+            for (_, size, path) in files:
+                if total <= self.max_disk_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                    removed.add(os.path.splitext(os.path.basename(path))[0])
+                except OSError:
+                    pass
+            self._disk_bytes = total
+        if removed:
+            self._remove_refs(removed)
+
+    def _remove_refs(self, digests):
+        #drops the refs to evicted blobs, so that the ref index doesn't grow forever
+        refs_dir = os.path.join(self.cache_dir, 'refs')
+        for name in os.listdir(refs_dir):
+            path = os.path.join(refs_dir, name)
+            try:
+                with open(path) as f:
+                    digest = f.read().strip()
+                if digest in digests and not os.path.exists(self._blob_path(digest)):
+                    os.remove(path)
+            except (IOError, OSError):
+                pass
+
+    def _remember(self, cat_id, img):
+        with self._lock:
+            if cat_id in self._memory:
+                self._memory_bytes -= self._memory.pop(cat_id).nbytes
+            if img.nbytes > self.max_memory_bytes:
+                return
+            self._memory[cat_id] = img
+            self._memory_bytes += img.nbytes
+            while self._memory_bytes > self.max_memory_bytes:
+                (_, old) = self._memory.popitem(last=False)
+                self._memory_bytes -= old.nbytes
+
+    def get_image(self, cat_id, fetch, decode, mmap=False):
+        """
+        Returns the decoded thumbnail, from memory, from disk, or by
+        calling fetch() to download the png bytes.
+        @param cat_id: The catalog id
+        @param fetch: A function with no arguments that returns the png bytes
+        @param decode: A function that decodes png bytes into an ndarray
+        @param mmap: If True, the decoded image is stored in the disk tier as
+        a .npy file and returned as a read-only memory-mapped array, rather than
+        being held in the memory tier. This is useful for large batches.
+        @return: A read-only ndarray
+        """
+        if not mmap:
+            with self._lock:
+                img = self._memory.get(cat_id)
+                if img is not None:
+                    self._memory.move_to_end(cat_id)
+                    self.hits += 1
+                    get_metrics().cache_event('thumbnail', True)
+                    return img
+
+        (digest, buf) = self._read(cat_id)
+        get_metrics().cache_event('thumbnail', buf is not None)
+        with self._lock:
+            if buf is None:
+                self.misses += 1
+            else:
+                self.disk_hits += 1
+        if buf is None:
+            buf = fetch()
+            digest = self.put_bytes(cat_id, buf)
+
+        if mmap:
+            path = self._array_path(digest)
+            if not os.path.exists(path):
+                img = np.asarray(decode(buf))
+                (fd, tmp) = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.npy')
+                with os.fdopen(fd, 'wb') as f:
+                    np.save(f, img)
+                os.rename(tmp, path)
+                self._add_disk_bytes(os.path.getsize(path))
+            return np.load(path, mmap_mode='r')
+
+        img = np.asarray(decode(buf))
+        #shared with every caller: an in-place change would corrupt the cache
+        img.flags.writeable = False
+        self._remember(cat_id, img)
+        return img
+
+    def clear_memory(self):
+        """
+        Empties the memory tier
+        """
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+if __name__ == '__main__':
+    pass
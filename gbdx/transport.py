@@ -0,0 +1,292 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+The HTTP transport used by all the GBDX API helpers. It wraps a gbdx
+session with connection pool sizing, timeouts, gzip compression,
+retries with exponential backoff, and a circuit breaker.
+'''
+import gzip
+import random
+import threading
+import time
+from io import BytesIO
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from gbdx import jsoncodec
+from gbdx.instrumentation import get_metrics, endpoint_name, RequestEvent
+
+class CircuitOpenError(requests.RequestException):
+    """
+    Raised when a request is refused because too many consecutive
+    requests have failed, and the circuit breaker is open.
+    """
+    pass
+
+class Transport(object):
+    """
+    Sends requests for a gbdx session. A transport is created
+    automatically for each session by get_transport(); use
+    configure_transport() to change its settings.
+    """
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, session, pool_size=10, timeout=(10, 60),
+                 max_retries=3, backoff_factor=0.5, max_backoff=30,
+                 compress_requests=False, compress_min_bytes=1024,
+                 circuit_threshold=5, circuit_reset=30, metrics=None):
+        """
+        Constructor
+        @param session: The gbdx session, from gbdx_auth.get_session.
+        @param pool_size: The number of keep-alive connections kept per host.
+        Set this to at least the number of threads sharing the session.
+        @param timeout: The default timeout in seconds, either a single value
+        or a (connect, read) tuple. None waits forever.
+        @param max_retries: The number of times a request is retried after a
+        connection error, a timeout, or a 429/5xx response.
+        @param backoff_factor: Retry n waits about backoff_factor*2**n seconds,
+        plus jitter, unless the server sends a Retry-After header.
+        @param max_backoff: The upper bound, in seconds, of a single wait.
+        @param compress_requests: If True, request bodies of at least
+        compress_min_bytes are gzip-compressed.
+        @param circuit_threshold: After this many consecutive failed requests,
+        the circuit opens and requests fail fast with CircuitOpenError...
+        @param circuit_reset: ...for this many seconds, after which one trial
+        request is allowed through.
+        @param metrics: The gbdx.instrumentation.Metrics that every call is
+        reported to. If None, the process-wide one from get_metrics() is used.
+        Set to False to disable instrumentation.
+        """
+        self.session = session
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.compress_requests = compress_requests
+        self.compress_min_bytes = compress_min_bytes
+        self.circuit_threshold = circuit_threshold
+        self.circuit_reset = circuit_reset
+        self.metrics = get_metrics() if metrics is None else metrics
+        self._failures = 0
+        self._open_until = None
+        self._half_open = False     #True while the trial request is in flight
+        self._lock = threading.Lock()
+        if hasattr(session, 'mount'):
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+
+    def _check_circuit(self, trial=False):
+        """
+        Raises CircuitOpenError if the circuit is open, or half-open with
+        the trial request in flight.
+        @param trial: True for a retry of the trial request itself
+        @return: True if this request is the trial request of a half-open circuit
+        """
+        with self._lock:
+            if trial:
+                return True
+            if self._half_open:
+                raise CircuitOpenError("Circuit half-open, waiting for a trial request")
+            if self._open_until is None:
+                return False
+            if time.time() < self._open_until:
+                raise CircuitOpenError("Circuit open after {} consecutive failures"
+                                       .format(self._failures))
+            #half-open: let only this request through, re-open if it fails
+            self._open_until = None
+            self._half_open = True
+            self._failures = self.circuit_threshold - 1
+            return True
+
+    def _record_outcome(self, success):
+        with self._lock:
+            self._half_open = False
+            if success:
+                self._failures = 0
+                self._open_until = None
+            else:
+                self._failures += 1
+                if self._failures >= self.circuit_threshold:
+                    self._open_until = time.time() + self.circuit_reset
+
+    def _backoff(self, attempt, ret=None):
+        delay = None
+        if ret is not None:
+            try:
+                delay = float(ret.headers.get('Retry-After'))
+            except (AttributeError, TypeError, ValueError):
+                delay = None
+        if delay is None:
+            delay = self.backoff_factor*(2**attempt)
+            delay += random.uniform(0, delay/2.0)
+        time.sleep(min(delay, self.max_backoff))
+
+    def _compress(self, data, headers):
+        if isinstance(data, type(u"")):
+            data = data.encode('utf-8')
+        buf = BytesIO()
+        with gzip.GzipFile(fileobj=buf, mode='wb') as f:
+            f.write(data)
+        headers['Content-Encoding'] = 'gzip'
+        return buf.getvalue()
+
+    def request(self, method, url, data=None, headers=None, timeout=None,
+                idempotent=True, **kwargs):
+        """
+        Sends a request, retrying transient failures, and returns the response.
+        Raises requests.HTTPError for error responses.
+        @param method: 'GET', 'POST', etc.
+        @param timeout: Overrides the default timeout for this call.
+        @param idempotent: If False, the request is only retried on a 429
+        response, which indicates that it was not processed.
+        @param kwargs: Passed on to the session's request method.
+        """
+        headers = dict(headers or {})
+        headers.setdefault('Accept-Encoding', 'gzip, deflate')
+        if data is not None and self.compress_requests and \
+                len(data) >= self.compress_min_bytes:
+            data = self._compress(data, headers)
+        if data is not None:
+            kwargs['data'] = data
+        if timeout is None:
+            timeout = self.timeout
+        if not self.metrics:
+            return self._send(method, url, headers, timeout, idempotent, [0], kwargs)
+
+        self.metrics.request_started()
+        t0 = time.perf_counter()
+        attempts = [0]
+        ret = error = None
+        try:
+            ret = self._send(method, url, headers, timeout, idempotent, attempts, kwargs)
+            return ret
+        except Exception as e:
+            error = e
+            ret = getattr(e, 'response', None)
+            raise
+        finally:
+            bytes_in = None
+            if ret is not None:
+                try:
+                    bytes_in = int(ret.headers.get('Content-Length'))
+                except (AttributeError, TypeError, ValueError):
+                    bytes_in = None
+                if bytes_in is None and not kwargs.get('stream'):
+                    #no Content-Length (e.g. a chunked response): count the
+                    #body, which is already read unless the request streams it
+                    try:
+                        bytes_in = len(ret.content)
+                    except (AttributeError, TypeError, RuntimeError):
+                        bytes_in = None
+            status = getattr(ret, 'status_code', None)
+            data = kwargs.get('data')
+            self.metrics.request_finished(RequestEvent(
+                method, endpoint_name(url), status, time.perf_counter() - t0,
+                len(data) if data is not None else 0, bytes_in, attempts[0], error))
+
+    def _send(self, method, url, headers, timeout, idempotent, attempts, kwargs):
+        """
+        The retry loop of request(). attempts[0] is updated with the number
+        of requests sent.
+        """
+        send = getattr(self.session, method.lower())
+        attempt = 0
+        trial = False
+        while True:
+            trial = self._check_circuit(trial)
+            attempts[0] = attempt + 1
+            ret = None
+            try:
+                ret = send(url, headers=headers, timeout=timeout, **kwargs)
+                retryable = ret.status_code in Transport.RETRY_STATUSES and \
+                            (idempotent or ret.status_code == 429)
+                error = None
+            except (requests.ConnectionError, requests.Timeout) as e:
+                retryable = idempotent
+                error = e
+            except Exception:
+                if trial:
+                    self._record_outcome(False)     #don't stay half-open
+                raise
+
+            if not retryable or attempt >= self.max_retries:
+                failed = error is not None or ret.status_code >= 500 or \
+                         ret.status_code == 429
+                self._record_outcome(not failed)
+                if error is not None:
+                    raise error
+                ret.raise_for_status()
+                return ret
+            if ret is not None:
+                #release the connection (held by a stream=True response) before waiting
+                ret.close()
+            self._backoff(attempt, ret)
+            attempt += 1
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, data=None, **kwargs):
+        return self.request('POST', url, data=data, **kwargs)
+
+    def decode_json(self, url, raw, lazy=False):
+        """
+        Decodes the raw bytes of a json response from url with gbdx.jsoncodec,
+        reporting the decode time.
+        @param lazy: If True, decode with jsoncodec.loads_lazy()
+        """
+        decode = jsoncodec.loads_lazy if lazy else jsoncodec.loads
+        if not self.metrics:
+            return decode(raw)
+        t0 = time.perf_counter()
+        data = decode(raw)
+        self.metrics.observe_decode(endpoint_name(url), time.perf_counter() - t0)
+        return data
+
+    def get_json(self, url, **kwargs):
+        headers = {'Content-type': 'application/json'}
+        return self.decode_json(url, self.get(url, headers=headers, **kwargs).content)
+
+    def post_json(self, url, payload, **kwargs):
+        headers = {'Content-type': 'application/json'}
+        ret = self.post(url, data=payload, headers=headers, **kwargs)
+        return self.decode_json(url, ret.content)
+
+_TRANSPORT_ATTR = '_gbdx_transport'
+_TRANSPORT_LOCK = threading.Lock()
+
+def configure_transport(session, **options):
+    """
+    Creates a Transport with the given options and attaches it to the
+    session, so that all GBDX API calls made with the session use it.
+    See Transport.__init__ for the options.
+    @return: The new Transport
+    """
+    transport = Transport(session, **options)
+    try:
+        setattr(session, _TRANSPORT_ATTR, transport)
+    except AttributeError:
+        pass
+    return transport
+
+def get_transport(session):
+    """
+    Returns the Transport for a gbdx session, creating one with the
+    default settings on first use. If a Transport is passed in, it is
+    returned as-is, so API helpers accept either.
+    """
+    if isinstance(session, Transport):
+        return session
+    transport = getattr(session, _TRANSPORT_ATTR, None)
+    if transport is None:
+        with _TRANSPORT_LOCK:
+            transport = getattr(session, _TRANSPORT_ATTR, None)
+            if transport is None:
+                transport = configure_transport(session)
+    return transport
+
+if __name__ == '__main__':
+    pass
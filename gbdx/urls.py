@@ -0,0 +1,48 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+URL construction for the GBDX RESTful API endpoints, shared by
+the blocking (gbdx) and asyncio (gbdx.aio) interfaces. The base
+url is looked up on each call, so that setting
+gbdx.constants.GBDX_BASE_URL redirects all API calls.
+'''
+from gbdx import constants
+
+def _url(*parts):
+    return "/".join((constants.GBDX_BASE_URL,) + parts)
+
+def s3creds_url(duration):
+    return _url("s3creds", "v1", "prefix?duration={}".format(duration))
+
+def orders_url():
+    return _url('orders', 'v1')
+
+def order_status_url(soli):
+    return _url('orders', 'v1', 'status', soli)
+
+def catalog_search_url():
+    return _url('catalog', 'v1', 'search')
+
+def catalog_record_url(cat_id):
+    return _url("catalog", "v1", "record", cat_id)
+
+def thumbnail_url(cat_id):
+    return _url('thumbnails', 'v1', 'browse', '{}.medium.png'.format(cat_id))
+
+def tasks_url(task_name=None):
+    if task_name is None:
+        return _url('workflows', 'v1', 'tasks')
+    return _url('workflows', 'v1', 'tasks', task_name)
+
+def workflows_url():
+    return _url('workflows', 'v1', 'workflows')
+
+def workflow_search_url():
+    return _url('workflows', 'v1', 'workflows', 'search')
+
+def workflow_url(workflow_id):
+    return _url('workflows', 'v1', 'workflows', workflow_id)
+
+if __name__ == '__main__':
+    pass
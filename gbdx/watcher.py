@@ -0,0 +1,278 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+Watching many workflows for state changes. A WorkflowWatcher polls
+the registered workflows on a PollScheduler, which shares its rate
+limiter with the other pollers of the process, and emits an event
+each time a workflow changes state, until the workflow reaches one
+of GBDX_WORKFLOW_TERMINAL_STATES.
+'''
+import queue
+import threading
+import warnings
+from collections import namedtuple
+
+from gbdx import GBDX_WORKFLOW_TERMINAL_STATES
+from gbdx.tasks import get_workflow_status
+from gbdx.parallel import DEFAULT_MAX_WORKERS
+from gbdx.polling import PollScheduler
+
+#poll interval (seconds) to restart from after a workflow enters a state,
+# so that states which usually last long are polled less often
+WORKFLOW_POLL_INTERVALS = {
+    "submitted": 5.0,
+    "pending": 10.0,
+    "scheduled": 10.0,
+    "started": 30.0,
+    "running": 30.0,
+}
+
+#put on an iterator's queue after the last watched workflow's final event
+_IDLE = object()
+
+class WorkflowEvent(namedtuple('WorkflowEvent', ['workflow_id', 'previous_state',
+                                                 'state', 'status'])):
+    """
+    A workflow state transition. The states are (state, event) tuples, as
+    in the workflow status, e.g. ('running', 'started'). previous_state is
+    None the first time a workflow is polled. status is the full workflow
+    status dictionary.
+    """
+    __slots__ = ()
+
+    @property
+    def terminal(self):
+        return is_terminal_state(self.state)
+
+def workflow_state(status):
+    """
+    @param status: A workflow status dictionary, from get_workflow_status
+    @return: The (state, event) tuple of the workflow
+    """
+    state = status.get('state', {})
+    if not isinstance(state, dict):
+        return (state, None)
+    return (state.get('state'), state.get('event'))
+
+def is_terminal_state(state):
+    """
+    True if a (state, event) tuple is one in which the workflow won't change
+    """
+    return any(s in GBDX_WORKFLOW_TERMINAL_STATES for s in state)
+
+def _task_states(status):
+    return tuple((t.get('name'), t.get('state', {}).get('state'))
+                 for t in status.get('tasks', []))
+
+class WorkflowWatcher(object):
+    """
+    Watches workflows until they finish, reporting each state transition.
+    Events can be received through callbacks, a queue, or by iterating:
+        with WorkflowWatcher(session) as watcher:
+            for wf_id in workflow_ids:
+                watcher.watch(wf_id)
+            for event in watcher.iter_events():
+                print(event.workflow_id, event.state)
+    or, from a coroutine, with "async for event in watcher.aiter_events()".
+    """
+    def __init__(self, session, min_interval=5.0, max_interval=300.0,
+                 max_workers=DEFAULT_MAX_WORKERS, rate_limiter=None,
+                 event_queue=None, start=True):
+        """
+        Constructor
+        @param session: The gbdx session object
+        @param min_interval: The shortest time (seconds) between polls of one
+        workflow, for states that are not in WORKFLOW_POLL_INTERVALS
+        @param max_interval: The longest time (seconds) between polls of one workflow
+        @param max_workers: The maximum number of concurrent status requests
+        @param rate_limiter: See PollScheduler
+        @param event_queue: Optional queue.Queue onto which every event is put
+        @param start: If True, workflows are polled in a background thread.
+        Otherwise, call poll() to poll the workflows that are due.
+        """
+        self.session = session
+        self.event_queue = event_queue
+        self._watching = set()
+        self._states = {}
+        self._callbacks = {}
+        self._listeners = []
+        self._idle_listeners = []   #called when the last watched workflow finishes
+        self._lock = threading.Lock()
+        self.scheduler = PollScheduler(self._poll_workflow, min_interval=min_interval,
+                                       max_interval=max_interval, max_workers=max_workers,
+                                       rate_limiter=rate_limiter,
+                                       interval_for=self._interval_for)
+        if start:
+            self.scheduler.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._watching)
+
+    def watch(self, workflow_id, callback=None):
+        """
+        Starts watching a workflow. It is first polled right away.
+        @param callback: Optional function called with each WorkflowEvent
+        of this workflow
+        """
+        with self._lock:
+            self._watching.add(workflow_id)
+            self._states.pop(workflow_id, None)
+            if callback is not None:
+                self._callbacks[workflow_id] = callback
+        self.scheduler.add(workflow_id, delay=0)
+
+    def unwatch(self, workflow_id):
+        """
+        Stops watching a workflow
+        """
+        self.scheduler.remove(workflow_id)
+        self._drop(workflow_id)
+
+    def _drop(self, workflow_id):
+        with self._lock:
+            if workflow_id not in self._watching:
+                return
+            self._watching.discard(workflow_id)
+            self._states.pop(workflow_id, None)
+            self._callbacks.pop(workflow_id, None)
+            idle_listeners = list(self._idle_listeners) if not self._watching else []
+        for listener in idle_listeners:
+            listener()
+
+    def watched(self):
+        """
+        @return: The ids of the workflows that are still being watched
+        """
+        with self._lock:
+            return list(self._watching)
+
+    def add_listener(self, listener):
+        """
+        Registers a function called with every WorkflowEvent
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        with self._lock:
+            self._listeners.remove(listener)
+
+    def _interval_for(self, state):
+        (wf_state, event) = state[0]
+        return WORKFLOW_POLL_INTERVALS.get(event,
+               WORKFLOW_POLL_INTERVALS.get(wf_state, self.scheduler.min_interval))
+
+    def _dispatch(self, event, callback, listeners):
+        #a failing callback must not stop the other ones, nor the polling
+        funcs = [callback] if callback is not None else []
+        if self.event_queue is not None:
+            funcs.append(self.event_queue.put)
+        for func in funcs + listeners:
+            try:
+                func(event)
+            except Exception as e:
+                warnings.warn("Workflow event callback {!r} failed: {}".format(func, e))
+
+    def _poll_workflow(self, workflow_id):
+        status = get_workflow_status(self.session, workflow_id)
+        state = workflow_state(status)
+        with self._lock:
+            previous = self._states.get(workflow_id)
+            self._states[workflow_id] = state
+            callback = self._callbacks.get(workflow_id)
+            listeners = list(self._listeners)
+        done = is_terminal_state(state)
+        if state != previous:
+            self._dispatch(WorkflowEvent(workflow_id, previous, state, status),
+                           callback, listeners)
+        if done:
+            #only dropped once its final event is out, so that the iterators
+            #get that event before they learn that nothing is left to watch
+            self._drop(workflow_id)
+        #task state changes also reset the poll interval
+        return ((state, _task_states(status)), done)
+
+    def poll(self):
+        """
+        Polls the workflows that are due, when not using the background thread.
+        @return: The number of workflows polled
+        """
+        return self.scheduler.poll_due()
+
+    def _add_listeners(self, listener, idle_listener):
+        with self._lock:
+            self._listeners.append(listener)
+            self._idle_listeners.append(idle_listener)
+
+    def _remove_listeners(self, listener, idle_listener):
+        with self._lock:
+            self._listeners.remove(listener)
+            self._idle_listeners.remove(idle_listener)
+
+    def iter_events(self, timeout=None):
+        """
+        Yields WorkflowEvents as they happen, until no workflow is watched.
+        Events emitted before the iteration starts are not included.
+        @param timeout: If no event arrives within this many seconds, stop
+        """
+        events = queue.Queue()
+        idle = lambda: events.put(_IDLE)
+        self._add_listeners(events.put, idle)
+        try:
+            #the idle marker follows the final events, so the iteration only
+            #stops on it, when no workflow was watched again in the meantime
+            if not len(self):
+                return
+            while True:
+                try:
+                    event = events.get(timeout=timeout)
+                except queue.Empty:
+                    return
+                if event is not _IDLE:
+                    yield event
+                elif not len(self):
+                    return
+        finally:
+            self._remove_listeners(events.put, idle)
+
+    async def aiter_events(self):
+        """
+        Asynchronously yields WorkflowEvents as they happen, until no
+        workflow is watched. Events emitted before the iteration starts are
+        not included. Must be used from within a running event loop.
+        """
+        import asyncio
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+        listener = lambda event: loop.call_soon_threadsafe(events.put_nowait, event)
+        idle = lambda: loop.call_soon_threadsafe(events.put_nowait, _IDLE)
+        self._add_listeners(listener, idle)
+        try:
+            #see iter_events()
+            if not len(self):
+                return
+            while True:
+                event = await events.get()
+                if event is not _IDLE:
+                    yield event
+                elif not len(self):
+                    return
+        finally:
+            self._remove_listeners(listener, idle)
+
+    def close(self):
+        """
+        Stops polling
+        """
+        self.scheduler.stop()
+
+if __name__ == '__main__':
+    pass
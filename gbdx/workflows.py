@@ -0,0 +1,230 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+Building, validating and bulk-submitting GBDX workflows. A
+WorkflowTemplate describes the tasks of a workflow, with input values
+that may contain {name} placeholders. It is validated once
+against the task definitions, then rendered for many inputs and
+submitted concurrently under a rate limit. For example, one FastOrtho
+workflow per catalog id:
+
+    template = WorkflowTemplate("ortho_{cat_id}")
+    template.add_task("ortho", "FastOrtho", inputs={'data': "s3://receiving/{cat_id}"})
+    template.add_task("stage", "StageDataToS3",
+                      inputs={'data': TaskOutput("ortho", "data"),
+                              'destination': "s3://my-bucket/ortho/{cat_id}"})
+    results = submit_workflows(session, template, [{'cat_id': c} for c in cat_ids])
+    failed = [(params, err) for (params, wf_id, err) in results if err is not None]
+
+A placeholder is a python identifier in braces, optionally with a format
+spec as in str.format(), e.g. {cat_id} or {n:03d}. Other braces, e.g. in
+a JSON string value or a regular expression, are left as they are.
+'''
+import re
+from collections import namedtuple
+
+import requests
+
+from gbdx.tasks import submit_workflow
+from gbdx.parallel import run_concurrently, DEFAULT_MAX_WORKERS
+from gbdx.polling import RateLimiter
+
+DEFAULT_SUBMIT_RATE = 5.0   #workflow submissions per second
+DEFAULT_SUBMIT_BURST = 10
+_PLACEHOLDER = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)(?::([^{}]*))?\}")
+
+class WorkflowValidationError(ValueError):
+    """
+    Raised when a workflow doesn't match the definitions of its tasks,
+    or a template parameter is missing. problems lists all the issues found.
+    """
+    def __init__(self, problems):
+        ValueError.__init__(self, "Invalid workflow: " + "; ".join(problems))
+        self.problems = problems
+
+def _substitute(text, params):
+    """
+    Fills in the placeholders of a string, see the module docstring.
+    Raises KeyError for a missing parameter, ValueError for a bad format spec.
+    """
+    return _PLACEHOLDER.sub(lambda m: format(params[m.group(1)], m.group(2) or ""), text)
+
+class TaskOutput(namedtuple('TaskOutput', ['task', 'port'])):
+    """
+    An input value taken from an output port of another task of the workflow
+    """
+    __slots__ = ()
+
+    @property
+    def source(self):
+        return "{}:{}".format(self.task, self.port)
+
+class WorkflowTemplate(object):
+    """
+    The tasks of a workflow, with templated input values. See the module docstring.
+    """
+    def __init__(self, name):
+        """
+        Constructor
+        @param name: The workflow name, which may contain placeholders
+        """
+        self.name = name
+        self.tasks = []
+
+    def add_task(self, name, task_type, inputs=None, outputs=None, **options):
+        """
+        Adds a task to the workflow
+        @param name: The name of the task, unique in the workflow
+        @param task_type: The task type, as listed by list_available_tasks
+        @param inputs: A dictionary {port name: value}, where a value is either
+        a string, which may contain placeholders, or a TaskOutput
+        @param outputs: The names of the output ports to declare. Defaults to
+        the output ports used as inputs by other tasks, see render().
+        @param options: Other task fields sent as is, e.g. timeout=7200
+        @return: This template, so that calls can be chained
+        """
+        self.tasks.append({'name': name, 'taskType': task_type, 'inputs': dict(inputs or {}),
+                           'outputs': outputs, 'options': options})
+        return self
+
+    def task_types(self):
+        """
+        The distinct task types used by the workflow, in order of first use
+        """
+        types = []
+        for task in self.tasks:
+            if task['taskType'] not in types:
+                types.append(task['taskType'])
+        return types
+
+    def _sources(self):
+        #task name -> output ports used by other tasks
+        used = {}
+        for task in self.tasks:
+            for value in task['inputs'].values():
+                if isinstance(value, TaskOutput):
+                    used.setdefault(value.task, []).append(value.port)
+        return used
+
+    def check(self, definitions):
+        """
+        Checks the workflow against task definitions, without any request.
+        @param definitions: A dictionary {task type: definition}, as returned by
+        get_task_definition
+        @return: A list of the problems found, empty if the workflow is valid
+        """
+        problems = []
+        types = {}
+        for task in self.tasks:
+            if task['name'] in types:
+                problems.append("duplicate task name {}".format(task['name']))
+            types[task['name']] = task['taskType']
+        used = self._sources()
+        for task in self.tasks:
+            defn = definitions.get(task['taskType'])
+            if defn is None:
+                problems.append("task {}: unknown task type {}".format(task['name'], task['taskType']))
+                continue
+            in_ports = dict((p['name'], p) for p in defn.get('inputPortDescriptors', []))
+            out_ports = set(p['name'] for p in defn.get('outputPortDescriptors', []))
+            for port in task['inputs']:
+                if port not in in_ports:
+                    problems.append("task {}: {} has no input port {}".format(
+                                    task['name'], task['taskType'], port))
+            for (port, desc) in in_ports.items():
+                if desc.get('required') and port not in task['inputs']:
+                    problems.append("task {}: required input {} is missing".format(task['name'], port))
+            for port in (task['outputs'] or []) + used.get(task['name'], []):
+                if port not in out_ports:
+                    problems.append("task {}: {} has no output port {}".format(
+                                    task['name'], task['taskType'], port))
+            for value in task['inputs'].values():
+                if isinstance(value, TaskOutput) and value.task not in types:
+                    problems.append("task {}: input source {} is not a task of the workflow"
+                                    .format(task['name'], value.task))
+        return problems
+
+    def validate(self, session, registry=None):
+        """
+        Checks the workflow against the definitions of its tasks, which
+        are fetched concurrently. Raises WorkflowValidationError if invalid.
+        @param registry: A gbdx.registry.TaskRegistry. If None, the shared
+        one from get_default_task_registry() is used.
+        """
+        if registry is None:
+            from gbdx.registry import get_default_task_registry
+            registry = get_default_task_registry()
+        errors = registry.prefetch(session, self.task_types())
+        definitions = {}
+        for task_type in self.task_types():
+            if task_type not in errors:
+                definitions[task_type] = registry.get_definition(session, task_type)
+            elif not (isinstance(errors[task_type], requests.HTTPError) and
+                      getattr(errors[task_type].response, 'status_code', None) == 404):
+                raise errors[task_type]     #not a validation problem
+        problems = self.check(definitions)
+        if problems:
+            raise WorkflowValidationError(problems)
+
+    def render(self, **params):
+        """
+        Fills in the placeholders with the given parameters.
+        Raises WorkflowValidationError if a parameter is missing, or
+        can't be formatted with its format spec.
+        @return: The workflow dictionary, for submit_workflow
+        """
+        used = self._sources()
+        try:
+            tasks = []
+            for task in self.tasks:
+                inputs = []
+                for (port, value) in sorted(task['inputs'].items()):
+                    if isinstance(value, TaskOutput):
+                        inputs.append({'name': port, 'source': value.source})
+                    else:
+                        inputs.append({'name': port, 'value': _substitute(str(value), params)})
+                outputs = task['outputs'] or sorted(set(used.get(task['name'], [])))
+                rendered = dict(task['options'])
+                rendered.update({'name': task['name'], 'taskType': task['taskType'],
+                                 'inputs': inputs, 'outputs': [{'name': p} for p in outputs]})
+                tasks.append(rendered)
+            return {'name': _substitute(self.name, params), 'tasks': tasks}
+        except KeyError as e:
+            raise WorkflowValidationError(["template parameter {} is missing".format(e)])
+        except ValueError as e:
+            raise WorkflowValidationError(["bad template placeholder: {}".format(e)])
+
+def submit_workflows(session, template, params_list, max_workers=DEFAULT_MAX_WORKERS,
+                     rate_limiter=None, validate=True, registry=None):
+    """
+    Renders a template for each set of parameters, and submits the
+    workflows concurrently under a rate limit.
+    @param session: The gbdx session object
+    @param template: A WorkflowTemplate
+    @param params_list: A list of dictionaries of template parameters, one per workflow
+    @param max_workers: The maximum number of concurrent submissions
+    @param rate_limiter: A gbdx.polling.RateLimiter. If None, submissions are
+    limited to DEFAULT_SUBMIT_RATE per second. Set to False to disable.
+    @param validate: If True, the template is validated first, see WorkflowTemplate.validate()
+    @param registry: The TaskRegistry used for validation
+    @return: A list of (params, workflow_id, error) tuples, in the order of
+    params_list. If a workflow could not be rendered or submitted, workflow_id
+    is None and error is the exception raised, otherwise error is None.
+    """
+    if validate:
+        template.validate(session, registry)
+    if rate_limiter is None:
+        rate_limiter = RateLimiter(rate=DEFAULT_SUBMIT_RATE, burst=DEFAULT_SUBMIT_BURST)
+    def submit(i):
+        workflow = template.render(**params_list[i])
+        if rate_limiter:
+            rate_limiter.acquire()
+        return submit_workflow(session, workflow)['id']
+    results = [None]*len(params_list)
+    for (i, wf_id, err) in run_concurrently(submit, range(len(params_list)), max_workers):
+        results[i] = (params_list[i], wf_id, err)
+    return results
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,94 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+Fixtures shared by the offline tests: canned responses, scripted and
+fake gbdx sessions, and a controllable clock.
+'''
+import json
+import threading
+
+import requests
+import shapely.wkt as swkt
+
+class FakeClock(object):
+    """
+    A time function that only moves when told to, for clock= arguments
+    """
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+class FakeResponse(object):
+    """
+    A canned JSON response. Error statuses raise requests.HTTPError.
+    """
+    def __init__(self, status_code=200, data=None, headers=None):
+        self.status_code = status_code
+        self.data = data
+        self.headers = headers or {}
+        self.closed = False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError("{} Error".format(self.status_code), response=self)
+
+    def json(self):
+        return self.data
+
+    @property
+    def content(self):
+        return json.dumps(self.data).encode('utf-8')
+
+    def close(self):
+        self.closed = True
+
+class ScriptedSession(object):
+    """
+    Returns (or raises) a scripted sequence of outcomes, one per request.
+    """
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    def _next(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    get = post = _next
+
+def make_record(cat_id, footprint, **props):
+    properties = {'footprintWkt': footprint.wkt}
+    properties.update(props)
+    return {'identifier': cat_id, 'type': 'DigitalGlobeAcquisition',
+            'properties': properties}
+
+class FakeCatalogSession(object):
+    """
+    Stands in for a gbdx session, answering catalog searches from a
+    fixed list of records by footprint intersection.
+    """
+    def __init__(self, records):
+        self.records = records
+        self.search_count = 0
+        self._lock = threading.Lock()
+
+    def post(self, url, data=None, headers=None, **kwargs):
+        with self._lock:
+            self.search_count += 1
+        area = swkt.loads(json.loads(data)['searchAreaWkt'])
+        hits = [r for r in self.records
+                if swkt.loads(r['properties']['footprintWkt']).intersects(area)]
+        stats = {'recordsReturned': len(hits), 'totalRecords': len(hits)}
+        return FakeResponse(200, {'stats': stats, 'searchTag': None, 'results': hits})
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,307 @@
+'''
+Created on Oct 18, 2026
+@author: sohara
+
+A local stand-in for the GBDX REST API, for offline tests and
+benchmarks. It serves catalog searches, catalog records, thumbnails,
+orders, workflows and task definitions, either from recorded responses
+or from deterministic synthetic data, with configurable latency and
+error injection. For example:
+
+    with MockGBDXServer(latency=0.02, catalog_records=10000) as server:
+        session = requests.Session()
+        res = gbdx.GBDXQuery(gbdx.TEST_AOI, query_cache=False).query(session)
+
+While running as a context manager, gbdx.constants.GBDX_BASE_URL points
+at the server, so every gbdx call goes to it.
+
+Recorded responses are given as a JSON file (see load_fixtures) holding a
+list of {"method": "GET", "path": "/catalog/v1/record/123", "status": 200,
+"body": {...}} objects. A recorded response takes priority over the
+synthetic one for the same method and path.
+'''
+import json
+import time
+import zlib
+import random
+import struct
+import hashlib
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import shapely.wkt as swkt
+
+from gbdx import constants
+
+SENSORS = ("WORLDVIEW01", "WORLDVIEW02", "WORLDVIEW03")
+
+def make_catalog_record(rng, index, bounds):
+    """
+    A synthetic catalog record, with a footprint somewhere within bounds
+    """
+    (minx, miny, maxx, maxy) = bounds
+    w = max((maxx - minx)*0.2, 1e-4)
+    h = max((maxy - miny)*0.2, 1e-4)
+    x0 = rng.uniform(minx - w/2, maxx - w/2)
+    y0 = rng.uniform(miny - h/2, maxy - h/2)
+    wkt = "POLYGON (({0} {1}, {2} {1}, {2} {3}, {0} {3}, {0} {1}))".format(x0, y0, x0+w, y0+h)
+    year = rng.randint(2009, 2015)
+    ts = "{}-{:02d}-{:02d}T{:02d}:{:02d}:00.000Z".format(year, rng.randint(1, 12), rng.randint(1, 28),
+                                                       rng.randint(0, 23), rng.randint(0, 59))
+    return {'identifier': "10{:02d}0100{:08X}".format(year % 100, index),
+            'type': 'DigitalGlobeAcquisition',
+            'properties': {'footprintWkt': wkt,
+                           'cloudCover': round(rng.uniform(0, 30), 1),
+                           'offNadirAngle': round(rng.uniform(0, 30), 1),
+                           'panResolution': round(rng.uniform(0.3, 0.6), 3),
+                           'sunElevation': round(rng.uniform(20, 70), 1),
+                           'sensorPlatformName': rng.choice(SENSORS),
+                           'timestamp': ts,
+                           'browseURL': "https://browse.example.com/{:08X}.jpg".format(index),
+                           'vendorName': 'DigitalGlobe'}}
+
+def make_catalog_records(n, bounds=constants.TEST_AOI, seed=0):
+    """
+    A list of n synthetic catalog records with footprints around bounds
+    """
+    rng = random.Random(seed)
+    return [make_catalog_record(rng, i, bounds) for i in range(n)]
+
+def make_search_response(records):
+    stats = {'recordsReturned': len(records), 'totalRecords': len(records),
+             'typeCounts': {'DigitalGlobeAcquisition': len(records)}}
+    return {'stats': stats, 'searchTag': 'mock', 'results': records}
+
+def make_png(width=512, height=409, seed=0):
+    """
+    A synthetic RGB thumbnail, encoded as PNG
+    """
+    rng = random.Random(seed)
+    rows = []
+    for y in range(height):
+        row = bytearray(1 + 3*width)    #leading 0 byte: no row filter
+        for x in range(0, width, 8):
+            px = ((x + y) % 256, (x*y) % 256, rng.randint(0, 255))
+            for i in range(x, min(width, x + 8)):
+                row[1+3*i:4+3*i] = bytes(px)
+        rows.append(bytes(row))
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + \
+               struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff)
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + \
+           chunk(b"IDAT", zlib.compress(b"".join(rows))) + chunk(b"IEND", b"")
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    #the default listen backlog of 5 stalls highly concurrent clients on SYN retries
+    request_queue_size = 128
+    daemon_threads = True
+
+class MockGBDXServer(object):
+    """
+    A threaded HTTP server that mimics the GBDX API endpoints used by gbdx.
+    Attributes can be changed while the server runs, e.g. server.latency.
+    """
+    def __init__(self, latency=0.0, error_rate=0.0, catalog_records=100,
+                 workflows=20, order_polls=2, seed=0, fixtures=None):
+        """
+        Constructor
+        @param latency: Seconds added to every response
+        @param error_rate: The fraction of requests answered with a 503 error
+        @param catalog_records: The number of records returned by each catalog search
+        @param workflows: The number of workflow ids returned by workflow searches
+        @param order_polls: The number of status polls before an order is delivered
+        @param seed: Seeds the synthetic data and error injection
+        @param fixtures: Optional path of a JSON file of recorded responses
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.catalog_records = catalog_records
+        self.workflows = workflows
+        self.order_polls = order_polls
+        self.seed = seed
+        self.requests = Counter()   #(method, route) -> count
+        self._fixtures = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._search_cache = {}
+        self._png = None
+        self._orders = {}
+        self._submitted = 0
+        self._httpd = None
+        self._thread = None
+        self._old_base_url = None
+        self.base_url = None    #set when the server starts
+        if fixtures is not None:
+            self.load_fixtures(fixtures)
+
+    def load_fixtures(self, path):
+        """
+        Loads recorded responses from a JSON file, see the module docstring
+        """
+        with open(path) as f:
+            for fx in json.load(f):
+                self.add_fixture(fx['method'], fx['path'], fx.get('body'), fx.get('status', 200))
+
+    def add_fixture(self, method, path, body, status=200):
+        """
+        Replays a recorded response for the given method and path
+        @param body: A json-serializable object, or bytes
+        """
+        self._fixtures[(method.upper(), path)] = (status, body)
+
+    def start(self):
+        self._httpd = _MockHTTPServer(('127.0.0.1', 0), _make_handler(self))
+        self.base_url = "http://{}:{}".format(*self._httpd.server_address[0:2])
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-gbdx")
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._thread.join()
+            self._httpd = None
+
+    def __enter__(self):
+        self.start()
+        self._old_base_url = constants.GBDX_BASE_URL
+        constants.GBDX_BASE_URL = self.base_url
+        return self
+
+    def __exit__(self, *args):
+        constants.GBDX_BASE_URL = self._old_base_url
+        self.stop()
+
+    def _should_fail(self):
+        with self._lock:
+            return self.error_rate > 0 and self._rng.random() < self.error_rate
+
+    def respond(self, method, path, body):
+        """
+        Computes the response to a request.
+        @return: (status, content_type, payload bytes)
+        """
+        parts = path.split('?')[0].strip('/').split('/')
+        route = "/".join(parts[0:3])
+        with self._lock:
+            self.requests[(method, route)] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self._should_fail():
+            return (503, 'application/json', b'{"error": "injected failure"}')
+        if (method, path) in self._fixtures:
+            (status, data) = self._fixtures[(method, path)]
+            if isinstance(data, bytes):
+                return (status, 'application/octet-stream', data)
+            return (status, 'application/json', json.dumps(data).encode('utf-8'))
+        handler = getattr(self, "_{}_{}".format(method.lower(), "_".join(parts[0:2])), None)
+        if handler is None:
+            return (404, 'application/json', b'{"error": "not found"}')
+        result = handler(parts[2:], body)
+        if isinstance(result, bytes):
+            return (200, 'image/png', result)
+        if isinstance(result, tuple):
+            return (result[0], 'application/json', json.dumps(result[1]).encode('utf-8'))
+        return (200, 'application/json', json.dumps(result).encode('utf-8'))
+
+    #synthetic endpoint handlers, named _<method>_<service>_<version>
+
+    def _post_catalog_v1(self, parts, body):
+        search = json.loads(body.decode('utf-8'))
+        area = swkt.loads(search['searchAreaWkt'])
+        key = (hashlib.sha1(body).hexdigest(), self.catalog_records)
+        with self._lock:
+            payload = self._search_cache.get(key)
+        if payload is None:
+            seed = int(key[0][0:8], 16) ^ self.seed
+            records = make_catalog_records(self.catalog_records, area.bounds, seed)
+            payload = make_search_response(records)
+            with self._lock:
+                self._search_cache[key] = payload
+        return payload
+
+    def _get_catalog_v1(self, parts, body):
+        cat_id = parts[-1]
+        rng = random.Random(cat_id)
+        rec = make_catalog_record(rng, 0, constants.TEST_AOI)
+        rec['identifier'] = cat_id
+        return rec
+
+    def _get_thumbnails_v1(self, parts, body):
+        with self._lock:
+            if self._png is None:
+                self._png = make_png(seed=self.seed)
+            return self._png
+
+    def _post_orders_v1(self, parts, body):
+        cat_ids = json.loads(body.decode('utf-8'))
+        with self._lock:
+            soli = "{:09d}".format(len(self._orders) + 1)
+            self._orders[soli] = {'cat_ids': cat_ids, 'polls': 0}
+        return {'salesOrderNumber': soli}
+
+    def _get_orders_v1(self, parts, body):
+        soli = parts[-1]
+        with self._lock:
+            order = self._orders.get(soli)
+            if order is None:
+                return (404, {'error': 'no such order'})
+            order['polls'] += 1
+            pct = min(100, 100*order['polls']//max(1, self.order_polls))
+        lines = [{'lineItemNumber': i, 'catalogId': cid, 'percentDelivered': str(pct)}
+                 for (i, cid) in enumerate(order['cat_ids'])]
+        return {'salesOrderNumber': soli, 'lines': lines}
+
+    def _post_workflows_v1(self, parts, body):
+        if parts[-1] != 'search':
+            workflow = json.loads(body.decode('utf-8'))
+            with self._lock:
+                self._submitted += 1
+                wf_id = "{:019d}".format(4400000000000000000 + self._submitted)
+            return {'id': wf_id, 'name': workflow.get('name'), 'state': {'state': 'pending'}}
+        return {'Workflows': ["{:019d}".format(4300000000000000000 + i)
+                              for i in range(self.workflows)]}
+
+    def _get_workflows_v1(self, parts, body):
+        if parts[0] == 'tasks':
+            if len(parts) == 1:
+                return {'tasks': ["MockTask{}".format(i) for i in range(10)]}
+            return {'name': parts[1], 'version': '1.0',
+                    'inputPortDescriptors': [{'name': 'data', 'type': 'directory', 'required': True}],
+                    'outputPortDescriptors': [{'name': 'data', 'type': 'directory'}]}
+        wf_id = parts[-1]
+        return {'id': wf_id, 'owner': 'mock', 'state': {'state': 'complete', 'event': 'succeeded'},
+                'tasks': [{'name': 'task1', 'taskType': 'MockTask0',
+                           'state': {'state': 'complete', 'event': 'succeeded'}}]}
+
+def _make_handler(server):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        #headers and body are written separately, so avoid delayed-ACK stalls
+        disable_nagle_algorithm = True
+
+        def _handle(self, method):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length) if length else b""
+            if self.headers.get('Content-Encoding') == 'gzip':
+                body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+            (status, content_type, payload) = server.respond(method, self.path, body)
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            self._handle('GET')
+
+        def do_POST(self):
+            self._handle('POST')
+
+        def log_message(self, *args):
+            pass
+    return Handler
@@ -0,0 +1,143 @@
+'''
+Created on Oct 18, 2026
+
+@author: sohara
+'''
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+
+import gbdx
+from gbdx import constants
+from gbdx.cache import QueryCache
+from gbdx.instrumentation import Metrics, get_metrics
+
+try:
+    import asyncio
+    from aiohttp import web
+    import gbdx.aio as aio
+    HAVE_AIOHTTP = True
+except (ImportError, SyntaxError):
+    HAVE_AIOHTTP = False
+
+@unittest.skipUnless(HAVE_AIOHTTP, "requires python 3 and aiohttp")
+class Test(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.requests = []
+        self.failures_left = 1
+        app = web.Application()
+        app.router.add_get('/catalog/v1/record/{cat_id}', self.record)
+        app.router.add_post('/catalog/v1/search', self.search)
+        app.router.add_get('/workflows/v1/workflows/{wf_id}', self.workflow)
+        app.router.add_post('/workflows/v1/workflows/search', self.workflow_search)
+        self.runner = web.AppRunner(app)
+        self.loop.run_until_complete(self.runner.setup())
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        self.loop.run_until_complete(site.start())
+        port = site._server.sockets[0].getsockname()[1]
+        self.old_base_url = constants.GBDX_BASE_URL
+        constants.GBDX_BASE_URL = "http://127.0.0.1:{}".format(port)
+
+    def tearDown(self):
+        constants.GBDX_BASE_URL = self.old_base_url
+        self.loop.run_until_complete(self.runner.cleanup())
+        self.loop.close()
+
+    async def record(self, request):
+        self.requests.append(request.headers.get('Authorization'))
+        if self.failures_left:
+            self.failures_left -= 1
+            return web.Response(status=503)
+        if request.match_info['cat_id'] == 'chunked':
+            ret = web.StreamResponse()
+            ret.enable_chunked_encoding()
+            await ret.prepare(request)
+            await ret.write(b'{"identifier": ')
+            await ret.write(b'"chunked"}')
+            await ret.write_eof()
+            return ret
+        return web.json_response({'identifier': request.match_info['cat_id']})
+
+    async def search(self, request):
+        self.requests.append(request.headers.get('Authorization'))
+        body = json.loads(await request.text())
+        rec = {'identifier': 'A', 'properties': {'footprintWkt': body['searchAreaWkt']}}
+        return web.json_response({'stats': {'totalRecords': 1, 'recordsReturned': 1},
+                                  'searchTag': None, 'results': [rec]})
+
+    async def workflow(self, request):
+        wf_id = request.match_info['wf_id']
+        if wf_id == 'bad':
+            return web.Response(status=404)
+        return web.json_response({'id': wf_id, 'owner': 'me'})
+
+    async def workflow_search(self, request):
+        return web.json_response({'Workflows': ['w1', 'w2', 'bad']})
+
+    def run_client(self, coro_func, **options):
+        async def main():
+            async with aio.AsyncClient("token123", backoff_factor=0, **options) as client:
+                return await coro_func(client)
+        return self.loop.run_until_complete(main())
+
+    def test_get_catalog_record(self):
+        print("\nTesting async catalog record retrieval")
+        rec = self.run_client(lambda c: aio.get_catalog_record(c, gbdx.TEST_CAT_ID))
+        self.assertEqual(rec['identifier'], gbdx.TEST_CAT_ID)
+        self.assertListEqual(self.requests, ["Bearer token123"]*2)
+
+    def test_client_metrics(self):
+        print("\nTesting async request metrics")
+        metrics = Metrics()
+        global_decodes = get_metrics().snapshot()['endpoints'].get('catalog/v1/record', {})
+        self.run_client(lambda c: aio.get_catalog_record(c, gbdx.TEST_CAT_ID), metrics=metrics)
+        stats = metrics.snapshot()['endpoints']['catalog/v1/record']
+        self.assertEqual((stats['latency']['count'], stats['decode']['count']), (1, 1))
+        self.assertEqual(stats['bytes_in'], len(json.dumps({'identifier': gbdx.TEST_CAT_ID})))
+        #a chunked response has no Content-Length, the body read is counted instead
+        self.run_client(lambda c: aio.get_catalog_record(c, 'chunked'), metrics=metrics)
+        stats = metrics.snapshot()['endpoints']['catalog/v1/record']
+        self.assertEqual(stats['bytes_in'], len(json.dumps({'identifier': gbdx.TEST_CAT_ID})) +
+                         len(b'{"identifier": "chunked"}'))
+        self.run_client(lambda c: aio.get_catalog_record(c, gbdx.TEST_CAT_ID), metrics=False)
+        self.assertEqual(get_metrics().snapshot()['endpoints'].get('catalog/v1/record', {}),
+                         global_decodes)
+
+    def test_query(self):
+        print("\nTesting async catalog query")
+        qry = gbdx.GBDXQuery((0, 0, 1, 1), query_cache=False)
+        res = self.run_client(lambda c: aio.query(c, qry))
+        self.assertListEqual(res.list_IDs(), ['A'])
+        res = self.run_client(lambda c: aio.query_tiled(c, qry, grid=(2, 2)))
+        self.assertListEqual(res.list_IDs(), ['A'])
+
+    def test_cached_query(self):
+        print("\nTesting async catalog query with a result cache")
+        tmpdir = tempfile.mkdtemp()
+        try:
+            cache = QueryCache(os.path.join(tmpdir, "queries.sqlite"))
+            qry = gbdx.GBDXQuery((0, 0, 1, 1), query_cache=cache)
+            for _ in range(2):
+                res = self.run_client(lambda c: aio.query(c, qry))
+                self.assertListEqual(res.list_IDs(), ['A'])
+            self.assertEqual(len(self.requests), 1)
+            self.assertEqual(cache.stats()['hits'], 1)
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_search_workflows(self):
+        print("\nTesting async workflow search")
+        (ids, statuses) = self.run_client(lambda c: aio.search_workflows(c, details=True))
+        self.assertListEqual(ids, ['w1', 'w2', 'bad'])
+        self.assertEqual(statuses['w2']['id'], 'w2')
+        self.assertIsInstance(statuses['bad'], Exception)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+'''
+Created on Oct 18, 2026
+
+@author: sohara
+'''
+import unittest
+import os
+import sys
+import time
+import shutil
+import tempfile
+import multiprocessing
+import requests
+from requests.adapters import BaseAdapter
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+
+import gbdx
+from gbdx.auth import TokenCache, CachedTokenSession
+from tests.helpers import FakeClock
+
+def _slow_fetch(log_path):
+    #records the fetch, and takes long enough for the other workers to pile up
+    with open(log_path, 'a') as f:
+        f.write("{}\n".format(os.getpid()))
+    time.sleep(0.2)
+    return {'access_token': 'tok-{}'.format(os.getpid()), 'expires_in': 3600}
+
+def _worker(token_path, log_path, queue):
+    cache = TokenCache(token_path, fetch=lambda: _slow_fetch(log_path))
+    queue.put(cache.get_token()['access_token'])
+
+class FakeAuthAdapter(BaseAdapter):
+    """
+    Accepts only requests that carry the bearer token given as valid_token
+    """
+    def __init__(self):
+        BaseAdapter.__init__(self)
+        self.valid_token = None
+        self.seen = []
+
+    def send(self, request, **kwargs):
+        auth = request.headers.get('Authorization')
+        self.seen.append(auth)
+        ret = requests.Response()
+        ret.status_code = 200 if auth == "Bearer {}".format(self.valid_token) else 401
+        ret.request = request
+        ret.url = request.url
+        return ret
+
+    def close(self):
+        pass
+
+class TestTokenCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "token.json")
+        self.fetched = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def fetch(self):
+        self.fetched.append(len(self.fetched))
+        return {'access_token': "tok{}".format(len(self.fetched)), 'expires_in': 3600}
+
+    def test_reuse_until_expiry(self):
+        print("\nTesting token reuse until shortly before expiry")
+        clock = FakeClock()
+        cache = TokenCache(self.path, fetch=self.fetch, refresh_margin=300, clock=clock)
+        self.assertEqual(cache.get_token()['access_token'], "tok1")
+        self.assertEqual(cache.get_token()['expires_at'], 4600)
+        #another cache on the same file reuses the stored token
+        other = TokenCache(self.path, fetch=self.fetch, clock=clock)
+        self.assertEqual(other.get_token()['access_token'], "tok1")
+        clock.now += 3200
+        self.assertEqual(other.get_token()['access_token'], "tok1")
+        clock.now += 200
+        self.assertEqual(other.get_token()['access_token'], "tok2")
+        self.assertEqual(cache.get_token()['access_token'], "tok2")
+        self.assertEqual((len(self.fetched), cache.refresh_count, other.refresh_count), (2, 1, 1))
+        cache.invalidate()
+        self.assertIsNone(cache.read())
+
+    def test_token_without_expiry(self):
+        print("\nTesting tokens without an expires_at")
+        clock = FakeClock()
+        cache = TokenCache(self.path, fetch=lambda: {'access_token': "tok"},
+                           refresh_margin=300, clock=clock)
+        self.assertEqual(cache.get_token()['expires_at'], 1000 + 3600)
+        self.assertEqual(cache.refresh_count, 1)
+        cache.get_token()
+        self.assertEqual(cache.refresh_count, 1)
+        #a stored token without expires_at is dated from when it was fetched
+        self.assertTrue(cache.is_fresh({'access_token': "a", 'expires_in': 600,
+                                        'fetched_at': 1000}))
+        self.assertFalse(cache.is_fresh({'access_token': "a", 'expires_in': 200,
+                                         'fetched_at': 1000}))
+        self.assertFalse(cache.is_fresh({'access_token': "a"}))
+
+    def test_single_refresher_across_processes(self):
+        print("\nTesting that one process refreshes the shared token")
+        log_path = os.path.join(self.tmpdir, "fetches.log")
+        queue = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=_worker, args=(self.path, log_path, queue))
+                   for _ in range(6)]
+        for w in workers:
+            w.start()
+        tokens = [queue.get(timeout=30) for _ in workers]
+        for w in workers:
+            w.join()
+        with open(log_path) as f:
+            fetches = f.read().split()
+        self.assertEqual(len(fetches), 1)
+        self.assertEqual(set(tokens), set(["tok-{}".format(fetches[0])]))
+
+    def test_session_refreshes_rejected_token(self):
+        print("\nTesting a cached-token session after a 401 response")
+        cache = TokenCache(self.path, fetch=self.fetch)
+        session = CachedTokenSession(cache)
+        adapter = FakeAuthAdapter()
+        session.mount("https://", adapter)
+        adapter.valid_token = "tok1"
+        self.assertEqual(session.get("https://geobigdata.io/x").status_code, 200)
+        #the token is revoked server-side before it expires
+        adapter.valid_token = "tok2"
+        self.assertEqual(session.get("https://geobigdata.io/x", headers={'A': 'b'}).status_code, 200)
+        self.assertEqual(adapter.seen, ["Bearer tok1", "Bearer tok1", "Bearer tok2"])
+        self.assertEqual(session.token['access_token'], "tok2")
+        self.assertNotIn('Authorization', session.headers)
+
+if __name__ == "__main__":
+    unittest.main()
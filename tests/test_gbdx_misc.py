@@ -6,11 +6,13 @@ Created on Aug 10, 2015
 import unittest
 import os
 import sys 
+import threading
 
 PACKAGE_DIR= os.path.dirname( os.path.dirname( os.path.abspath(__file__)) )
 sys.path.insert(0, PACKAGE_DIR)
 
 import gbdx
+from tests.helpers import FakeResponse
 
 class Test(unittest.TestCase):
     def setUp(self):
@@ -38,6 +40,34 @@ class Test(unittest.TestCase):
         self.assertTrue( rec['identifier']==gbdx.TEST_CAT_ID,
                          "Unexpected identifier returned in catalog record")
 
+class FakeRecordSession(object):
+    """
+    Serves catalog records locally; ids starting with 'bad' return a 404.
+    """
+    def __init__(self):
+        self.requested = []
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, **kwargs):
+        cat_id = url.split("/")[-1]
+        with self._lock:
+            self.requested.append(cat_id)
+        return FakeResponse(404 if cat_id.startswith("bad") else 200,
+                            {'identifier': cat_id})
+
+class TestBatchFetch(unittest.TestCase):
+    def test_get_catalog_records(self):
+        print("\nTesting batched catalog record retrieval")
+        session = FakeRecordSession()
+        ids = ["A", "B", "bad", "A", "C", "B"]
+        outcomes = dict((cid, (rec, err)) for (cid, rec, err) in
+                        gbdx.get_catalog_records(session, ids, max_workers=3))
+        self.assertListEqual(sorted(session.requested), ["A", "B", "C", "bad"])
+        self.assertListEqual(sorted(outcomes.keys()), ["A", "B", "C", "bad"])
+        self.assertEqual(outcomes["C"][0]['identifier'], "C")
+        self.assertIsNone(outcomes["bad"][0])
+        self.assertIsInstance(outcomes["bad"][1], IOError)
+
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.test_load_credentials']
     unittest.main()
\ No newline at end of file
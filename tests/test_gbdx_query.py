@@ -7,11 +7,13 @@ import unittest
 import os
 import sys
 import shapely.geometry as sg
+import shapely.wkt as swkt
 
 PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, PACKAGE_DIR)
 
 import gbdx
+from tests.helpers import make_record, FakeCatalogSession
 
 class Test(unittest.TestCase):
     def setUp(self):
@@ -40,6 +42,170 @@ class Test(unittest.TestCase):
         self.assertTrue( len(result) == 46, "There should be 46 records returned.")
 
 
+class TestTiledQuery(unittest.TestCase):
+    def setUp(self):
+        self.records = [make_record("A", sg.box(0, 0, 10, 10)),
+                        make_record("B", sg.box(1, 1, 2, 2)),
+                        make_record("C", sg.box(8, 8, 9, 9)),
+                        make_record("D", sg.box(20, 20, 21, 21))]
+        self.session = FakeCatalogSession(self.records)
+
+    def test_tiled_query_merges_and_dedupes(self):
+        print("\nTesting tiled catalog query")
+        query = gbdx.GBDXQuery((0, 0, 10, 10), query_cache=False)
+        result = query.query_tiled(self.session, grid=(3, 2), max_workers=4)
+        self.assertEqual(self.session.search_count, 6)
+        self.assertListEqual(result.list_IDs(), ["A", "B", "C"])
+        self.assertEqual(len(result), 3)
+
+    def test_tiled_query_skips_tiles_outside_polygon(self):
+        print("\nTesting tiled catalog query with a polygon AOI")
+        aoi = sg.Polygon([(0, 0), (10, 0), (10, 4), (4, 4), (4, 10), (0, 10)])
+        query = gbdx.GBDXQuery(aoi, query_cache=False)
+        result = query.query_tiled(self.session, grid=(2, 2))
+        self.assertEqual(self.session.search_count, 3)
+        self.assertListEqual(result.list_IDs(), ["A", "B"])
+
+class TestQueryResult(unittest.TestCase):
+    def setUp(self):
+        records = [make_record("C", sg.box(0, 0, 10, 10), panResolution='0.5'),
+                   make_record("A", sg.box(1, 1, 2, 2), panResolution='0.4'),
+                   make_record("B", sg.box(0, 0, 5, 5), panResolution='0.6')]
+        stats = {'recordsReturned': 3, 'totalRecords': 3}
+        self.result = gbdx.GBDXQueryResult({'stats': stats, 'searchTag': None,
+                                            'results': records})
+
+    def test_lookup_by_id(self):
+        print("\nTesting query result lookup by identifier")
+        self.assertListEqual(self.result.list_IDs(), ["A", "B", "C"])
+        self.assertEqual(self.result["B"]['identifier'], "B")
+        self.assertEqual(self.result[0]['identifier'], "A")
+        self.assertEqual(self.result.get_property_from_id("C", 'panResolution'), '0.5')
+        with self.assertRaises(KeyError):
+            self.result.get_record_for_ID('not_gonna_find_me')
+
+    def test_ids_containing_poly(self):
+        print("\nTesting query result footprint containment")
+        ids = self.result.get_ids_containing_poly(sg.box(3, 3, 4, 4))
+        self.assertListEqual(ids, ["B", "C"])
+        self.assertIsInstance(self.result.get_footprint_from_id("A"), sg.Polygon)
+        with self.assertRaises(KeyError):
+            self.result.get_footprint_from_id('not_gonna_find_me')
+
+    def test_bulk_footprint_predicates(self):
+        print("\nTesting bulk footprint predicates")
+        aoi = sg.box(4, 4, 6, 6)
+        self.assertListEqual(self.result.get_ids_intersecting_poly(aoi), ["B", "C"])
+        fractions = self.result.get_coverage_fractions(aoi)
+        self.assertAlmostEqual(fractions["B"], 0.25)
+        self.assertAlmostEqual(fractions["C"], 1.0)
+        self.assertAlmostEqual(self.result.footprint_index.union_coverage(sg.box(5, 5, 15, 15)), 0.25)
+
+        batch = self.result.get_ids_containing_polys([sg.box(1.2, 1.2, 1.8, 1.8),
+                                                      sg.box(6, 6, 7, 7),
+                                                      sg.box(20, 20, 21, 21)])
+        self.assertListEqual(batch, [["A", "B", "C"], ["C"], []])
+
+    def test_covering_selection(self):
+        print("\nTesting minimal-coverage scene selection")
+        records = [make_record("L", sg.box(0, 0, 5.5, 10), cloudCover=0, offNadirAngle=5),
+                   make_record("R", sg.box(4.5, 0, 10, 10), cloudCover=0, offNadirAngle=5),
+                   make_record("M", sg.box(3, 0, 7, 10), cloudCover=0, offNadirAngle=5),
+                   make_record("BIG", sg.box(0, 0, 10, 10), cloudCover=90, offNadirAngle=5),
+                   make_record("FAR", sg.box(50, 50, 60, 60), cloudCover=0)]
+        stats = {'recordsReturned': 5, 'totalRecords': 5}
+        result = gbdx.GBDXQueryResult({'stats': stats, 'searchTag': None, 'results': records})
+        aoi = sg.box(0, 0, 10, 10)
+        (ids, pct) = result.get_ids_covering_poly(aoi)
+        self.assertListEqual(sorted(ids), ["L", "R"])
+        self.assertAlmostEqual(pct, 100.0)
+        #without the cloud penalty, the single large scene is cheapest
+        (ids, pct) = result.get_ids_covering_poly(aoi, cloud_weight=0)
+        self.assertListEqual(ids, ["BIG"])
+        (ids, pct) = result.get_ids_covering_poly(sg.box(0, 0, 20, 10))
+        self.assertAlmostEqual(pct, 50.0)
+        self.assertEqual(result.get_ids_covering_poly(sg.box(30, 30, 31, 31)), ([], 0.0))
+        #thin aois: a corridor a thousand times longer than wide, and a sliver
+        #no raster cell center falls in
+        self.assertEqual(result.get_ids_covering_poly(sg.box(0.3, 0.5, 1.8, 0.501)), (["L"], 100.0))
+        sliver = sg.LineString([(0.5, 0.5), (9.5, 5.0)]).buffer(1e-4)
+        (ids, pct) = result.get_ids_covering_poly(sliver)
+        self.assertListEqual(sorted(ids), ["L", "R"])
+        self.assertAlmostEqual(pct, 100.0)
+
+    def test_compact_records(self):
+        print("\nTesting compact query result records")
+        records = [make_record("C", sg.box(0, 0, 10, 10), panResolution='0.5'),
+                   make_record("A", sg.box(1, 1, 2, 2), panResolution='0.4')]
+        stats = {'recordsReturned': 2, 'totalRecords': 2}
+        result = gbdx.GBDXQueryResult({'stats': stats, 'searchTag': None,
+                                       'results': [dict(r) for r in records]}, compact=True)
+        self.assertListEqual(result.list_IDs(), ["A", "C"])
+        self.assertEqual(result.get_property_from_id("C", 'panResolution'), '0.5')
+        self.assertEqual(result["A"]['type'], 'DigitalGlobeAcquisition')
+        self.assertTrue(result.get_footprint_from_id("A").equals(sg.box(1, 1, 2, 2)))
+        self.assertListEqual(result.get_ids_containing_poly(sg.box(1.5, 1.5, 1.6, 1.6)), ["A", "C"])
+        self.assertIs(result[0]._schema, result[1]._schema)
+        rec = result["A"].to_dict()
+        self.assertTrue(swkt.loads(rec['properties'].pop('footprintWkt')).equals(sg.box(1, 1, 2, 2)))
+        expected = records[1]
+        expected['properties'].pop('footprintWkt')
+        self.assertEqual(rec, expected)
+        self.assertListEqual(result.list_property_keys(), ['footprintWkt', 'panResolution'])
+        with self.assertRaises(KeyError):
+            result["A"]['properties']['nope']
+
+    def test_compact_footprint_precision(self):
+        print("\nTesting compact record footprint precision")
+        footprint = sg.Polygon([(-105.123456789012, 40.0123456789012), (-104.987654321098, 40.0123456789012),
+                                (-104.987654321098, 40.2345678901234), (-105.123456789012, 40.0123456789012)])
+        record = make_record("A", footprint)
+        stats = {'recordsReturned': 1, 'totalRecords': 1}
+        result = gbdx.GBDXQueryResult({'stats': stats, 'searchTag': None,
+                                       'results': [record]}, compact=True)
+        wkt = result["A"]['properties']['footprintWkt']
+        self.assertIn("-105.123456789012", wkt)
+        self.assertTrue(swkt.loads(wkt).equals_exact(footprint, 0))
+        self.assertEqual(result["A"].to_dict()['properties']['footprintWkt'], wkt)
+
+    def test_columns(self):
+        print("\nTesting columnar view of query results")
+        records = [make_record("A", sg.box(0, 0, 1, 1), cloudCover='1', offNadirAngle='5',
+                               timestamp='2014-03-01T10:00:00.000Z'),
+                   make_record("B", sg.box(0, 0, 2, 2), cloudCover='2', offNadirAngle='4',
+                               timestamp='2013-03-01T10:00:00.000Z'),
+                   make_record("C", sg.box(0, 0, 3, 3), cloudCover='4', offNadirAngle='1',
+                               timestamp='2012-03-01T10:00:00.000Z'),
+                   make_record("D", sg.box(0, 0, 4, 4), offNadirAngle='2', sensor='WV2',
+                               imageBands='Pan_MS1')]
+        stats = {'recordsReturned': 4, 'totalRecords': 4}
+        result = gbdx.GBDXQueryResult({'stats': stats, 'searchTag': None, 'results': records})
+        self.assertListEqual(result.list_property_keys(),
+                             ['cloudCover', 'footprintWkt', 'imageBands', 'offNadirAngle',
+                              'sensor', 'timestamp'])
+
+        cols = result.to_columns()
+        self.assertTrue(cols['cloudCover'].dtype.kind == 'f')
+        self.assertTrue(cols['timestamp'].dtype.kind == 'M')
+        self.assertListEqual(cols['maxx'].tolist(), [1.0, 2.0, 3.0, 4.0])
+        self.assertListEqual(cols['sensor'].tolist(), [None, None, None, 'WV2'])
+        self.assertListEqual(cols['imageBands'].tolist(), [None, None, None, 'Pan_MS1'])
+
+        selected = cols.filter((cols['cloudCover'] < 3) & (cols['offNadirAngle'] < 10))
+        self.assertListEqual(selected.sort_by('timestamp').ids, ["B", "A"])
+        self.assertListEqual(cols.sort_by('offNadirAngle', descending=True).ids,
+                             ["A", "B", "D", "C"])
+        #missing values sort last, and ties keep their order, in either direction
+        self.assertListEqual(cols.sort_by('cloudCover', descending=True).ids,
+                             ["C", "B", "A", "D"])
+        self.assertListEqual(cols.sort_by('timestamp', descending=True).ids,
+                             ["A", "B", "C", "D"])
+        self.assertListEqual(cols.sort_by('sensor').ids, ["D", "A", "B", "C"])
+        self.assertListEqual(cols.sort_by('sensor', descending=True).ids, ["D", "A", "B", "C"])
+        self.assertListEqual(cols.sort_by('sensor', 'cloudCover', descending=True).ids,
+                             ["D", "C", "B", "A"])
+
+
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.test_load_credentials']
     unittest.main()
@@ -0,0 +1,57 @@
+'''
+Created on Oct 18, 2026
+
+@author: sohara
+
+Guards the cold-start cost of "import gbdx", which is paid by every
+CLI invocation and worker process.
+'''
+import unittest
+import os
+import sys
+import json
+import subprocess
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#seconds, measured in a fresh interpreter
+IMPORT_TIME_BUDGET = 0.5
+
+#modules that must only be imported when first used
+HEAVY_MODULES = ('gbdx_auth', 'matplotlib', 'pylab', 'cv2', 'shapely',
+                 'numpy', 'sqlite3', 'aiohttp')
+
+_SCRIPT = """
+import sys, time, json
+sys.path.insert(0, {package_dir!r})
+t0 = time.time()
+import gbdx
+elapsed = time.time() - t0
+loaded = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{'elapsed': elapsed, 'loaded': loaded}}))
+"""
+
+def measure_import(repeats=3):
+    """
+    Imports gbdx in fresh interpreters and returns the best time,
+    along with the heavy modules that were imported.
+    """
+    script = _SCRIPT.format(package_dir=PACKAGE_DIR, heavy=HEAVY_MODULES)
+    runs = []
+    for _ in range(repeats):
+        out = subprocess.check_output([sys.executable, "-c", script])
+        runs.append(json.loads(out.decode('utf-8').strip().splitlines()[-1]))
+    best = min(runs, key=lambda r: r['elapsed'])
+    return (best['elapsed'], best['loaded'])
+
+class Test(unittest.TestCase):
+    def test_import_is_light(self):
+        print("\nTesting import time of gbdx")
+        (elapsed, loaded) = measure_import()
+        print("import gbdx: {:.3f} seconds".format(elapsed))
+        self.assertListEqual(loaded, [], "Heavy modules imported eagerly: {}".format(loaded))
+        self.assertTrue(elapsed < IMPORT_TIME_BUDGET,
+                        "import gbdx took {:.3f}s, budget is {}s".format(elapsed, IMPORT_TIME_BUDGET))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+'''
+Created on Oct 18, 2026
+
+@author: sohara
+'''
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+
+import gbdx
+from gbdx.incremental import DeltaStore, narrowed_start_date
+from tests.helpers import FakeResponse
+
+def make_record(cat_id, timestamp, cloud='1'):
+    return {'identifier': cat_id, 'type': 'DigitalGlobeAcquisition',
+            'properties': {'timestamp': timestamp, 'cloudCover': cloud}}
+
+class FakeMonitorSession(object):
+    """
+    A catalog that honors the search start date, and records the searches.
+    """
+    def __init__(self, records):
+        self.records = records
+        self.start_dates = []
+
+    def post(self, url, data=None, headers=None, **kwargs):
+        start = json.loads(data)['startDate']
+        self.start_dates.append(start)
+        hits = [r for r in self.records if start is None or r['properties']['timestamp'] >= start]
+        stats = {'recordsReturned': len(hits), 'totalRecords': len(hits)}
+        return FakeResponse(200, {'stats': stats, 'searchTag': None, 'results': hits})
+
+class Test(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = DeltaStore(os.path.join(self.tmp_dir, "delta.sqlite"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_narrowed_start_date(self):
+        print("\nTesting incremental start date")
+        self.assertEqual(narrowed_start_date(None, None, 1), None)
+        self.assertEqual(narrowed_start_date('2010-01-01', '2015-03-02T10:00:00.000Z', 1),
+                         '2015-03-01')
+        self.assertEqual(narrowed_start_date('2015-06-01', '2015-03-02T10:00:00.000Z', 1),
+                         '2015-06-01')
+
+    def test_incremental_runs(self):
+        print("\nTesting incremental catalog queries")
+        session = FakeMonitorSession([make_record("A", '2014-01-05T10:00:00.000Z'),
+                                      make_record("B", '2015-03-02T10:00:00.000Z')])
+        qry = gbdx.GBDXQuery((0, 0, 1, 1), date_range=('2010-01-01', None))
+
+        first = qry.query_incremental(session, store=self.store)
+        self.assertListEqual(first.list_IDs(), ["A", "B"])
+
+        second = qry.query_incremental(session, store=self.store)
+        self.assertListEqual(second.list_IDs(), [])
+
+        session.records.append(make_record("C", '2015-03-04T10:00:00.000Z'))
+        session.records[1] = make_record("B", '2015-03-02T10:00:00.000Z', cloud='3')
+        third = qry.query_incremental(session, store=self.store)
+        self.assertListEqual(third.list_IDs(), ["B", "C"])
+        self.assertListEqual(session.start_dates, ['2010-01-01', '2015-03-01', '2015-03-01'])
+
+        #a new query object with the same parameters shares the state
+        qry2 = gbdx.GBDXQuery((0, 0, 1, 1), date_range=('2010-01-01', None))
+        self.assertListEqual(qry2.query_stored(self.store).list_IDs(), ["A", "B", "C"])
+        self.assertEqual(qry2.query_stored(self.store).get_property_from_id("B", 'cloudCover'), '3')
+        qry2.query_incremental(session, store=self.store)
+        self.assertEqual(session.start_dates[-1], '2015-03-03')
+
+if __name__ == "__main__":
+    unittest.main()
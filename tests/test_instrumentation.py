@@ -0,0 +1,76 @@
+'''
+Created on Oct 18, 2026
+
+@author: sohara
+'''
+import unittest
+import os
+import sys
+import requests
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+
+import gbdx
+from gbdx.instrumentation import Metrics, Histogram, endpoint_name
+from tests.helpers import FakeResponse, ScriptedSession
+
+class TestInstrumentation(unittest.TestCase):
+    def test_histogram(self):
+        print("\nTesting the latency histogram")
+        h = Histogram(buckets=(0.1, 1.0, 10.0))
+        for v in (0.05, 0.05, 0.5, 5.0, 50.0):
+            h.observe(v)
+        self.assertEqual(h.counts, [2, 1, 1, 1])
+        self.assertEqual(h.quantile(0.4), 0.1)
+        self.assertEqual(h.quantile(1.0), 50.0)
+        self.assertAlmostEqual(h.mean, 11.12)
+
+    def test_transport_metrics(self):
+        print("\nTesting per-endpoint request metrics")
+        metrics = Metrics()
+        events = []
+        metrics.add_listener(events.append)
+        session = ScriptedSession([FakeResponse(503),
+                                   FakeResponse(200, {'ok': 1}, {'Content-Length': '9'}),
+                                   FakeResponse(404)])
+        gbdx.configure_transport(session, backoff_factor=0, metrics=metrics)
+        url = "https://geobigdata.io/catalog/v1/record/1030010006C85000"
+        self.assertEqual(endpoint_name(url), "catalog/v1/record")
+        self.assertEqual(gbdx.post_json(session, url, '{"a": 1}'), {'ok': 1})
+        with self.assertRaises(requests.HTTPError):
+            gbdx.get_json(session, url)
+
+        self.assertEqual([(e.status, e.attempts, e.error is None) for e in events],
+                         [(200, 2, True), (404, 1, False)])
+        stats = metrics.snapshot()['endpoints']['catalog/v1/record']
+        self.assertEqual(stats['latency']['count'], 2)
+        self.assertEqual(stats['decode']['count'], 1)
+        #9 bytes from Content-Length, and the 4 bytes of the 404 body ("null"), which has none
+        self.assertEqual((stats['bytes_out'], stats['bytes_in']), (8, 13))
+        self.assertEqual((stats['retries'], stats['errors']), (1, 1))
+        self.assertEqual(stats['statuses'], {'200': 1, '404': 1})
+        self.assertEqual(metrics.snapshot()['in_flight'], 0)
+        self.assertIn("catalog/v1/record", metrics.summary())
+        text = metrics.prometheus_text()
+        self.assertIn('gbdx_request_duration_seconds_count{endpoint="catalog/v1/record"} 2', text)
+        self.assertIn('gbdx_retries_total{endpoint="catalog/v1/record"} 1', text)
+
+    def test_cache_metrics(self):
+        print("\nTesting cache hit ratio metrics")
+        metrics = Metrics()
+        for hit in (True, False, True, True):
+            metrics.cache_event('query', hit)
+        caches = metrics.snapshot()['caches']
+        self.assertEqual(caches['query']['hit_ratio'], 0.75)
+        self.assertIn('gbdx_cache_lookups_total{cache="query",result="miss"} 1',
+                      metrics.prometheus_text())
+
+    def test_disabled(self):
+        print("\nTesting disabled instrumentation")
+        session = ScriptedSession([FakeResponse(200, {'ok': 1})])
+        transport = gbdx.configure_transport(session, metrics=False)
+        self.assertEqual(transport.get_json("http://x/y"), {'ok': 1})
+
+if __name__ == "__main__":
+    unittest.main()
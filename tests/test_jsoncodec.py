@@ -0,0 +1,90 @@
+'''
+Created on Oct 18, 2026
+
+@author: sohara
+'''
+import unittest
+import os
+import sys
+import json
+import copy
+import pickle
+import tempfile
+import shutil
+import shapely.geometry as sg
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+
+import gbdx
+from gbdx import jsoncodec
+from gbdx.cache import QueryCache
+from tests.helpers import make_record, FakeCatalogSession
+
+DOC = {'stats': {'recordsReturned': 2}, 'searchTag': 't1',
+       'results': [{'identifier': 'B', 'properties': {'cloudCover': 1.5, 'tags': ['x']}},
+                   {'identifier': 'A', 'properties': {'cloudCover': 0.0, 'tags': []}}]}
+
+class TestJsonCodec(unittest.TestCase):
+    def setUp(self):
+        self.codec = jsoncodec.get_codec()
+        self.raw = json.dumps(DOC).encode('utf-8')
+
+    def tearDown(self):
+        jsoncodec.set_codec(self.codec)
+
+    def test_codecs_round_trip(self):
+        print("\nTesting the available json codecs")
+        self.assertEqual(jsoncodec.available_codecs()[-1], 'json')
+        for name in jsoncodec.available_codecs():
+            jsoncodec.set_codec(name)
+            self.assertEqual(jsoncodec.get_codec(), name)
+            self.assertEqual(jsoncodec.loads(self.raw), DOC)
+            payload = jsoncodec.dumps(DOC)
+            self.assertIsInstance(payload, bytes)
+            self.assertEqual(json.loads(payload.decode('utf-8')), DOC)
+        with self.assertRaises(ValueError):
+            jsoncodec.set_codec('yaml')
+
+    def test_lazy_records(self):
+        print("\nTesting lazy decoding of records")
+        doc = jsoncodec.loads_lazy(self.raw)
+        self.assertEqual((doc['stats'], doc['searchTag']), (DOC['stats'], 't1'))
+        records = doc['results']
+        self.assertEqual(len(records), 2)
+        self.assertEqual([r['identifier'] for r in records], ['B', 'A'])
+        self.assertEqual(records[1]['properties'], DOC['results'][1]['properties'])
+        self.assertEqual(dict(records[0]['properties']), DOC['results'][0]['properties'])
+        self.assertEqual([r['identifier'] for r in records[::-1]], ['A', 'B'])
+        if jsoncodec.simdjson is not None:
+            self.assertIsInstance(records, jsoncodec.LazyRecordList)
+            self.assertIs(records[0], records[0])
+            self.assertEqual(records[0].to_dict(), DOC['results'][0])
+            self.assertEqual(json.loads(records[1].raw), DOC['results'][1])
+            self.assertEqual(sorted(records[0]), ['identifier', 'properties'])
+            #copies and pickles are plain records
+            self.assertEqual(copy.deepcopy(records[1]), DOC['results'][1])
+            self.assertEqual(pickle.loads(pickle.dumps(records)), DOC['results'])
+            self.assertEqual(json.loads(json.dumps(records[0].to_dict())), DOC['results'][0])
+
+    def test_lazy_query(self):
+        print("\nTesting a lazily decoded, cached catalog query")
+        tmpdir = tempfile.mkdtemp()
+        try:
+            cache = QueryCache(os.path.join(tmpdir, "cache.sqlite"))
+            sess = FakeCatalogSession([make_record("C", sg.box(0, 0, 1, 1), cloudCover=3),
+                                       make_record("A", sg.box(0, 0, 2, 2), cloudCover=1)])
+            qry = gbdx.GBDXQuery((0, 0, 1, 1), query_cache=cache)
+            res = qry.query(sess, lazy=True)
+            self.assertEqual(res.list_IDs(), ['A', 'C'])
+            self.assertEqual(res.get_property_from_id('C', 'cloudCover'), 3)
+            self.assertEqual(res.get_ids_containing_poly(sg.box(0.5, 0.5, 1.5, 1.5)), ['A'])
+            #the response bytes are cached as received
+            self.assertEqual(jsoncodec.loads(cache.get_raw(qry.search_body)), cache.get(qry.search_body))
+            self.assertEqual(qry.query(sess).list_IDs(), ['A', 'C'])
+            self.assertEqual(sess.search_count, 1)
+        finally:
+            shutil.rmtree(tmpdir)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+'''
+Created on Oct 18, 2026
+
+@author: sohara
+'''
+import unittest
+import os
+import sys
+import requests
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+
+import gbdx
+from gbdx import constants
+from tests.mock_server import MockGBDXServer
+
+class TestMockServer(unittest.TestCase):
+    def test_catalog_query(self):
+        print("\nTesting a catalog query against the mock server")
+        with MockGBDXServer(catalog_records=250) as server:
+            self.assertEqual(constants.GBDX_BASE_URL, server.base_url)
+            sess = requests.Session()
+            qry = gbdx.GBDXQuery(gbdx.TEST_AOI, query_cache=False)
+            res = qry.query(sess)
+            self.assertEqual(len(res), 250)
+            #the synthetic data is deterministic
+            self.assertEqual(qry.query(sess).list_IDs(), res.list_IDs())
+            streamed = list(qry.iter_records(sess, fields=['identifier']))
+            self.assertEqual(sorted(r['identifier'] for r in streamed), res.list_IDs())
+            self.assertEqual(server.requests[('POST', 'catalog/v1/search')], 3)
+        self.assertNotEqual(constants.GBDX_BASE_URL, server.base_url)
+
+    def test_errors_and_fixtures(self):
+        print("\nTesting mock server error injection and recorded responses")
+        with MockGBDXServer(error_rate=1.0) as server:
+            sess = requests.Session()
+            gbdx.configure_transport(sess, max_retries=0)
+            with self.assertRaises(requests.HTTPError):
+                gbdx.get_catalog_record(sess, "1030010006C85000")
+            server.error_rate = 0.0
+            server.add_fixture('GET', '/catalog/v1/record/1030010006C85000',
+                               {'identifier': '1030010006C85000', 'recorded': True})
+            rec = gbdx.get_catalog_record(sess, "1030010006C85000")
+            self.assertTrue(rec['recorded'])
+            soli = gbdx.order_images(sess, ["a"])['salesOrderNumber']
+            self.assertEqual(gbdx.get_order_status(sess, soli)['lines'][0]['catalogId'], "a")
+
+if __name__ == "__main__":
+    unittest.main()
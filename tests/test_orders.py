@@ -0,0 +1,181 @@
+'''
+Created on Oct 18, 2026
+
+@author: sohara
+'''
+import unittest
+import os
+import sys
+import json
+import threading
+import requests
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+
+import gbdx
+from gbdx.polling import RateLimiter, PollScheduler
+from gbdx.orders import OrderManager, OrderFailedError, is_order_delivered
+from tests.helpers import FakeClock, FakeResponse
+
+class FakeOrderSession(object):
+    """
+    Places orders, and reports each one delivered after a number of status polls.
+    """
+    def __init__(self, polls_to_deliver=3):
+        self.polls_to_deliver = polls_to_deliver
+        self.orders = {}
+        self.polls = {}
+        self._lock = threading.Lock()
+
+    def post(self, url, data=None, headers=None, **kwargs):
+        with self._lock:
+            soli = "SO{:03d}".format(len(self.orders))
+            self.orders[soli] = json.loads(data)
+            self.polls[soli] = 0
+        return FakeResponse(200, {'salesOrderNumber': soli})
+
+    def get(self, url, headers=None, **kwargs):
+        soli = url.rstrip('/').split('/')[-1]
+        with self._lock:
+            self.polls[soli] += 1
+            pct = min(100, 100*self.polls[soli]//self.polls_to_deliver)
+        lines = [{'catalogId': cid, 'percentDelivered': str(pct)} for cid in self.orders[soli]]
+        return FakeResponse(200, {'salesOrderNumber': soli, 'lines': lines})
+
+class TestPolling(unittest.TestCase):
+    def test_rate_limiter(self):
+        print("\nTesting the polling rate limiter")
+        clock = FakeClock()
+        limiter = RateLimiter(rate=2.0, burst=2, clock=clock, sleep=clock.sleep)
+        for _ in range(6):
+            limiter.acquire()
+        #2 tokens from the burst, then 4 more at 2 per second
+        self.assertAlmostEqual(clock.now, 1002.0)
+
+    def test_adaptive_backoff(self):
+        print("\nTesting adaptive poll intervals")
+        clock = FakeClock()
+        states = {'a': ['x', 'x', 'x', 'y', 'y', 'done']}
+        def poll(key):
+            state = states[key].pop(0)
+            return (state, state == 'done')
+        sched = PollScheduler(poll, min_interval=10, max_interval=30, backoff_factor=2,
+                              jitter=0, rate_limiter=False, clock=clock)
+        sched.add('a', delay=0)
+        intervals = []
+        while len(sched):
+            due = sched.next_due()
+            intervals.append(due - clock.now)
+            clock.now = due
+            self.assertEqual(sched.poll_due(), 1)
+        #unchanged states back off up to max_interval, a change resets it
+        self.assertEqual(intervals, [0, 10, 20, 30, 10, 20])
+        self.assertIsNone(sched.next_due())
+
+    def test_errors_back_off(self):
+        print("\nTesting poll backoff after errors")
+        clock = FakeClock()
+        def poll(key):
+            raise ValueError("boom")
+        sched = PollScheduler(poll, min_interval=10, max_interval=100, backoff_factor=2,
+                              jitter=0, rate_limiter=False, clock=clock)
+        sched.add('a', delay=0)
+        sched.poll_due()
+        self.assertEqual(sched.next_due() - clock.now, 20)
+        self.assertEqual(sched.keys(), ['a'])
+        sched.remove('a')
+        self.assertEqual(len(sched), 0)
+
+class TestOrderManager(unittest.TestCase):
+    def test_chunked_orders(self):
+        print("\nTesting chunked order placement and polling")
+        sess = FakeOrderSession(polls_to_deliver=3)
+        delivered = []
+        mgr = OrderManager(sess, chunk_size=4, min_interval=0, max_interval=0,
+                           rate_limiter=False, start=False)
+        cat_ids = ["id{}".format(i) for i in range(10)]
+        futures = mgr.submit(cat_ids, callback=delivered.append)
+        self.assertEqual([f.cat_ids for f in futures],
+                         [cat_ids[0:4], cat_ids[4:8], cat_ids[8:10]])
+        self.assertEqual(sorted(mgr.outstanding()), sorted(f.soli for f in futures))
+        for _ in range(3):
+            self.assertEqual(mgr.poll(), 3)
+        self.assertEqual(mgr.outstanding(), [])
+        self.assertEqual(len(delivered), 3)
+        for fut in futures:
+            status = fut.result(timeout=0)
+            self.assertEqual(sess.orders[fut.soli], fut.cat_ids)
+            self.assertEqual([l['catalogId'] for l in status['lines']], fut.cat_ids)
+
+    def test_failed_order(self):
+        print("\nTesting an order that can't be placed")
+        class FailingSession(FakeOrderSession):
+            def post(self, url, data=None, headers=None, **kwargs):
+                return FakeResponse(200, {'error': 'no'})
+        mgr = OrderManager(FailingSession(), rate_limiter=False, start=False)
+        (fut,) = mgr.submit(["id0"])
+        self.assertIsInstance(fut.exception(timeout=0), KeyError)
+        self.assertEqual(mgr.outstanding(), [])
+
+    def test_cancelled_line_item(self):
+        print("\nTesting an order with a cancelled line item")
+        class CancellingSession(FakeOrderSession):
+            def get(self, url, headers=None, **kwargs):
+                ret = FakeOrderSession.get(self, url, headers)
+                ret.data['lines'][1]['status'] = 'Cancelled'
+                return ret
+        mgr = OrderManager(CancellingSession(polls_to_deliver=2), min_interval=0,
+                           max_interval=0, rate_limiter=False, start=False)
+        (fut,) = mgr.submit(["id0", "id1"])
+        mgr.poll()
+        err = fut.exception(timeout=0)
+        self.assertIsInstance(err, OrderFailedError)
+        self.assertEqual([l['catalogId'] for l in err.lines], ["id1"])
+        self.assertIn("id1 cancelled", str(err))
+        self.assertEqual(mgr.outstanding(), [])
+
+    def test_delivered_percentages(self):
+        print("\nTesting the order delivery check")
+        lines = lambda *pcts: {'lines': [{'percentDelivered': p} for p in pcts]}
+        self.assertTrue(is_order_delivered(lines('100', 100, '100.0', 100.0)))
+        self.assertFalse(is_order_delivered(lines('100', '99.5')))
+        self.assertFalse(is_order_delivered(lines('100', None)))
+        self.assertFalse(is_order_delivered(lines()))
+
+    def test_status_failures(self):
+        print("\nTesting an order whose status can't be read")
+        class BrokenStatusSession(FakeOrderSession):
+            def __init__(self):
+                FakeOrderSession.__init__(self, polls_to_deliver=10)
+                self.calls = 0
+            def get(self, url, headers=None, **kwargs):
+                self.calls += 1
+                if self.calls in (1, 3):
+                    return FakeOrderSession.get(self, url, headers)
+                raise requests.ConnectionError("connection reset")
+        sess = BrokenStatusSession()
+        gbdx.configure_transport(sess, max_retries=0)
+        mgr = OrderManager(sess, min_interval=0, max_interval=0, rate_limiter=False,
+                           max_poll_failures=3, start=False)
+        (fut,) = mgr.submit(["id0"])
+        #a success resets the count of consecutive failures
+        for _ in range(5):
+            mgr.poll()
+        self.assertFalse(fut.done())
+        mgr.poll()
+        self.assertIsInstance(fut.exception(timeout=0), requests.ConnectionError)
+        self.assertEqual((sess.calls, mgr.outstanding()), (6, []))
+
+    def test_background_polling(self):
+        print("\nTesting order polling in a background thread")
+        sess = FakeOrderSession(polls_to_deliver=2)
+        with OrderManager(sess, min_interval=0.01, max_interval=0.05,
+                          rate_limiter=False) as mgr:
+            fut = mgr.submit(["id0", "id1"])[0]
+            (done, not_done) = mgr.wait([fut], timeout=10)
+        self.assertEqual(done, set([fut]))
+        self.assertEqual(sess.polls[fut.soli], 2)
+
+if __name__ == "__main__":
+    unittest.main()
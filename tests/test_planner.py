@@ -0,0 +1,68 @@
+'''
+Created on Oct 18, 2026
+
+@author: sohara
+'''
+import unittest
+import os
+import sys
+import shapely.geometry as sg
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+
+import gbdx
+from gbdx.planner import QueryPlanner
+from tests.helpers import make_record, FakeCatalogSession
+
+class TestQueryPlanner(unittest.TestCase):
+    def setUp(self):
+        self.records = [make_record("A", sg.box(0, 0, 1, 1)),
+                        make_record("B", sg.box(1.5, 0, 2.5, 1)),
+                        make_record("C", sg.box(50, 50, 51, 51))]
+
+    def _query(self, aoi, **kwargs):
+        return gbdx.GBDXQuery(aoi, query_cache=False, **kwargs)
+
+    def test_merged_searches_match_individual_queries(self):
+        print("\nTesting that planned queries return the same records as individual queries")
+        aois = [(0.2, 0.2, 0.8, 0.8), (0.5, 0.5, 1.8, 0.9), (1.6, 0.1, 2.0, 0.5),
+                (50.2, 50.2, 50.5, 50.5), (10, 10, 11, 11)]
+        planner = QueryPlanner()
+        for aoi in aois:
+            planner.add(self._query(aoi))
+
+        sess = FakeCatalogSession(self.records)
+        results = planner.execute(sess)
+        self.assertEqual(len(results), len(aois))
+        #the first three AOIs are merged, the other two are searched alone
+        self.assertEqual(sess.search_count, 3)
+
+        single = FakeCatalogSession(self.records)
+        for (aoi, res) in zip(aois, results):
+            expected = self._query(aoi).query(single)
+            self.assertEqual(res.list_IDs(), expected.list_IDs())
+            self.assertEqual(len(res), len(expected))
+
+    def test_different_filters_are_not_merged(self):
+        print("\nTesting that queries with different filters are searched separately")
+        planner = QueryPlanner()
+        planner.add(self._query((0.2, 0.2, 0.8, 0.8), max_cloud_cover=5))
+        planner.add(self._query((0.2, 0.2, 0.8, 0.8), max_cloud_cover=20))
+        planner.add(self._query((0.3, 0.3, 0.9, 0.9), max_cloud_cover=5))
+        searches = planner.plan()
+        self.assertEqual(sorted(len(s.members) for s in searches), [1, 2])
+
+    def test_max_merged_area(self):
+        print("\nTesting the limit on the area of a merged search")
+        planner = QueryPlanner(max_merged_area=1.0)
+        planner.add(self._query((0, 0, 0.9, 0.9)))
+        planner.add(self._query((0.5, 0.5, 1.4, 1.4)))
+        self.assertEqual(len(planner.plan()), 2)
+        planner.max_merged_area = None
+        searches = planner.plan()
+        self.assertEqual(len(searches), 1)
+        self.assertEqual(searches[0].bounds.bounds, (0.0, 0.0, 1.4, 1.4))
+
+if __name__ == "__main__":
+    unittest.main()
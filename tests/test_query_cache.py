@@ -0,0 +1,117 @@
+'''
+Created on Oct 18, 2026
+
+@author: sohara
+'''
+import unittest
+import os
+import sys
+import shutil
+import binascii
+import tempfile
+import warnings
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+
+import gbdx
+from gbdx import cache as cache_module
+from gbdx.cache import QueryCache, canonical_search_key
+from tests.helpers import FakeCatalogSession, make_record
+import shapely.geometry as sg
+
+class Test(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.tmp_dir, "cache", "query_cache.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_unwritable_default_cache(self):
+        print("\nTesting queries when the default cache can't be created")
+        blocker = os.path.join(self.tmp_dir, "not_a_dir")
+        open(blocker, 'w').close()
+        saved = (cache_module.DEFAULT_QUERY_CACHE_PATH, cache_module._DEFAULT_QUERY_CACHE)
+        cache_module.DEFAULT_QUERY_CACHE_PATH = os.path.join(blocker, "query_cache.sqlite")
+        cache_module._DEFAULT_QUERY_CACHE = None
+        try:
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                session = FakeCatalogSession([make_record("A", sg.box(0, 0, 1, 1))])
+                query = gbdx.GBDXQuery((0, 0, 1, 1))
+                self.assertListEqual(query.query(session).list_IDs(), ["A"])
+                self.assertListEqual(query.query(session).list_IDs(), ["A"])
+            self.assertEqual(session.search_count, 2)
+            self.assertEqual(len(caught), 1)
+            self.assertIn("Query cache disabled", str(caught[0].message))
+        finally:
+            (cache_module.DEFAULT_QUERY_CACHE_PATH, cache_module._DEFAULT_QUERY_CACHE) = saved
+
+    def test_default_cache_duration(self):
+        print("\nTesting the query cache duration of the default cache")
+        saved = cache_module._DEFAULT_QUERY_CACHE
+        cache_module._DEFAULT_QUERY_CACHE = QueryCache(self.cache_path)
+        try:
+            session = FakeCatalogSession([make_record("A", sg.box(0, 0, 1, 1))])
+            query = gbdx.GBDXQuery((0, 0, 1, 1))
+            query.query(session)
+            query.query(session)
+            self.assertEqual(session.search_count, 1)
+            #entries of the default cache expire after QUERY_CACHE_DURATION
+            query.QUERY_CACHE_DURATION = -1
+            query.query(session)
+            self.assertEqual(session.search_count, 2)
+        finally:
+            cache_module._DEFAULT_QUERY_CACHE = saved
+
+    def test_canonical_key(self):
+        print("\nTesting canonical search keys")
+        body1 = {'startDate': None, 'filters': ["b = 1", "a = 2 "]}
+        body2 = {'filters': ["a = 2", "b = 1"], 'startDate': None}
+        self.assertEqual(canonical_search_key(body1), canonical_search_key(body2))
+        body2['startDate'] = '2015-01-01'
+        self.assertNotEqual(canonical_search_key(body1), canonical_search_key(body2))
+
+    def test_ttl_and_counters(self):
+        print("\nTesting query cache expiration")
+        cache = QueryCache(self.cache_path, ttl=60)
+        body = {'searchAreaWkt': 'POLYGON EMPTY'}
+        self.assertIsNone(cache.get(body))
+        cache.put(body, {'results': [1, 2, 3]})
+        self.assertEqual(cache.get(body), {'results': [1, 2, 3]})
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        self.assertIsNone(cache.get(body, ttl=-1))
+        cache.put(body, {'results': [1, 2, 3]})
+        expired = QueryCache(self.cache_path, ttl=-1)
+        self.assertIsNone(expired.get(body))
+        self.assertEqual(cache.stats()['entries'], 0)
+
+    def test_lru_eviction(self):
+        print("\nTesting query cache LRU eviction")
+        cache = QueryCache(self.cache_path, max_bytes=10**9)
+        bodies = [{'n': i} for i in range(4)]
+        payload = lambda: {'payload': binascii.hexlify(os.urandom(512)).decode('ascii')}
+        for body in bodies[0:3]:
+            cache.put(body, payload())
+        entry_size = cache.stats()['bytes'] // 3
+        cache.get(bodies[0])  #most recently used now
+        cache.max_bytes = 2*entry_size + entry_size//2
+        cache.put(bodies[3], payload())
+        self.assertEqual(cache.stats()['entries'], 2)
+        self.assertIsNotNone(cache.get(bodies[0]))
+        self.assertIsNotNone(cache.get(bodies[3]))
+        self.assertIsNone(cache.get(bodies[1]))
+
+    def test_shared_between_query_objects(self):
+        print("\nTesting query cache shared between query objects")
+        cache = QueryCache(self.cache_path)
+        session = FakeCatalogSession([make_record("A", sg.box(0, 0, 1, 1))])
+        res1 = gbdx.GBDXQuery((0, 0, 1, 1), query_cache=cache)(session)
+        res2 = gbdx.GBDXQuery((0, 0, 1, 1), query_cache=QueryCache(self.cache_path))(session)
+        self.assertEqual(session.search_count, 1)
+        self.assertListEqual(res1.list_IDs(), res2.list_IDs())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+'''
+Created on Oct 18, 2026
+
+@author: sohara
+'''
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import warnings
+import threading
+import requests
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+
+import gbdx
+from gbdx.registry import TaskRegistry
+from tests.helpers import FakeClock, FakeResponse
+
+class FakeTaskSession(object):
+    """
+    Serves a task list and task definitions with ETags, answering
+    conditional requests with 304 when the ETag matches.
+    """
+    def __init__(self, task_names):
+        self.task_names = task_names
+        self.version = 1
+        self.offline = False
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, **kwargs):
+        if self.offline:
+            raise requests.ConnectionError("offline")
+        name = url.rstrip("/").split("/")[-1]
+        with self._lock:
+            self.requests.append(name)
+        if name == "tasks":
+            data = {'tasks': self.task_names}
+        else:
+            data = {'name': name, 'version': self.version,
+                    'inputPortDescriptors': [{'name': 'data'}]}
+        etag = '"{}-{}"'.format(name, self.version)
+        if (headers or {}).get('If-None-Match') == etag:
+            ret = FakeResponse(304, None)
+        else:
+            ret = FakeResponse(200, data)
+        ret.headers['ETag'] = etag
+        return ret
+
+class TestTaskRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "registry.json")
+        self.sess = FakeTaskSession(["FastOrtho", "CloudDetect", "Pansharpen"])
+        gbdx.configure_transport(self.sess, max_retries=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_ttl_and_revalidation(self):
+        print("\nTesting task registry TTL and ETag revalidation")
+        clock = FakeClock()
+        registry = TaskRegistry(self.path, ttl=60, clock=clock)
+        self.assertEqual(gbdx.list_available_tasks(self.sess, registry=registry),
+                         self.sess.task_names)
+        for _ in range(3):
+            defn = gbdx.get_task_definition(self.sess, "FastOrtho", registry=registry)
+        self.assertEqual(defn['version'], 1)
+        self.assertEqual(self.sess.requests, ["tasks", "FastOrtho"])
+
+        #after the ttl, an unchanged definition is revalidated (304)
+        clock.now += 120
+        self.assertEqual(registry.get_definition(self.sess, "FastOrtho")['version'], 1)
+        self.assertEqual(registry.request_count, 3)
+        #a changed definition is downloaded again
+        self.sess.version = 2
+        clock.now += 120
+        self.assertEqual(registry.get_definition(self.sess, "FastOrtho")['version'], 2)
+
+    def test_prefetch_and_snapshot(self):
+        print("\nTesting task registry prefetch and on-disk snapshot")
+        registry = TaskRegistry(self.path, max_workers=3)
+        self.assertEqual(registry.prefetch(self.sess), {})
+        self.assertEqual(sorted(self.sess.requests),
+                         sorted(["tasks"] + self.sess.task_names))
+
+        #a new registry starts from the snapshot, and works offline
+        self.sess.offline = True
+        registry2 = TaskRegistry(self.path, ttl=0)
+        self.assertEqual(registry2.list_tasks(self.sess), self.sess.task_names)
+        self.assertEqual(registry2.get_definition(self.sess, "Pansharpen")['name'], "Pansharpen")
+        with self.assertRaises(requests.ConnectionError):
+            registry2.get_definition(self.sess, "NotCached")
+
+    def test_unwritable_snapshot(self):
+        print("\nTesting a task registry whose snapshot can't be written")
+        blocker = os.path.join(self.tmp_dir, "not_a_dir")
+        open(blocker, 'w').close()
+        registry = TaskRegistry(path=os.path.join(blocker, "registry.json"))
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            self.assertEqual(registry.prefetch(self.sess), {})
+            self.assertEqual(registry.get_definition(self.sess, "FastOrtho")['name'], "FastOrtho")
+            registry.save()
+        self.assertEqual(len(caught), 1)
+        self.assertIn("Task registry not saved", str(caught[0].message))
+        self.assertEqual(len(self.sess.requests), 4)
+
+        #a failed write leaves no temporary file behind
+        registry = TaskRegistry(path=self.path)
+        registry._entries['Bad'] = {'data': object(), 'etag': None, 'fetched': 0}
+        with warnings.catch_warnings(record=True):
+            warnings.simplefilter("always")
+            registry.save()
+        self.assertEqual(os.listdir(self.tmp_dir), ["not_a_dir"])
+
+if __name__ == "__main__":
+    unittest.main()
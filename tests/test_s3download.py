@@ -0,0 +1,295 @@
+'''
+Created on Oct 18, 2026
+
+@author: sohara
+'''
+import unittest
+import io
+import os
+import sys
+import json
+import shutil
+import hashlib
+import errno
+import tempfile
+import threading
+import requests
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+
+import gbdx
+from gbdx.polling import RateLimiter
+from gbdx.s3download import S3Downloader, ChecksumError, parse_s3_url, order_locations, \
+                            PARTIAL_SUFFIX, PROGRESS_SUFFIX
+from tests.helpers import FakeClock, FakeResponse
+
+try:
+    from botocore.exceptions import ClientError
+except ImportError:
+    ClientError = None
+
+try:
+    import boto3
+    import moto
+except ImportError:
+    moto = None
+
+BUCKET = "gbd-customer-data"
+
+class FakeGBDXSession(object):
+    """
+    Answers s3creds and order status requests, and places orders
+    unless place_orders is False
+    """
+    def __init__(self, order_status=None, place_orders=True):
+        self.order_status = order_status
+        self.place_orders = place_orders
+        self.creds_count = 0
+
+    def get(self, url, headers=None, **kwargs):
+        if "/s3creds/" in url:
+            self.creds_count += 1
+            return FakeResponse(200, {'bucket': BUCKET, 'prefix': 'abc',
+                                      'S3_access_key': "key{}".format(self.creds_count),
+                                      'S3_secret_key': "secret", 'S3_session_token': "t"})
+        return FakeResponse(200, self.order_status)
+
+    def post(self, url, data=None, headers=None, **kwargs):
+        if not self.place_orders:
+            return FakeResponse(500)
+        return FakeResponse(200, {'salesOrderNumber': "000000001"})
+
+class FakeS3Client(object):
+    """
+    Serves objects from memory, a few keys per listing page. GETs of the
+    (key, range start) pairs in fail_once fail the first time.
+    """
+    def __init__(self, objects, fail_once=(), fail_always=()):
+        self.objects = objects
+        self.fail_once = set(fail_once)
+        self.fail_always = set(fail_always)
+        self.gets = []
+        self._lock = threading.Lock()
+
+    def list_objects_v2(self, Bucket, Prefix, ContinuationToken=None):
+        keys = sorted(k for k in self.objects if k.startswith(Prefix))
+        start = int(ContinuationToken or 0)
+        page = keys[start:start + 2]
+        contents = [{'Key': k, 'Size': len(self.objects[k]),
+                     'ETag': '"{}"'.format(hashlib.md5(self.objects[k]).hexdigest())} for k in page]
+        truncated = start + 2 < len(keys)
+        return {'Contents': contents, 'IsTruncated': truncated,
+                'NextContinuationToken': str(start + 2) if truncated else None}
+
+    def get_object(self, Bucket, Key, Range):
+        (start, end) = [int(v) for v in Range[len("bytes="):].split("-")]
+        with self._lock:
+            self.gets.append((Key, start))
+            if (Key, start) in self.fail_once:
+                self.fail_once.discard((Key, start))
+                raise requests.ConnectionError("connection reset")
+            if (Key, start) in self.fail_always:
+                raise requests.ConnectionError("connection reset")
+        return {'Body': io.BytesIO(self.objects[Key][start:end + 1])}
+
+def make_objects():
+    return {"abc/055093376010_01_003/a.tif": os.urandom(2500),
+            "abc/055093376010_01_003/sub/b.xml": b"<xml/>",
+            "abc/055093376010_01_003/empty.txt": b"",
+            "abc/055093376010_01_003/c.til": os.urandom(1000),
+            "abc/other/d.tif": b"d"}
+
+class TestS3Download(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.objects = make_objects()
+        self.url = "s3://{}/abc/055093376010_01_003".format(BUCKET)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def downloader(self, client, **kwargs):
+        kwargs.setdefault('backoff_factor', 0)
+        return S3Downloader(FakeGBDXSession(), part_size=1000, max_workers=4,
+                            client_factory=lambda creds: client, **kwargs)
+
+    def local(self, key):
+        return os.path.join(self.tmpdir, *key.split("/")[1:])
+
+    def test_ranged_download(self):
+        print("\nTesting concurrent ranged S3 downloads")
+        self.assertEqual(parse_s3_url(self.url), (BUCKET, "abc/055093376010_01_003"))
+        client = FakeS3Client(self.objects, fail_once=[("abc/055093376010_01_003/a.tif", 1000)])
+        results = self.downloader(client).download(self.url, self.tmpdir)
+        self.assertEqual(len(results), 4)
+        for (key, path, err) in results:
+            self.assertIsNone(err)
+            self.assertEqual(path, self.local(key))
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(), self.objects[key])
+        self.assertFalse([f for f in os.listdir(os.path.dirname(path)) if f.endswith(PARTIAL_SUFFIX)])
+        #3 parts + 1 retry for a.tif, one part each for b.xml and c.til
+        self.assertEqual(len(client.gets), 6)
+        #complete files are skipped
+        self.downloader(client).download([self.url], self.tmpdir)
+        self.assertEqual(len(client.gets), 6)
+
+    def test_resume_partial_download(self):
+        print("\nTesting resuming an interrupted S3 download")
+        key = "abc/055093376010_01_003/a.tif"
+        failing = FakeS3Client(self.objects, fail_always=[(key, 2000)])
+        results = dict((k, err) for (k, _, err) in
+                       self.downloader(failing, max_retries=1).download(self.url, self.tmpdir))
+        self.assertIsInstance(results[key], requests.ConnectionError)
+        self.assertTrue(os.path.exists(self.local(key) + PARTIAL_SUFFIX))
+        with open(self.local(key) + PROGRESS_SUFFIX) as f:
+            self.assertEqual(json.load(f)['done'], [0, 1])
+
+        client = FakeS3Client(self.objects)
+        results = self.downloader(client).download(self.url, self.tmpdir)
+        self.assertTrue(all(err is None for (_, _, err) in results))
+        self.assertEqual(client.gets, [(key, 2000)])
+        with open(self.local(key), 'rb') as f:
+            self.assertEqual(f.read(), self.objects[key])
+
+    def test_final_errors(self):
+        print("\nTesting that S3 errors a retry won't fix fail at once")
+        errors = [OSError(errno.ENOSPC, "No space left on device")]
+        if ClientError is not None:
+            errors.append(ClientError({'Error': {'Code': 'AccessDenied'},
+                                       'ResponseMetadata': {'HTTPStatusCode': 403}}, 'GetObject'))
+        key = "abc/055093376010_01_003/c.til"
+        for error in errors:
+            class FailingS3Client(FakeS3Client):
+                def get_object(self, Bucket, Key, Range):
+                    if Key == key:
+                        self.gets.append((Key, 0))
+                        raise error
+                    return FakeS3Client.get_object(self, Bucket, Key, Range)
+            client = FailingS3Client(self.objects)
+            results = dict((k, err) for (k, _, err) in
+                           self.downloader(client).download(self.url, self.tmpdir))
+            self.assertIs(results[key], error)
+            self.assertEqual(client.gets.count((key, 0)), 1)
+
+    def test_key_outside_dest_dir(self):
+        print("\nTesting that S3 keys can't escape the destination directory")
+        evil = "abc/055093376010_01_003/../../evil.txt"
+        self.objects[evil] = b"evil"
+        client = FakeS3Client(self.objects)
+        dest_dir = os.path.join(self.tmpdir, "dest")
+        results = dict((k, (path, err)) for (k, path, err) in
+                       self.downloader(client).download(self.url, dest_dir))
+        (path, err) = results[evil]
+        self.assertIsNone(path)
+        self.assertIsInstance(err, ValueError)
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir, "evil.txt")))
+        self.assertNotIn(evil, [k for (k, _) in client.gets])
+        self.assertTrue(all(err is None for (k, (_, err)) in results.items() if k != evil))
+
+    def test_checksum_mismatch(self):
+        print("\nTesting S3 download checksum verification")
+        client = FakeS3Client(self.objects)
+        key = "abc/055093376010_01_003/c.til"
+        listing = client.list_objects_v2
+        def corrupt_listing(**kwargs):
+            page = listing(**kwargs)
+            for item in page['Contents']:
+                if item['Key'] == key:
+                    item['ETag'] = '"0123456789abcdef0123456789abcdef"'
+            return page
+        client.list_objects_v2 = corrupt_listing
+        results = dict((k, err) for (k, _, err) in self.downloader(client).download(self.url, self.tmpdir))
+        self.assertIsInstance(results[key], ChecksumError)
+        self.assertFalse(os.path.exists(self.local(key)))
+        self.assertFalse(os.path.exists(self.local(key) + PARTIAL_SUFFIX))
+
+    def test_order_download_and_credential_refresh(self):
+        print("\nTesting S3 download of an order, with credential refresh")
+        status = {'lines': [{'catalogId': 'A', 'percentDelivered': '100', 'location': self.url},
+                            {'catalogId': 'B', 'percentDelivered': '40',
+                             'location': "s3://{}/abc/other".format(BUCKET)}]}
+        self.assertEqual(order_locations(status), [self.url])
+        clock = FakeClock()
+        session = FakeGBDXSession(status)
+        downloader = S3Downloader(session, part_size=1000, duration=3600, clock=clock,
+                                  client_factory=lambda creds: FakeS3Client(self.objects))
+        results = downloader.download_order("000000001", self.tmpdir)
+        self.assertEqual(len(results), 4)
+        self.assertEqual(session.creds_count, 1)
+        self.assertEqual(downloader.bytes_downloaded, 2500 + 6 + 1000)
+        clock.now += 3400   #within the refresh margin
+        downloader.client()
+        self.assertEqual((session.creds_count, downloader.credential_refreshes), (2, 2))
+
+    @unittest.skipIf(ClientError is None, "botocore is required for the ExpiredToken test")
+    def test_expired_token(self):
+        print("\nTesting concurrent S3 downloads after the credentials expire")
+        session = FakeGBDXSession()
+        barrier = threading.Barrier(4, timeout=10)
+        class ExpiredS3Client(FakeS3Client):
+            def get_object(self, Bucket, Key, Range):
+                #every worker holds the expired client when the errors arrive
+                barrier.wait()
+                raise ClientError({'Error': {'Code': 'ExpiredToken'}}, 'GetObject')
+        def client_factory(creds):
+            if creds['S3_access_key'] == "key1":
+                return ExpiredS3Client(self.objects)
+            return FakeS3Client(self.objects)
+        downloader = S3Downloader(session, part_size=1000, max_workers=4,
+                                  client_factory=client_factory)
+        results = downloader.download(self.url, self.tmpdir)
+        self.assertTrue(all(err is None for (_, _, err) in results))
+        self.assertEqual((session.creds_count, downloader.credential_refreshes), (2, 2))
+
+    def test_undelivered_cat_ids(self):
+        print("\nTesting S3 download of catalog ids that are not delivered")
+        cat_ids = ["A", "B"]
+        for (place_orders, error_type) in ((True, TimeoutError), (False, requests.HTTPError)):
+            session = FakeGBDXSession(place_orders=place_orders)
+            gbdx.configure_transport(session, max_retries=0)
+            downloader = S3Downloader(session, client_factory=lambda creds: FakeS3Client({}))
+            results = downloader.download_cat_ids(cat_ids, self.tmpdir, timeout=0.01)
+            self.assertEqual([(cat_id, path) for (cat_id, path, _) in results],
+                             [("A", None), ("B", None)])
+            for (_, _, err) in results:
+                self.assertIsInstance(err, error_type)
+
+    def test_bandwidth_cap(self):
+        print("\nTesting the S3 download bandwidth cap")
+        clock = FakeClock()
+        waits = []
+        downloader = self.downloader(FakeS3Client(self.objects), max_bandwidth=1000)
+        downloader.bandwidth_limiter = RateLimiter(rate=1000, burst=1000, clock=clock,
+                                                   sleep=waits.append)
+        downloader.download(self.url, self.tmpdir)
+        #3506 bytes at 1000 bytes/s, after a burst of 1000
+        self.assertAlmostEqual(max(waits), 2.506)
+
+@unittest.skipIf(moto is None, "moto and boto3 are required for the S3 stand-in test")
+class TestS3DownloadMoto(unittest.TestCase):
+    def test_moto_download(self):
+        print("\nTesting S3 download against moto")
+        mock = getattr(moto, 'mock_aws', None) or getattr(moto, 'mock_s3')
+        tmpdir = tempfile.mkdtemp()
+        try:
+            with mock():
+                s3 = boto3.client('s3', region_name='us-east-1')
+                s3.create_bucket(Bucket=BUCKET)
+                objects = make_objects()
+                for (key, data) in objects.items():
+                    s3.put_object(Bucket=BUCKET, Key=key, Body=data)
+                downloader = S3Downloader(FakeGBDXSession(), part_size=1000)
+                results = downloader.download("s3://{}/abc/055093376010_01_003".format(BUCKET),
+                                              tmpdir)
+                self.assertEqual(len(results), 4)
+                for (key, path, err) in results:
+                    self.assertIsNone(err)
+                    with open(path, 'rb') as f:
+                        self.assertEqual(f.read(), objects[key])
+        finally:
+            shutil.rmtree(tmpdir)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@author: sohara
+'''
+import unittest
+import os
+import sys
+import json
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+
+import gbdx
+from gbdx.streaming import iter_json_array, project_record
+
+RESPONSE = {'stats': {'recordsReturned': 3, 'totalRecords': 3, 'typeCounts': {'x': 3}},
+            'searchTag': 'tag ] with } brackets, and "quotes"',
+            'results': [{'identifier': 'A', 'properties': {'cloudCover': 1.5, 'name': u'Zürich'}},
+                        {'identifier': 'B', 'properties': {'cloudCover': 12345678}},
+                        {'identifier': 'C', 'properties': {'footprintWkt': 'POLYGON ((0 0, 1 0, 1 1, 0 0))'}}],
+            'trailer': 42}
+
+def chunked(data, size):
+    return [data[i:i+size] for i in range(0, len(data), size)]
+
+class StreamingResponse(object):
+    def __init__(self, data):
+        self.data = data
+        self.status_code = 200
+        self.closed = False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        return iter(chunked(self.data, chunk_size))
+
+    def close(self):
+        self.closed = True
+
+class StreamingSession(object):
+    def __init__(self, data):
+        self.response = StreamingResponse(data)
+        self.kwargs = None
+
+    def post(self, url, **kwargs):
+        self.kwargs = kwargs
+        return self.response
+
+class Test(unittest.TestCase):
+    def test_incremental_parse(self):
+        print("\nTesting incremental json array parsing")
+        data = json.dumps(RESPONSE, indent=1, ensure_ascii=False).encode('utf-8')
+        for size in (1, 2, 7, 64, len(data)):
+            records = list(iter_json_array(chunked(data, size), 'results'))
+            self.assertListEqual(records, RESPONSE['results'])
+
+    def test_empty_and_missing(self):
+        print("\nTesting incremental parsing of empty results")
+        self.assertListEqual(list(iter_json_array([b'{"results": []}'], 'results')), [])
+        self.assertListEqual(list(iter_json_array([b'{}'], 'results')), [])
+        self.assertListEqual(list(iter_json_array([b'{"stats": 1}'], 'results')), [])
+        with self.assertRaises(ValueError):
+            list(iter_json_array([b'{"results": [{"a": 1}, '], 'results'))
+
+    def test_project_record(self):
+        print("\nTesting record projection")
+        rec = RESPONSE['results'][0]
+        self.assertEqual(project_record(rec, ['identifier', 'properties.cloudCover', 'nope.x']),
+                         {'identifier': 'A', 'properties': {'cloudCover': 1.5}})
+
+    def test_iter_records(self):
+        print("\nTesting streaming catalog query")
+        session = StreamingSession(json.dumps(RESPONSE).encode('utf-8'))
+        qry = gbdx.GBDXQuery((0, 0, 1, 1), query_cache=False)
+        ids = [r['identifier'] for r in qry.iter_records(session, fields=['identifier'],
+                                                         chunk_size=5)]
+        self.assertListEqual(ids, ['A', 'B', 'C'])
+        self.assertTrue(session.kwargs['stream'])
+        self.assertTrue(session.response.closed)
+
+if __name__ == "__main__":
+    unittest.main()
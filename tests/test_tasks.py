@@ -6,10 +6,13 @@ Created on Sep 16, 2015
 import unittest
 import sys
 import os
+import threading
+import requests
 PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, PACKAGE_DIR)
 
 import gbdx
+from tests.helpers import FakeResponse
 
 class Test(unittest.TestCase):
     def setUp(self):
@@ -39,9 +42,61 @@ class Test(unittest.TestCase):
         
         print("\nTesting summarizing workflow tasks")
         summary = gbdx.summarize_workflow_tasks(w_status)
-        print summary
+        print(summary)
         self.assertTrue(len(summary)>0, "Task summary is empty")
 
+class FakeWorkflowSession(object):
+    """
+    Answers workflow searches and status requests locally. Status
+    requests for ids starting with 'bad' fail with a 500 error.
+    """
+    def __init__(self, workflow_ids):
+        self.workflow_ids = workflow_ids
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def post(self, url, data=None, headers=None, **kwargs):
+        return FakeResponse(200, {'Workflows': self.workflow_ids})
+
+    def get(self, url, headers=None, **kwargs):
+        wf_id = url.split("/")[-1]
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if wf_id.startswith("bad"):
+                return FakeResponse(500, None)
+            return FakeResponse(200, {'id': wf_id, 'owner': 'me', 'state': {'state': 'complete'},
+                                      'tasks': [{'name': 't1', 'taskType': 'FastOrtho',
+                                                 'state': {'state': 'complete'}}]})
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+class TestWorkflowFanOut(unittest.TestCase):
+    def test_search_workflows_details(self):
+        print("\nTesting concurrent workflow status retrieval")
+        ids = ["wf{}".format(i) for i in range(20)] + ["bad1"]
+        sess = FakeWorkflowSession(ids)
+        gbdx.configure_transport(sess, max_retries=0)
+        (workflow_ids, summary) = gbdx.search_workflows(sess, details=True, max_workers=4)
+        self.assertListEqual(workflow_ids, ids)
+        self.assertTrue(sess.max_in_flight <= 4)
+        for wf_id in ids[:-1]:
+            self.assertTrue("Workflow {} (me)".format(wf_id) in summary)
+        self.assertTrue("Workflow bad1: unable to retrieve status" in summary)
+
+    def test_iter_workflow_statuses(self):
+        print("\nTesting iterating workflow statuses")
+        sess = FakeWorkflowSession([])
+        gbdx.configure_transport(sess, max_retries=0)
+        outcomes = dict((wf_id, (status, err)) for (wf_id, status, err) in
+                        gbdx.iter_workflow_statuses(sess, ["a", "bad", "b"], max_workers=2))
+        self.assertEqual(outcomes["a"][0]['id'], "a")
+        self.assertIsNone(outcomes["b"][1])
+        self.assertIsInstance(outcomes["bad"][1], requests.HTTPError)
+
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testName']
     unittest.main()
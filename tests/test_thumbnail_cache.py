@@ -0,0 +1,94 @@
+'''
+Created on Oct 18, 2026
+
+@author: sohara
+'''
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import numpy as np
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+
+from gbdx.thumbcache import ThumbnailCache
+
+def decode(buf):
+    return np.frombuffer(buf, dtype=np.uint8).reshape((4, -1)).copy()
+
+class Test(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.fetched = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def fetcher(self, cat_id, size=64):
+        def fetch():
+            self.fetched.append(cat_id)
+            return (cat_id*size).encode('ascii')[0:size]
+        return fetch
+
+    def test_memory_and_disk_tiers(self):
+        print("\nTesting thumbnail cache tiers")
+        cache = ThumbnailCache(self.tmp_dir)
+        img = cache.get_image("A", self.fetcher("A"), decode)
+        self.assertEqual(img.shape, (4, 16))
+        self.assertIs(cache.get_image("A", self.fetcher("A"), decode), img)
+        #the shared image can't be changed in place
+        with self.assertRaises(ValueError):
+            img /= 2
+        self.assertEqual((cache.hits, cache.disk_hits, cache.misses), (1, 0, 1))
+
+        #a new cache object (e.g. in another process) finds it on disk
+        cache2 = ThumbnailCache(self.tmp_dir)
+        img2 = cache2.get_image("A", self.fetcher("A"), decode)
+        self.assertTrue(np.array_equal(img, img2))
+        self.assertEqual(cache2.disk_hits, 1)
+        self.assertListEqual(self.fetched, ["A"])
+
+    def test_content_addressing(self):
+        print("\nTesting thumbnail cache content addressing")
+        cache = ThumbnailCache(self.tmp_dir)
+        cache.put_bytes("A", b"same bytes")
+        cache.put_bytes("B", b"same bytes")
+        self.assertEqual(len(os.listdir(os.path.join(self.tmp_dir, 'blobs'))), 1)
+        self.assertEqual(cache.get_bytes("B"), b"same bytes")
+        self.assertIsNone(cache.get_bytes("C"))
+
+    def test_memory_budget(self):
+        print("\nTesting thumbnail cache memory budget")
+        cache = ThumbnailCache(self.tmp_dir, max_memory_bytes=150)
+        for cat_id in "ABC":
+            cache.get_image(cat_id, self.fetcher(cat_id), decode)
+        cache.get_image("C", self.fetcher("C"), decode)
+        cache.get_image("A", self.fetcher("A"), decode)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.disk_hits, 1)
+
+    def test_disk_eviction(self):
+        print("\nTesting thumbnail cache disk eviction")
+        cache = ThumbnailCache(self.tmp_dir, max_disk_bytes=150)
+        for (i, cat_id) in enumerate("AB"):
+            digest = cache.put_bytes(cat_id, self.fetcher(cat_id)())
+            os.utime(cache._blob_path(digest), (i+1, i+1))
+        cache.put_bytes("C", self.fetcher("C")())
+        self.assertIsNone(cache.get_bytes("A"))
+        #the ref of the evicted blob is dropped too
+        self.assertEqual(sorted(os.listdir(os.path.join(self.tmp_dir, 'refs'))), ["B", "C"])
+        self.assertIsNotNone(cache.get_bytes("B"))
+        self.assertIsNotNone(cache.get_bytes("C"))
+
+    def test_mmap(self):
+        print("\nTesting memory-mapped thumbnails")
+        cache = ThumbnailCache(self.tmp_dir)
+        img = cache.get_image("A", self.fetcher("A"), decode, mmap=True)
+        self.assertIsInstance(img, np.memmap)
+        self.assertTrue(np.array_equal(img, decode(self.fetcher("A")())))
+        self.assertEqual(len(cache._memory), 0)
+
+if __name__ == "__main__":
+    unittest.main()
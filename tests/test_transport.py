@@ -0,0 +1,111 @@
+'''
+Created on Oct 18, 2026
+
+@author: sohara
+'''
+import unittest
+import os
+import sys
+import gzip
+from io import BytesIO
+import requests
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+
+import gbdx
+from tests.helpers import FakeResponse, ScriptedSession
+
+class Test(unittest.TestCase):
+    def make_transport(self, outcomes, **options):
+        session = ScriptedSession(outcomes)
+        options.setdefault('backoff_factor', 0)
+        return (session, gbdx.configure_transport(session, **options))
+
+    def test_retries_transient_errors(self):
+        print("\nTesting transport retries")
+        outcomes = [FakeResponse(503), requests.ConnectionError("reset"),
+                    FakeResponse(200, {'ok': 1})]
+        (session, transport) = self.make_transport(outcomes)
+        self.assertEqual(gbdx.get_json(session, "http://x/y"), {'ok': 1})
+        self.assertEqual(len(session.calls), 3)
+        #the retried response was closed, releasing its connection
+        self.assertEqual((outcomes[0].closed, outcomes[2].closed), (True, False))
+        self.assertIs(gbdx.get_transport(session), transport)
+        self.assertEqual(session.calls[0][1]['timeout'], transport.timeout)
+
+    def test_gives_up_after_max_retries(self):
+        print("\nTesting transport retry limit")
+        (session, _) = self.make_transport([FakeResponse(500)]*3, max_retries=2)
+        with self.assertRaises(requests.HTTPError):
+            gbdx.get_json(session, "http://x/y")
+        self.assertEqual(len(session.calls), 3)
+
+    def test_non_idempotent_requests(self):
+        print("\nTesting transport with non-idempotent requests")
+        (session, _) = self.make_transport([FakeResponse(503), FakeResponse(429),
+                                            FakeResponse(200, {})])
+        with self.assertRaises(requests.HTTPError):
+            gbdx.post_json(session, "http://x/y", "[]", idempotent=False)
+        self.assertEqual(len(session.calls), 1)
+        self.assertEqual(gbdx.post_json(session, "http://x/y", "[]", idempotent=False), {})
+
+    def test_client_errors_are_not_retried(self):
+        print("\nTesting transport with client errors")
+        (session, _) = self.make_transport([FakeResponse(404)])
+        with self.assertRaises(requests.HTTPError):
+            gbdx.get_json(session, "http://x/y")
+        self.assertEqual(len(session.calls), 1)
+
+    def test_circuit_breaker(self):
+        print("\nTesting transport circuit breaker")
+        (session, transport) = self.make_transport([FakeResponse(503)]*2 +
+                                                   [FakeResponse(200, {})],
+                                                   max_retries=0, circuit_threshold=2,
+                                                   circuit_reset=60)
+        for _ in range(2):
+            with self.assertRaises(requests.HTTPError):
+                gbdx.get_json(session, "http://x/y")
+        with self.assertRaises(gbdx.CircuitOpenError):
+            gbdx.get_json(session, "http://x/y")
+        self.assertEqual(len(session.calls), 2)
+
+        transport._open_until = 0  #pretend the reset period has elapsed
+        self.assertEqual(gbdx.get_json(session, "http://x/y"), {})
+        self.assertEqual(transport._failures, 0)
+
+    def test_circuit_half_open(self):
+        print("\nTesting that a half-open circuit admits one trial request")
+        (session, transport) = self.make_transport([FakeResponse(503)]*2, max_retries=0,
+                                                   circuit_threshold=2, circuit_reset=60)
+        for _ in range(2):
+            with self.assertRaises(requests.HTTPError):
+                gbdx.get_json(session, "http://x/y")
+        transport._open_until = 0  #pretend the reset period has elapsed
+        self.assertTrue(transport._check_circuit())
+        #other requests fail fast while the trial is in flight; its retries go on
+        with self.assertRaises(gbdx.CircuitOpenError):
+            transport._check_circuit()
+        self.assertTrue(transport._check_circuit(trial=True))
+        #the trial fails: the circuit opens again
+        transport._record_outcome(False)
+        with self.assertRaises(gbdx.CircuitOpenError):
+            transport._check_circuit()
+        transport._open_until = 0
+        self.assertTrue(transport._check_circuit())
+        transport._record_outcome(True)
+        self.assertFalse(transport._check_circuit())
+
+    def test_request_compression(self):
+        print("\nTesting transport request compression")
+        (session, _) = self.make_transport([FakeResponse(200, {})],
+                                           compress_requests=True, compress_min_bytes=10)
+        payload = "x"*100
+        gbdx.post_json(session, "http://x/y", payload)
+        kwargs = session.calls[0][1]
+        self.assertEqual(kwargs['headers']['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.GzipFile(fileobj=BytesIO(kwargs['data'])).read(),
+                         payload.encode('utf-8'))
+
+if __name__ == "__main__":
+    unittest.main()
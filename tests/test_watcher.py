@@ -0,0 +1,134 @@
+'''
+Created on Oct 18, 2026
+
+@author: sohara
+'''
+import unittest
+import os
+import sys
+import queue
+import asyncio
+import threading
+import unittest.mock
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+
+from gbdx.watcher import WorkflowWatcher
+from tests.helpers import FakeResponse
+
+class ScriptedWorkflowSession(object):
+    """
+    Each status request for a workflow returns the next (state, event)
+    of its script; the last one repeats.
+    """
+    def __init__(self, scripts):
+        self.scripts = dict((k, list(v)) for (k, v) in scripts.items())
+        self.polls = dict((k, 0) for k in scripts)
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, **kwargs):
+        wf_id = url.split("/")[-1]
+        with self._lock:
+            self.polls[wf_id] += 1
+            script = self.scripts[wf_id]
+            (state, event) = script.pop(0) if len(script) > 1 else script[0]
+        return FakeResponse(200, {'id': wf_id, 'owner': 'me',
+                             'state': {'state': state, 'event': event}, 'tasks': []})
+
+SCRIPTS = {'wf1': [('pending', 'submitted'), ('running', 'started'), ('running', 'started'),
+                   ('complete', 'succeeded')],
+           'wf2': [('running', 'started'), ('complete', 'failed')]}
+
+class TestWorkflowWatcher(unittest.TestCase):
+    def test_transitions(self):
+        print("\nTesting workflow state transition events")
+        sess = ScriptedWorkflowSession(SCRIPTS)
+        q = queue.Queue()
+        wf1_events = []
+        watcher = WorkflowWatcher(sess, rate_limiter=False, event_queue=q, start=False)
+        watcher.watch('wf1', callback=wf1_events.append)
+        watcher.watch('wf2')
+        self.assertEqual(sorted(watcher.watched()), ['wf1', 'wf2'])
+        #drive the scheduler by hand, pretending each poll is due
+        while len(watcher):
+            for key in watcher.watched():
+                watcher.scheduler.add(key, delay=0)
+            watcher.poll()
+        self.assertEqual([(e.previous_state, e.state) for e in wf1_events],
+                         [(None, ('pending', 'submitted')),
+                          (('pending', 'submitted'), ('running', 'started')),
+                          (('running', 'started'), ('complete', 'succeeded'))])
+        self.assertTrue(wf1_events[-1].terminal)
+        self.assertEqual(q.qsize(), 5)
+        self.assertEqual(sess.polls, {'wf1': 4, 'wf2': 2})
+
+    def test_long_running_states_poll_less(self):
+        print("\nTesting poll intervals for long-running workflow states")
+        watcher = WorkflowWatcher(None, min_interval=1.0, start=False)
+        self.assertEqual(watcher._interval_for((('running', 'started'), ())), 30.0)
+        self.assertEqual(watcher._interval_for((('pending', 'submitted'), ())), 5.0)
+        self.assertEqual(watcher._interval_for((('odd', None), ())), 1.0)
+
+    def test_iter_events(self):
+        print("\nTesting iteration over workflow events")
+        sess = ScriptedWorkflowSession(SCRIPTS)
+        with WorkflowWatcher(sess, min_interval=0.01, rate_limiter=False,
+                             start=False) as watcher:
+            with unittest.mock.patch.dict('gbdx.watcher.WORKFLOW_POLL_INTERVALS', clear=True):
+                watcher.watch('wf1')
+                watcher.watch('wf2')
+                #start polling once the iterator below is listening
+                threading.Timer(0.1, watcher.scheduler.start).start()
+                events = list(watcher.iter_events(timeout=10))
+        self.assertEqual(len(events), 5)
+        self.assertEqual(sum(1 for e in events if e.terminal), 2)
+
+    def test_aiter_events(self):
+        print("\nTesting async iteration over workflow events")
+        sess = ScriptedWorkflowSession(SCRIPTS)
+        async def collect(watcher):
+            watcher.watch('wf2')
+            #start polling once the iterator below is listening
+            asyncio.get_running_loop().call_soon(watcher.scheduler.start)
+            return [e async for e in watcher.aiter_events()]
+        with WorkflowWatcher(sess, min_interval=0.01, rate_limiter=False,
+                             start=False) as watcher:
+            with unittest.mock.patch.dict('gbdx.watcher.WORKFLOW_POLL_INTERVALS', clear=True):
+                events = asyncio.run(asyncio.wait_for(collect(watcher), 10))
+        self.assertEqual([e.state for e in events],
+                         [('running', 'started'), ('complete', 'failed')])
+
+    def test_final_event_reaches_iterators(self):
+        print("\nTesting that the final workflow event reaches every iterator")
+        sess = ScriptedWorkflowSession({'wf1': [('running', 'started'), ('complete', 'succeeded')]})
+        def failing_callback(event):
+            raise ValueError("callback failed")
+        async def collect(watcher):
+            return [e async for e in watcher.aiter_events()]
+        with WorkflowWatcher(sess, min_interval=0.01, rate_limiter=False,
+                             start=False) as watcher:
+            with unittest.mock.patch.dict('gbdx.watcher.WORKFLOW_POLL_INTERVALS', clear=True):
+                watcher.watch('wf1', callback=failing_callback)
+                sync_events = []
+                def iterate():
+                    sync_events.extend(watcher.iter_events(timeout=10))
+                thread = threading.Thread(target=iterate)
+                #the iterators are listening before polling starts
+                async def main():
+                    thread.start()
+                    while len(watcher._idle_listeners) < 1:
+                        await asyncio.sleep(0.001)
+                    asyncio.get_running_loop().call_soon(watcher.scheduler.start)
+                    return await collect(watcher)
+                with self.assertWarns(UserWarning):
+                    async_events = asyncio.run(asyncio.wait_for(main(), 10))
+                thread.join(10)
+        for events in (sync_events, async_events):
+            self.assertEqual([e.state for e in events],
+                             [('running', 'started'), ('complete', 'succeeded')])
+        #the failing callback didn't make the finished workflow be polled again
+        self.assertEqual(sess.polls['wf1'], 2)
+
+if __name__ == "__main__":
+    unittest.main()
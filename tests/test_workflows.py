@@ -0,0 +1,146 @@
+'''
+Created on Oct 18, 2026
+
+@author: sohara
+'''
+import unittest
+import os
+import sys
+import json
+import threading
+import requests
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+
+import gbdx
+from gbdx.registry import TaskRegistry
+from gbdx.workflows import WorkflowTemplate, TaskOutput, WorkflowValidationError, \
+                           submit_workflows
+from tests.helpers import FakeResponse
+from tests.mock_server import MockGBDXServer
+
+TASK_DEFINITIONS = {
+    'FastOrtho': {'name': 'FastOrtho',
+                  'inputPortDescriptors': [{'name': 'data', 'required': True},
+                                           {'name': 'epsg_code'}],
+                  'outputPortDescriptors': [{'name': 'data'}, {'name': 'log'}]},
+    'StageDataToS3': {'name': 'StageDataToS3',
+                      'inputPortDescriptors': [{'name': 'data', 'required': True},
+                                               {'name': 'destination', 'required': True}],
+                      'outputPortDescriptors': []},
+}
+
+class FakeWorkflowSession(object):
+    """
+    Serves task definitions and accepts workflow submissions, except for
+    workflows whose name contains 'bad', which fail with a 500 error.
+    """
+    def __init__(self):
+        self.submitted = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, **kwargs):
+        defn = TASK_DEFINITIONS.get(url.split("/")[-1])
+        return FakeResponse(200 if defn else 404, defn)
+
+    def post(self, url, data=None, headers=None, **kwargs):
+        workflow = json.loads(data)
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if 'bad' in workflow['name']:
+                return FakeResponse(500)
+            with self._lock:
+                self.submitted.append(workflow)
+                return FakeResponse(200, {'id': "wf-" + workflow['name']})
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+def ortho_template():
+    template = WorkflowTemplate("ortho_{cat_id}")
+    template.add_task("ortho", "FastOrtho", inputs={'data': "s3://receiving/{cat_id}"},
+                      timeout=7200)
+    template.add_task("stage", "StageDataToS3",
+                      inputs={'data': TaskOutput("ortho", "data"),
+                              'destination': "s3://my-bucket/ortho/{cat_id}"})
+    return template
+
+class TestWorkflows(unittest.TestCase):
+    def setUp(self):
+        self.session = FakeWorkflowSession()
+        gbdx.configure_transport(self.session, max_retries=0)
+        self.registry = TaskRegistry(path=None)
+
+    def test_render_and_validate(self):
+        print("\nTesting workflow template rendering and validation")
+        template = ortho_template()
+        template.validate(self.session, self.registry)
+        workflow = template.render(cat_id="1030010006C85000")
+        self.assertEqual(workflow['name'], "ortho_1030010006C85000")
+        (ortho, stage) = workflow['tasks']
+        self.assertEqual(ortho['inputs'], [{'name': 'data', 'value': "s3://receiving/1030010006C85000"}])
+        self.assertEqual((ortho['outputs'], ortho['timeout']), ([{'name': 'data'}], 7200))
+        self.assertEqual(stage['inputs'][0], {'name': 'data', 'source': "ortho:data"})
+        with self.assertRaises(WorkflowValidationError):
+            template.render(catid="x")
+
+        #literal braces are kept, and format specs are applied
+        literal = WorkflowTemplate("job_{n:03d}")
+        literal.add_task("t", "FastOrtho", inputs={'data': '{"band": 1, "id": "{cat_id}"}',
+                                                   'epsg_code': "^[0-9]{0,3}$"})
+        workflow = literal.render(n=7, cat_id="X")
+        self.assertEqual(workflow['name'], "job_007")
+        self.assertEqual(workflow['tasks'][0]['inputs'],
+                         [{'name': 'data', 'value': '{"band": 1, "id": "X"}'},
+                          {'name': 'epsg_code', 'value': "^[0-9]{0,3}$"}])
+        with self.assertRaises(WorkflowValidationError):
+            literal.render(n="seven", cat_id="X")
+
+        bad = WorkflowTemplate("bad")
+        bad.add_task("ortho", "FastOrtho", inputs={'dat': "x"}, outputs=['tiles'])
+        bad.add_task("stage", "StageDataToS3", inputs={'data': TaskOutput("orth", "data")})
+        bad.add_task("ortho", "NoSuchTask")
+        with self.assertRaises(WorkflowValidationError) as cm:
+            bad.validate(self.session, self.registry)
+        problems = cm.exception.problems
+        for expected in ("duplicate task name ortho", "task ortho: FastOrtho has no input port dat",
+                         "task ortho: required input data is missing",
+                         "task ortho: FastOrtho has no output port tiles",
+                         "task stage: required input destination is missing",
+                         "task stage: input source orth is not a task of the workflow",
+                         "task ortho: unknown task type NoSuchTask"):
+            self.assertIn(expected, problems)
+
+    def test_bulk_submission(self):
+        print("\nTesting bulk workflow submission")
+        params = [{'cat_id': "cat{}".format(i)} for i in range(30)] + \
+                 [{'cat_id': "bad"}, {'catid': "typo"}]
+        results = submit_workflows(self.session, ortho_template(), params, max_workers=4,
+                                   rate_limiter=False, registry=self.registry)
+        self.assertEqual([p for (p, _, _) in results], params)
+        for (p, wf_id, err) in results[0:30]:
+            self.assertEqual((wf_id, err), ("wf-ortho_" + p['cat_id'], None))
+        self.assertIsInstance(results[30][2], requests.HTTPError)
+        self.assertIsInstance(results[31][2], WorkflowValidationError)
+        self.assertEqual(len(self.session.submitted), 30)
+        self.assertTrue(self.session.max_in_flight <= 4)
+
+    def test_submit_to_mock_server(self):
+        print("\nTesting workflow submission against the mock server")
+        template = WorkflowTemplate("mock_{n}")
+        template.add_task("t1", "MockTask0", inputs={'data': "s3://bucket/{n}"})
+        with MockGBDXServer() as server:
+            sess = requests.Session()
+            results = submit_workflows(sess, template, [{'n': n} for n in range(5)],
+                                       registry=TaskRegistry(path=None))
+            self.assertTrue(all(err is None for (_, _, err) in results))
+            self.assertEqual(len(set(wf_id for (_, wf_id, _) in results)), 5)
+            self.assertEqual(server.requests[('POST', 'workflows/v1/workflows')], 5)
+
+if __name__ == "__main__":
+    unittest.main()